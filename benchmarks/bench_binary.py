@@ -0,0 +1,70 @@
+"""Compares ingesting the text command format against the binary command format: decoding commands alone and applying them to a Consolidator.
+
+    Usage (from the root folder of the project):
+        python -m benchmarks.bench_binary [--input <path>] [--donations N] ...
+"""
+import argparse
+import io
+import logging
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import add_config_arguments, config_from_args, write_lines
+from internal.binary_commands import convert_text_to_binary, iter_binary_commands, process_binary_commands
+from internal.consolidator import Consolidator
+from internal.core_processing import parse_command, process_command_lines
+from internal.entry_reporter import EntriesReporter
+from internal.entry_stores import ReporterRetention
+from internal.streaming import iter_lines
+
+
+def decode_text(data: bytes) -> int:
+    return sum(1 for line in iter_lines(io.BytesIO(data)) if parse_command(line).command)
+
+def decode_binary(data: bytes) -> int:
+    return sum(1 for _ in iter_binary_commands(io.BytesIO(data)))
+
+def ingest_text(data: bytes) -> int:
+    consolidator = Consolidator(EntriesReporter(logging.getLogger("benchmark"), retention=ReporterRetention.COUNTS))
+    process_command_lines(consolidator, consolidator._reporter, iter_lines(io.BytesIO(data)))
+    return len(consolidator.all_donors)
+
+def ingest_binary(data: bytes) -> int:
+    consolidator = Consolidator(EntriesReporter(logging.getLogger("benchmark"), retention=ReporterRetention.COUNTS))
+    process_binary_commands(consolidator, io.BytesIO(data))
+    return len(consolidator.all_donors)
+
+def timed(function, data: bytes) -> float:
+    start = time.perf_counter()
+    function(data)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog='bench_binary', description="Text vs binary command format")
+    add_config_arguments(parser)
+    parser.add_argument('--input', type=str, help="Use this text input file instead of generating one")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    logging.getLogger("benchmark").setLevel(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        path = args.input
+        if not path:
+            path = os.path.join(temporary_directory, "synthetic.txt")
+            write_lines(path, config_from_args(args))
+
+        with open(path, 'rb') as text_file:
+            text = text_file.read()
+
+    binary_file = io.BytesIO()
+    commands, _ = convert_text_to_binary(iter_lines(io.BytesIO(text)), binary_file)
+    binary = binary_file.getvalue()
+
+    print(f"{commands:,} commands: text {len(text) / (1024 * 1024):,.1f} MB, binary {len(binary) / (1024 * 1024):,.1f} MB")
+    for stage, text_function, binary_function in [("decode", decode_text, decode_binary), ("ingest", ingest_text, ingest_binary)]:
+        text_seconds = timed(text_function, text)
+        binary_seconds = timed(binary_function, binary)
+        print(f"{stage:>7}: text {commands / text_seconds:>12,.0f} commands/sec binary {commands / binary_seconds:>12,.0f} commands/sec ({text_seconds / binary_seconds:.1f}x)")
@@ -0,0 +1,80 @@
+"""Compares aggregating retained donations one Donation object at a time with the NumPy columnar aggregation (`--columnar`), and the memory
+    each representation takes per donation.
+
+    Usage (from the root folder of the project, numpy must be installed):
+        python -m benchmarks.bench_columnar [--donations N] [--donors N] [--campaigns N]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from internal.columnar import DonationColumns, aggregate_donations
+from internal.models import Donation, DonationFrequency
+
+
+def build_donations(amount: int, donors: int, campaigns: int, seed: int = 7) -> list[tuple[int, int, DonationFrequency, int]]:
+    """Returns `amount` random (donor id, campaign id, frequency, amount in cents) donations"""
+    rng = random.Random(seed)
+    frequencies = (DonationFrequency.MONTHLY, DonationFrequency.MONTHLY, DonationFrequency.MONTHLY, DonationFrequency.WEEKLY)
+    return [(rng.randrange(donors), rng.randrange(campaigns), rng.choice(frequencies), rng.randrange(1, 100_000)) for _ in range(amount)]
+
+def object_aggregation(donations_by_donor: list[list[Donation]], campaign_keys: list[str]) -> float:
+    """Returns the seconds it takes to add up the Donation objects of every donor, per donor and per campaign"""
+    start = time.perf_counter()
+    campaign_totals = {key: 0 for key in campaign_keys}
+    for donations in donations_by_donor:
+        total = 0
+        for donation in donations:
+            amount = donation.get_donation_amount()
+            total += amount
+            campaign_totals[donation.campaign_key] += amount
+
+    return time.perf_counter() - start
+
+def columnar_aggregation(columns: DonationColumns, donors: int, campaigns: int) -> float:
+    """Returns the seconds `aggregate_donations` takes"""
+    start = time.perf_counter()
+    aggregate_donations(columns, donors, campaigns)
+
+    return time.perf_counter() - start
+
+def allocated_per_donation(build, amount: int) -> float:
+    tracemalloc.start()
+    before, _peak = tracemalloc.get_traced_memory()
+    built = build()
+    after, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return (after - before) / amount if built is not None else 0.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog='bench_columnar', description="Donation objects vs NumPy columns aggregation")
+    parser.add_argument('--donations', type=int, default=2_000_000)
+    parser.add_argument('--donors', type=int, default=100_000)
+    parser.add_argument('--campaigns', type=int, default=1_000)
+    args = parser.parse_args()
+
+    donations = build_donations(args.donations, args.donors, args.campaigns)
+    campaign_keys = [f"campaign{index}" for index in range(args.campaigns)]
+
+    def build_objects():
+        donations_by_donor: list[list[Donation]] = [list() for _ in range(args.donors)]
+        for donor_id, campaign_id, frequency, amount in donations:
+            donations_by_donor[donor_id].append(Donation(campaign_key=campaign_keys[campaign_id], frequency=frequency, amount=amount))
+        return donations_by_donor
+
+    def build_columns():
+        columns = DonationColumns()
+        for donation in donations:
+            columns.append(*donation)
+        return columns
+
+    print(f"Donation objects: {allocated_per_donation(build_objects, args.donations):,.0f} bytes/donation")
+    print(f"Columns:          {allocated_per_donation(build_columns, args.donations):,.0f} bytes/donation")
+
+    objects_seconds = object_aggregation(build_objects(), campaign_keys)
+    columns_seconds = columnar_aggregation(build_columns(), args.donors, args.campaigns)
+    print(f"Donation objects: {args.donations / objects_seconds:>14,.0f} donations/sec")
+    print(f"Columns (NumPy):  {args.donations / columns_seconds:>14,.0f} donations/sec ({objects_seconds / columns_seconds:.0f}x)")
@@ -0,0 +1,43 @@
+"""Measures how many lines per second `extract_command` can turn into commands.
+
+    Usage (from the root folder of the project):
+        python -m benchmarks.bench_dispatch [--lines N] [--repeat N]
+"""
+import argparse
+import time
+
+from internal.core_processing import extract_command
+
+
+SAMPLE_LINES = [
+    "Add Donor Greg $1000",
+    "Add Campaign SaveTheDogs",
+    "Donate Greg Weekly SaveTheDogs $100",
+    "Donate Greg Monthly SaveTheDogs $200",
+    "Donate Janine Monthly SaveTheDogs $50",
+    "saraza saraza",
+]
+
+
+def run(lines: list[str], repeat: int) -> float:
+    """Returns the best lines/sec out of `repeat` passes over `lines`"""
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            extract_command(line)
+        elapsed = time.perf_counter() - start
+        best = max(best, len(lines) / elapsed)
+
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog='bench_dispatch', description="extract_command throughput")
+    parser.add_argument('--lines', type=int, default=300_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    lines = [SAMPLE_LINES[index % len(SAMPLE_LINES)] for index in range(args.lines)]
+
+    print(f"extract_command: {run(lines, args.repeat):,.0f} lines/sec")
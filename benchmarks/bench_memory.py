@@ -0,0 +1,51 @@
+"""Measures the memory footprint per donation of the model and command representations.
+
+    Usage (from the root folder of the project):
+        python -m benchmarks.bench_memory [--donations N]
+"""
+import argparse
+import logging
+import tracemalloc
+
+from internal.commands import AddCampaign, AddDonation, AddDonor
+from internal.consolidator import Consolidator
+from internal.entry_reporter import EntriesReporter
+from internal.models import Donation, DonationFrequency
+
+
+def measure(build, amount: int) -> float:
+    """Returns the bytes allocated per item by `build` (called `amount` times, keeping every result alive)"""
+    tracemalloc.start()
+    before, _peak = tracemalloc.get_traced_memory()
+    items = [build(index) for index in range(amount)]
+    after, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # the list holding the items is not part of their footprint
+    return (after - before) / amount - 8 if items else 0.0
+
+def consolidated_donations(amount: int) -> float:
+    """Returns the bytes allocated per donation accepted by a Consolidator, reporter entries included"""
+    consolidator = Consolidator(EntriesReporter(logging.getLogger("bench")))
+    consolidator.accept_donor(AddDonor(name="donor", amount=amount * 10))
+    consolidator.accept_campaign(AddCampaign(name="campaign"))
+    commands = [AddDonation(donor_name="donor", frequency=DonationFrequency.MONTHLY, campaign_name="campaign", amount=index % 7 + 1) for index in range(amount)]
+
+    tracemalloc.start()
+    before, _peak = tracemalloc.get_traced_memory()
+    for command in commands:
+        consolidator.accept_donation(command)
+    after, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return (after - before) / amount
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog='bench_memory', description="Memory footprint per donation")
+    parser.add_argument('--donations', type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"Donation model:   {measure(lambda index: Donation(campaign_key='campaign', frequency=DonationFrequency.MONTHLY, amount=index), args.donations):,.0f} bytes/donation")
+    print(f"AddDonation:      {measure(lambda index: AddDonation(donor_name='donor', frequency=DonationFrequency.MONTHLY, campaign_name='campaign', amount=index), args.donations):,.0f} bytes/command")
+    print(f"Consolidated:     {consolidated_donations(args.donations):,.0f} bytes/donation (Donation + reporter entry)")
@@ -0,0 +1,42 @@
+"""Compares the float money path against the integer cents one: parsing amounts, adding them up and formatting the totals.
+
+    Usage (from the root folder of the project):
+        python -m benchmarks.bench_money [--amounts N]
+"""
+import argparse
+import random
+import time
+
+from internal.money import format_cents, parse_cents
+
+
+def float_path(amounts: list[str]) -> str:
+    total = 0.0
+    for amount in amounts:
+        total += float(amount.removeprefix("$"))
+    return str(total)
+
+def cents_path(amounts: list[str]) -> str:
+    total = 0
+    for amount in amounts:
+        total += parse_cents(amount)
+    return format_cents(total)
+
+def timed(path, amounts: list[str]) -> tuple[float, str]:
+    start = time.perf_counter()
+    result = path(amounts)
+    return len(amounts) / (time.perf_counter() - start), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog='bench_money', description="float vs integer cents")
+    parser.add_argument('--amounts', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    generator = random.Random(42)
+    amounts = [f"${generator.randint(1, 50_000)}.{generator.randint(0, 99):02d}" for _ in range(args.amounts)]
+    exact_total = format_cents(sum(int(amount[1:].replace(".", "")) for amount in amounts))
+
+    for name, path in [("float", float_path), ("cents", cents_path)]:
+        amounts_per_second, total = timed(path, amounts)
+        print(f"{name:>6}: {amounts_per_second:,.0f} amounts/sec total={total} exact={total == exact_total}")
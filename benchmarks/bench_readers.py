@@ -0,0 +1,59 @@
+"""Compares the ways of reading lines out of an input file: a text mode file object, chunked binary reads (`iter_lines`) and the memory
+    mapped reader (`iter_mmap_lines`). Inputs of several GB can be generated with a large --donations value.
+
+    Usage (from the root folder of the project):
+        python -m benchmarks.bench_readers [--input <path>] [--donations N] [--repeat N]
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, Iterator
+
+from benchmarks.synthetic import add_config_arguments, config_from_args, write_lines
+from internal.streaming import iter_lines, iter_mmap_lines
+
+
+def text_mode_lines(path: str) -> Iterator[str]:
+    with open(path, 'r', encoding='utf-8', errors='replace', newline='') as source_file:
+        for line in source_file:
+            yield line.removesuffix('\n')
+
+def chunked_lines(path: str) -> Iterator[str]:
+    with open(path, 'rb') as source_file:
+        yield from iter_lines(source_file)
+
+def mmap_lines(path: str) -> Iterator[str]:
+    with open(path, 'rb') as source_file:
+        yield from iter_mmap_lines(source_file)
+
+READERS: dict[str, Callable[[str], Iterator[str]]] = {"text mode": text_mode_lines, "chunked": chunked_lines, "mmap": mmap_lines}
+
+def timed(reader: Callable[[str], Iterator[str]], path: str) -> tuple[int, float]:
+    start = time.perf_counter()
+    lines = 0
+    for _ in reader(path):
+        lines += 1
+
+    return lines, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog='bench_readers', description="Line readers throughput")
+    add_config_arguments(parser)
+    parser.add_argument('--input', type=str, help="Use this input file instead of generating one")
+    parser.add_argument('--repeat', type=int, default=3, help="Times each reader runs, the best time is reported")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        path = args.input
+        if not path:
+            path = os.path.join(temporary_directory, "synthetic.txt")
+            write_lines(path, config_from_args(args))
+
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"Input: {size_mb:,.1f} MB")
+
+        for name, reader in READERS.items():
+            lines, seconds = min((timed(reader, path) for _ in range(args.repeat)), key=lambda result: result[1])
+            print(f"{name:>10}: {lines / seconds:>12,.0f} lines/sec {size_mb / seconds:>8,.1f} MB/sec")
@@ -0,0 +1,81 @@
+"""Measures the startup cost of the CLI on a small input: the modules it imports (with `-X importtime`) and the wall clock time of whole runs,
+    of the script and, optionally, of a standalone executable built with PyInstaller (which ignores `-X importtime`, so only its wall clock
+    time is reported).
+
+    Usage (from the root folder of the project):
+        python -m benchmarks.bench_startup [--input <path>] [--runs N] [--executable dist/recurring]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "recurring.py")
+
+OPTIONAL_MODULES = (
+    "asyncio", "gzip", "json", "logging.handlers", "numpy", "pickle", "sqlite3", "ssl", "subprocess", "venv",
+    "internal.columnar", "internal.command_log", "internal.follow", "internal.parallel", "internal.queued_logging", "internal.report_cache", "internal.server", "internal.stats",
+)
+"""Modules only some modes use, which the plain processing of an input must not import (bz2 and lzma are not listed: argparse imports
+   shutil, which imports them)"""
+
+
+def _importtime_lines(output: str):
+    # e.g. "import time:       838 |      10732 |     re", nested imports are indented two more spaces
+    for line in output.splitlines():
+        if line.startswith("import time:") and "cumulative" not in line:
+            _, cumulative, name = line.removeprefix("import time:").split("|")
+            yield name.strip(), int(cumulative), (len(name) - len(name.lstrip()) - 1) // 2
+
+def parse_importtime(output: str) -> dict[str, int]:
+    """Returns the cumulative import time, in microseconds, of each module listed in the `-X importtime` output of a run"""
+    return {name: cumulative for name, cumulative, _ in _importtime_lines(output)}
+
+def total_import_time(output: str) -> int:
+    """Returns the time spent importing modules in a run, in microseconds, adding up the modules imported at the top level"""
+    return sum(cumulative for _, cumulative, depth in _importtime_lines(output) if depth == 0)
+
+def script_imports(*args: str) -> str:
+    """Runs the script with `-X importtime` and returns its importtime output"""
+    return subprocess.run([sys.executable, "-X", "importtime", SCRIPT, *args], cwd=ROOT, stdin=subprocess.DEVNULL,
+                          capture_output=True, text=True, check=True).stderr
+
+def wall_clock(command: list[str], runs: int) -> float:
+    """Returns the median of the wall clock seconds of running a command several times"""
+    times = list()
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog='bench_startup', description="CLI startup time")
+    parser.add_argument('--input', type=str, default=os.path.join(ROOT, "input.txt"), help="Input processed by each run")
+    parser.add_argument('--runs', type=int, default=20, help="Times each command runs, the median is reported")
+    parser.add_argument('--executable', type=str, help="Also time a standalone executable built with PyInstaller")
+    args = parser.parse_args()
+
+    output = script_imports(args.input)
+    modules = parse_importtime(output)
+    print(f"Modules imported: {len(modules)}, import time: {total_import_time(output) / 1000:.1f} ms")
+    for name, cumulative in sorted(modules.items(), key=lambda item: item[1], reverse=True)[:10]:
+        print(f"  {name:<32}{cumulative / 1000:>8.1f} ms")
+
+    loaded_optional = [name for name in OPTIONAL_MODULES if name in modules]
+    print(f"Optional modules imported: {', '.join(loaded_optional) or 'none'}")
+
+    baseline = wall_clock([sys.executable, "-c", "pass"], args.runs)
+    script = wall_clock([sys.executable, SCRIPT, args.input], args.runs)
+    print(f"{'python -c pass':>20}: {baseline * 1000:>8.1f} ms")
+    print(f"{'recurring.py':>20}: {script * 1000:>8.1f} ms ({(script - baseline) * 1000:.1f} ms over the bare interpreter)")
+
+    if args.executable:
+        executable = wall_clock([os.path.abspath(args.executable), args.input], args.runs)
+        print(f"{os.path.basename(args.executable):>20}: {executable * 1000:>8.1f} ms")
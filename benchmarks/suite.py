@@ -0,0 +1,179 @@
+"""Throughput benchmark suite for the ingestion pipeline.
+
+    It generates a deterministic synthetic input (see benchmarks/synthetic.py) and times, each one in a fresh process so peak RSS
+    is measured per stage:
+
+    - extract_command: parsing lines into commands
+    - process_command_line: parsing, validating and applying lines, with reporter bookkeeping
+    - accept: Consolidator.accept_* over already parsed commands
+    - report: create_recurring_report_from over an already consolidated input
+    - report_cache: ReportCache.render over the same input, applying one more line between renders
+    - end_to_end: streaming the input file through process_command_lines and rendering the report
+
+    Usage (from the root folder of the project):
+        python -m benchmarks.suite [--donations N] [--retention counts] [--json results.json] ...
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+from benchmarks.synthetic import add_config_arguments, config_from_args, write_lines
+from internal.consolidator import Consolidator
+from internal.core_processing import create_recurring_report_from, extract_command, process_command_line, process_command_lines
+from internal.entry_reporter import EntriesReporter
+from internal.entry_stores import ReporterRetention
+from internal.report_cache import ReportCache
+from internal.streaming import iter_lines
+
+
+STAGES: Dict[str, Callable[[argparse.Namespace], tuple[int, float]]] = dict()
+
+
+def stage(function: Callable[[argparse.Namespace], tuple[int, float]]):
+    """Registers a stage. Stages return the amount of items processed and the seconds it took."""
+    STAGES[function.__name__.removeprefix("stage_")] = function
+    return function
+
+def _read_lines(path: str) -> list[str]:
+    with open(path, 'rb') as source_file:
+        return list(iter_lines(source_file))
+
+def _build_consolidator(args: argparse.Namespace) -> Consolidator:
+    return Consolidator(EntriesReporter(logging.getLogger("benchmark"), retention=args.retention))
+
+@stage
+def stage_extract_command(args: argparse.Namespace) -> tuple[int, float]:
+    lines = _read_lines(args.input)
+
+    start = time.perf_counter()
+    for line in lines:
+        extract_command(line)
+
+    return len(lines), time.perf_counter() - start
+
+@stage
+def stage_process_command_line(args: argparse.Namespace) -> tuple[int, float]:
+    lines = _read_lines(args.input)
+    consolidator = _build_consolidator(args)
+
+    start = time.perf_counter()
+    for line in lines:
+        process_command_line(consolidator, consolidator._reporter, line)
+
+    return len(lines), time.perf_counter() - start
+
+@stage
+def stage_accept(args: argparse.Namespace) -> tuple[int, float]:
+    commands = [command for command in map(extract_command, _read_lines(args.input)) if command]
+    consolidator = _build_consolidator(args)
+
+    start = time.perf_counter()
+    for command in commands:
+        command.dispatch_to_executor(consolidator)
+
+    return len(commands), time.perf_counter() - start
+
+@stage
+def stage_report(args: argparse.Namespace) -> tuple[int, float]:
+    consolidator = _build_consolidator(args)
+    process_command_lines(consolidator, consolidator._reporter, _read_lines(args.input))
+
+    start = time.perf_counter()
+    for _ in range(args.report_repeat):
+        create_recurring_report_from(consolidator)
+
+    return args.report_repeat * (len(consolidator.all_donors) + len(consolidator.all_campaigns)), time.perf_counter() - start
+
+@stage
+def stage_report_cache(args: argparse.Namespace) -> tuple[int, float]:
+    lines = _read_lines(args.input)
+    consolidator = _build_consolidator(args)
+    cache = ReportCache(consolidator)
+    process_command_lines(consolidator, consolidator._reporter, lines[:-args.report_repeat])
+    cache.render()
+
+    start = time.perf_counter()
+    for line in lines[-args.report_repeat:]:
+        process_command_line(consolidator, consolidator._reporter, line)
+        cache.render()
+
+    return args.report_repeat * (len(consolidator.all_donors) + len(consolidator.all_campaigns)), time.perf_counter() - start
+
+@stage
+def stage_end_to_end(args: argparse.Namespace) -> tuple[int, float]:
+    consolidator = _build_consolidator(args)
+    lines_count = 0
+
+    def counted(lines):
+        nonlocal lines_count
+        for line in lines:
+            lines_count += 1
+            yield line
+
+    start = time.perf_counter()
+    with open(args.input, 'rb') as source_file:
+        process_command_lines(consolidator, consolidator._reporter, counted(iter_lines(source_file)))
+    create_recurring_report_from(consolidator)
+
+    return lines_count, time.perf_counter() - start
+
+def peak_rss_mb() -> float:
+    """Returns the peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_stage_in_subprocess(name: str, args: argparse.Namespace) -> Dict[str, float]:
+    command = [sys.executable, '-m', 'benchmarks.suite', '--stage', name, '--input', args.input,
+               '--retention', args.retention.value, '--report-repeat', str(args.report_repeat)]
+    completed = subprocess.run(command, check=True, capture_output=True, text=True)
+
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='suite', description="Ingestion pipeline benchmarks")
+    add_config_arguments(parser)
+    parser.add_argument('--stage', choices=list(STAGES), help="Run a single stage in this process (used internally)")
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--input', type=str, help="Use this input file instead of generating one")
+    parser.add_argument('--retention', type=ReporterRetention, choices=list(ReporterRetention), default=ReporterRetention.COUNTS)
+    parser.add_argument('--report-repeat', type=int, default=20)
+    parser.add_argument('--json', type=str, help="File to write the results to as JSON")
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_argument_parser().parse_args()
+
+    if args.stage:
+        # same logging setup as the CLI without --verbose
+        logging.basicConfig(level=logging.CRITICAL)
+        logging.getLogger("benchmark").setLevel(logging.CRITICAL)
+
+        items, seconds = STAGES[args.stage](args)
+        print(json.dumps({"stage": args.stage, "items": items, "seconds": seconds, "items_per_sec": items / seconds if seconds else 0.0, "peak_rss_mb": peak_rss_mb()}))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        if not args.input:
+            args.input = os.path.join(temporary_directory, "synthetic.txt")
+            lines_written = write_lines(args.input, config_from_args(args))
+            print(f"Generated {lines_written:,} lines")
+
+        results = [run_stage_in_subprocess(name, args) for name in args.stages]
+
+    print(f"{'stage':<22}{'items':>12}{'seconds':>10}{'items/sec':>14}{'peak RSS MB':>14}")
+    for result in results:
+        print(f"{result['stage']:<22}{result['items']:>12,}{result['seconds']:>10.3f}{result['items_per_sec']:>14,.0f}{result['peak_rss_mb']:>14.1f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as json_file:
+            json.dump(results, json_file, indent=4)
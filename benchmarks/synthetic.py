@@ -0,0 +1,111 @@
+"""Deterministic generator of synthetic command lines for benchmarks.
+
+    Usage (from the root folder of the project):
+        python -m benchmarks.synthetic <output file> [--donations N] [--donors N] [--campaigns N] ...
+"""
+import argparse
+import random
+from typing import Iterator
+
+
+class SyntheticConfig(object):
+    """
+        Shape of the synthetic input:
+
+        - donors / campaigns: cardinality of donors and campaigns
+        - donations: amount of Donate lines
+        - weekly_ratio: share of donations with weekly frequency (the rest are monthly)
+        - malformed_ratio: share of donation lines that are replaced by a malformed line
+        - duplicate_ratio: share of donors and campaigns whose Add command is repeated (with a different case), to exercise first-wins uniqueness
+        - seed: seed of the random generator, the same config always generates the same lines
+    """
+    def __init__(self, donors: int = 1_000, campaigns: int = 100, donations: int = 100_000, weekly_ratio: float = 0.3,
+                 malformed_ratio: float = 0.02, duplicate_ratio: float = 0.01, seed: int = 42):
+        self.donors = donors
+        self.campaigns = campaigns
+        self.donations = donations
+        self.weekly_ratio = weekly_ratio
+        self.malformed_ratio = malformed_ratio
+        self.duplicate_ratio = duplicate_ratio
+        self.seed = seed
+
+
+_MALFORMED_TEMPLATES = (
+    "Donate {donor} Monthly {campaign} $as{amount}",
+    "Donate {donor} Yearly {campaign} ${amount}",
+    "Donate {donor} {campaign}",
+    "Add Donor {donor}",
+    "saraza {donor} {campaign} {amount}",
+)
+
+
+def generate_lines(config: SyntheticConfig) -> Iterator[str]:
+    """Yields the synthetic command lines (without line terminator) described by `config`.
+
+        Donors and campaigns are added first, so almost every well formed donation can be applied. Each donor gets funds enough to
+        cover its share of donations most of the time, so both accepted and rejected-for-funds donations show up.
+
+        Keyword arguments:
+        - config -- SyntheticConfig describing the input
+
+        Returns:
+        Iterator[str]
+    """
+    generator = random.Random(config.seed)
+    average_donations = max(1, config.donations // max(1, config.donors))
+
+    for index in range(config.donors):
+        yield f"Add Donor Donor{index} ${generator.randint(1, 3 * average_donations) * 400}"
+        if generator.random() < config.duplicate_ratio:
+            yield f"Add Donor DONOR{index} ${generator.randint(1, 1000)}"
+
+    for index in range(config.campaigns):
+        yield f"Add Campaign Campaign{index}"
+        if generator.random() < config.duplicate_ratio:
+            yield f"Add Campaign CAMPAIGN{index}"
+
+    for _ in range(config.donations):
+        donor = f"Donor{generator.randrange(config.donors)}"
+        campaign = f"Campaign{generator.randrange(config.campaigns)}"
+        amount = f"{generator.randint(1, 200)}.{generator.randrange(100):02d}"
+
+        if generator.random() < config.malformed_ratio:
+            yield generator.choice(_MALFORMED_TEMPLATES).format(donor=donor, campaign=campaign, amount=amount)
+        else:
+            frequency = "Weekly" if generator.random() < config.weekly_ratio else "Monthly"
+            yield f"Donate {donor} {frequency} {campaign} ${amount}"
+
+def write_lines(path: str, config: SyntheticConfig) -> int:
+    """Writes the synthetic lines described by `config` to a file, returning the amount of lines written"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as output:
+        for line in generate_lines(config):
+            output.write(line)
+            output.write("\n")
+            count += 1
+
+    return count
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds to a parser the arguments needed to build a SyntheticConfig with `config_from_args`"""
+    defaults = SyntheticConfig()
+    parser.add_argument('--donors', type=int, default=defaults.donors)
+    parser.add_argument('--campaigns', type=int, default=defaults.campaigns)
+    parser.add_argument('--donations', type=int, default=defaults.donations)
+    parser.add_argument('--weekly-ratio', type=float, default=defaults.weekly_ratio)
+    parser.add_argument('--malformed-ratio', type=float, default=defaults.malformed_ratio)
+    parser.add_argument('--duplicate-ratio', type=float, default=defaults.duplicate_ratio)
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+
+def config_from_args(args: argparse.Namespace) -> SyntheticConfig:
+    return SyntheticConfig(donors=args.donors, campaigns=args.campaigns, donations=args.donations, weekly_ratio=args.weekly_ratio,
+                           malformed_ratio=args.malformed_ratio, duplicate_ratio=args.duplicate_ratio, seed=args.seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog='synthetic', description="Writes a synthetic input file")
+    parser.add_argument('output', type=str)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    print(f"{write_lines(args.output, config_from_args(args)):,} lines written to {args.output}")
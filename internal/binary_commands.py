@@ -0,0 +1,212 @@
+import struct
+from typing import BinaryIO, Iterable, Iterator
+
+from internal.commands import AddCampaign, AddDonation, AddDonor, Command, CommandExecutor
+from internal.core_processing import parse_command
+from internal.models import DonationFrequency
+from internal.streaming import DEFAULT_CHUNK_SIZE
+
+
+MAGIC = b"RDBC"
+BINARY_COMMANDS_VERSION = 1
+
+_HEADER = struct.Struct("<4sB")
+
+# payload length, tag
+_RECORD_HEADER = struct.Struct("<HB")
+# initial funds in cents (the name bytes follow)
+_DONOR_PAYLOAD = struct.Struct("<q")
+# amount in cents, frequency index, donor name length (the donor and campaign name bytes follow)
+_DONATION_PAYLOAD = struct.Struct("<qBH")
+
+_DONOR_TAG = 1
+_CAMPAIGN_TAG = 2
+_DONATION_TAG = 3
+
+_FREQUENCIES = tuple(DonationFrequency)
+_FREQUENCY_INDEXES = {frequency: index for index, frequency in enumerate(_FREQUENCIES)}
+
+_NAME_ENCODING = 'utf-8'
+
+
+def encode_command(command: Command) -> bytes:
+    """
+        Encodes a command as a binary record: a header with the length of the payload and the tag of the command, followed by the payload.
+
+        - Add Donor: funds in cents and the name
+        - Add Campaign: the name
+        - Donate: amount in cents, frequency, length of the donor name, the donor name and the campaign name
+
+        Raises ValueError if the command can't be encoded or it does not fit in a record (amounts and funds up to 2**63 - 1 cents, payloads
+        up to 65535 bytes).
+
+        Keyword arguments:
+        - command -- AddDonor, AddCampaign or AddDonation instance
+
+        Returns:
+        bytes
+    """
+    try:
+        payload, tag = _encode_payload(command)
+        return _RECORD_HEADER.pack(len(payload), tag) + payload
+    except struct.error as exc:
+        raise ValueError(f"{type(command).__name__} does not fit in a binary record: {exc}")
+
+def _encode_payload(command: Command) -> tuple[bytes, int]:
+    if isinstance(command, AddDonation):
+        donor_name = command.donor_name.encode(_NAME_ENCODING)
+        payload = _DONATION_PAYLOAD.pack(command.amount, _FREQUENCY_INDEXES[command.frequency], len(donor_name)) + donor_name + command.campaign_name.encode(_NAME_ENCODING)
+        tag = _DONATION_TAG
+    elif isinstance(command, AddDonor):
+        payload = _DONOR_PAYLOAD.pack(command.amount) + command.name.encode(_NAME_ENCODING)
+        tag = _DONOR_TAG
+    elif isinstance(command, AddCampaign):
+        payload = command.name.encode(_NAME_ENCODING)
+        tag = _CAMPAIGN_TAG
+    else:
+        raise ValueError(f"{type(command).__name__} can't be encoded")
+
+    return payload, tag
+
+def write_binary_commands(stream: BinaryIO, commands: Iterable[Command]) -> int:
+    """
+        Writes commands to a binary stream in the binary command format, header included.
+
+        Keyword arguments:
+        - stream -- binary stream to write to
+        - commands -- commands to encode
+
+        Returns:
+        The amount of commands written
+    """
+    stream.write(_HEADER.pack(MAGIC, BINARY_COMMANDS_VERSION))
+
+    count = 0
+    for command in commands:
+        stream.write(encode_command(command))
+        count += 1
+
+    return count
+
+def convert_text_to_binary(lines: Iterable[str], stream: BinaryIO) -> tuple[int, int]:
+    """
+        Converts text command lines to the binary command format. Lines are parsed and validated like `process_command_line` does, lines it would
+        discard can't be represented and are left out, and so are commands that do not fit in a record (see `encode_command`).
+
+        Keyword arguments:
+        - lines -- text command lines
+        - stream -- binary stream to write to
+
+        Returns:
+        A tuple with the amount of commands written and the amount of lines left out
+    """
+    stream.write(_HEADER.pack(MAGIC, BINARY_COMMANDS_VERSION))
+
+    written, skipped = 0, 0
+    for line in lines:
+        command = parse_command(line).command
+        if command is None:
+            skipped += 1
+            continue
+
+        try:
+            record = encode_command(command)
+        except ValueError:
+            skipped += 1
+            continue
+
+        stream.write(record)
+        written += 1
+
+    return written, skipped
+
+def is_binary_commands(stream: BinaryIO) -> bool:
+    """Returns whether a binary stream starts with the header of the binary command format, looking at it without consuming it"""
+    return hasattr(stream, 'peek') and stream.peek(len(MAGIC))[:len(MAGIC)] == MAGIC
+
+def iter_binary_commands(stream: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Command]:
+    """
+        Decodes the commands of a binary stream in the binary command format. The stream is read in chunks and every complete record of a chunk is
+        decoded in a tight loop, only a trailing partial record is carried over to the next one. Donor and campaign names repeat a lot, so their
+        decoded strings are cached by their bytes. Raises ValueError if the stream is not in the binary command format or it is corrupted.
+
+        Keyword arguments:
+        - stream -- binary stream to read from
+        - chunk_size -- amount of bytes to read on each call
+
+        Returns:
+        Iterator[Command]
+    """
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError("Not a binary commands stream: it is too short")
+
+    magic, version = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("Not a binary commands stream: unexpected header")
+    if version != BINARY_COMMANDS_VERSION:
+        raise ValueError(f"Unsupported binary commands version: {version}")
+
+    unpack_header = _RECORD_HEADER.unpack_from
+    header_size = _RECORD_HEADER.size
+    unpack_donation = _DONATION_PAYLOAD.unpack_from
+    donation_size = _DONATION_PAYLOAD.size
+    unpack_donor = _DONOR_PAYLOAD.unpack_from
+    donor_size = _DONOR_PAYLOAD.size
+    frequencies = len(_FREQUENCIES)
+    names: dict[bytes, str] = dict()
+
+    pending = b''
+    while chunk := stream.read(chunk_size):
+        data = pending + chunk if pending else chunk
+        size = len(data)
+        offset = 0
+
+        while offset + header_size <= size:
+            length, tag = unpack_header(data, offset)
+            start = offset + header_size
+            end = start + length
+            if end > size:
+                break
+            offset = end
+
+            if tag == _DONATION_TAG:
+                if length < donation_size:
+                    raise ValueError("Corrupted binary commands stream: donation record too short")
+                amount, frequency, donor_length = unpack_donation(data, start)
+                donor_end = start + donation_size + donor_length
+                if donor_end > end or frequency >= frequencies:
+                    raise ValueError("Corrupted binary commands stream: invalid donation record")
+                donor_name = data[start + donation_size:donor_end]
+                campaign_name = data[donor_end:end]
+                yield AddDonation(names.get(donor_name) or names.setdefault(donor_name, donor_name.decode(_NAME_ENCODING)), _FREQUENCIES[frequency],
+                                  names.get(campaign_name) or names.setdefault(campaign_name, campaign_name.decode(_NAME_ENCODING)), amount)
+            elif tag == _DONOR_TAG:
+                if length < donor_size:
+                    raise ValueError("Corrupted binary commands stream: donor record too short")
+                yield AddDonor(data[start + donor_size:end].decode(_NAME_ENCODING), unpack_donor(data, start)[0])
+            elif tag == _CAMPAIGN_TAG:
+                yield AddCampaign(data[start:end].decode(_NAME_ENCODING))
+            else:
+                raise ValueError(f"Corrupted binary commands stream: unknown record tag {tag}")
+
+        pending = data[offset:]
+
+    if pending:
+        raise ValueError("Corrupted binary commands stream: it ends in the middle of a record")
+
+def process_binary_commands(executor: CommandExecutor, stream: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+        Dispatches every command of a binary stream in the binary command format to an executor, like `process_command_lines` does for text lines.
+        There is no per line logging or error reporting to keep in order here, so runs of donations are executed in batches (see
+        `CommandExecutor.accept_commands`).
+
+        Keyword arguments:
+        - executor -- CommandExecutor (e.g. a Consolidator) that executes the commands
+        - stream -- binary stream to read from
+        - chunk_size -- amount of bytes to read on each call
+
+        Returns:
+        The amount of commands dispatched
+    """
+    return executor.accept_commands(iter_binary_commands(stream, chunk_size))
@@ -0,0 +1,277 @@
+import os
+import struct
+from typing import BinaryIO, Dict, Iterator
+
+from internal.consolidator import Consolidator
+from internal.models import Campaign, DonationFrequency, Donor
+from internal.streaming import DEFAULT_CHUNK_SIZE
+
+
+MAGIC = b"RDCL"
+COMMAND_LOG_VERSION = 1
+
+_HEADER = struct.Struct("<4sB")
+
+_DONOR_TAG = 1
+_CAMPAIGN_TAG = 2
+_DONATION_TAG = 3
+
+# tag, name length, initial funds in cents (the name bytes follow)
+_DONOR_RECORD = struct.Struct("<BHq")
+# tag, name length (the name bytes follow)
+_CAMPAIGN_RECORD = struct.Struct("<BH")
+# tag, donor id, campaign id, amount in cents, weekly flag
+_DONATION_RECORD = struct.Struct("<BIIq?")
+
+_NAME_ENCODING = 'utf-8'
+
+
+class CommandLogWriter(object):
+    """CommandLogWriter appends the commands a Consolidator applies successfully to a compact binary log, so its state can be rebuilt
+       with `replay_command_log` without parsing nor validating the text input again.
+
+       Each record is a fixed size struct starting with a tag byte. Donors and campaigns get an integer id in the order they are logged,
+       so donations (the bulk of the log) refer to them by id and take 18 bytes no matter how long the names are.
+
+       Records are buffered, `flush` or `close` hand them to the OS and `close(sync=True)` also waits for them to be on disk.
+    """
+    def __init__(self, path: str):
+        """
+            Constructor for this class. If the log already exists new records are appended to it, after dropping a record cut short at its end (if any).
+            The records appended refer to the donors and campaigns of the ones already there, so the consolidator has to hold the state the log
+            describes (see `replay_command_log`).
+
+            Keyword arguments:
+
+            - path -- path of the log file
+        """
+        self.path = path
+        self._donor_ids: Dict[str, int] = dict()
+        self._campaign_ids: Dict[str, int] = dict()
+
+        if os.path.exists(path) and os.path.getsize(path):
+            valid_size = self._load_ids()
+            self._file = open(path, 'ab')
+            self._file.truncate(valid_size)
+        else:
+            self._file = open(path, 'wb')
+            self._file.write(_HEADER.pack(MAGIC, COMMAND_LOG_VERSION))
+
+    # records are packed before the donor or campaign gets its id: a value that doesn't fit raises struct.error and leaves the ids as they were
+
+    def append_donor(self, name: str, funds: int) -> None:
+        encoded_name = name.encode(_NAME_ENCODING)
+        record = _DONOR_RECORD.pack(_DONOR_TAG, len(encoded_name), funds)
+        self._file.write(record)
+        self._file.write(encoded_name)
+        self._donor_ids[name.lower()] = len(self._donor_ids)
+
+    def append_campaign(self, name: str) -> None:
+        encoded_name = name.encode(_NAME_ENCODING)
+        record = _CAMPAIGN_RECORD.pack(_CAMPAIGN_TAG, len(encoded_name))
+        self._file.write(record)
+        self._file.write(encoded_name)
+        self._campaign_ids[name.lower()] = len(self._campaign_ids)
+
+    def append_donation(self, donor_key: str, campaign_key: str, frequency: DonationFrequency, amount: int) -> None:
+        self._file.write(_DONATION_RECORD.pack(_DONATION_TAG, self._donor_ids[donor_key], self._campaign_ids[campaign_key], amount,
+                                               frequency == DonationFrequency.WEEKLY))
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def has_records(self) -> bool:
+        """Returns whether the log holds any record, e.g. the ones of previous runs when it was opened"""
+        return self.size() > _HEADER.size
+
+    def size(self) -> int:
+        """Flushes the pending records and returns the size of the log in bytes"""
+        self._file.flush()
+        return os.fstat(self._file.fileno()).st_size
+
+    def truncate(self, size: int) -> None:
+        """
+            Drops every record after the first `size` bytes of the log, e.g. the ones a run that died wrote after the snapshot another run
+            resumes from. Raises ValueError if the log is shorter than that.
+
+            Keyword arguments:
+
+            - size -- size of the log to go back to, as returned by `size`
+        """
+        current_size = self.size()
+        if size > current_size:
+            raise ValueError(f"{self.path} has {current_size} bytes, less than the {size} bytes it had when the snapshot was taken")
+
+        self._file.truncate(size)
+        self._donor_ids.clear()
+        self._campaign_ids.clear()
+        self._load_ids()
+
+    def close(self, sync: bool = False) -> None:
+        """
+            Flushes the pending records and closes the log
+
+            Keyword arguments:
+
+            - sync -- whether to wait until the records are on disk
+        """
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+        self._file.close()
+
+    def _load_ids(self) -> int:
+        """Rebuilds the ids of the donors and campaigns already logged and returns the size of the log up to its last complete record"""
+        valid_size = _HEADER.size
+        with open(self.path, 'rb') as log_file:
+            for tag, name, valid_size in _decode_records(log_file):
+                if tag == _DONOR_TAG:
+                    self._donor_ids[name.lower()] = len(self._donor_ids)
+                elif tag == _CAMPAIGN_TAG:
+                    self._campaign_ids[name.lower()] = len(self._campaign_ids)
+
+        return valid_size
+
+
+def check_command_log(path: str) -> None:
+    """Raises ValueError if there is a file at `path` that is not a command log CommandLogWriter can append to. An empty file or no file at
+       all are fine, the log gets created."""
+    if os.path.exists(path) and os.path.getsize(path):
+        with open(path, 'rb') as log_file:
+            _check_header(log_file)
+
+
+def _check_header(log_file: BinaryIO) -> None:
+    header = log_file.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError("Not a command log: it is too short")
+
+    magic, version = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("Not a command log: unexpected magic bytes")
+    if version != COMMAND_LOG_VERSION:
+        raise ValueError(f"Unsupported command log version: {version}")
+
+
+def _decode_records(log_file: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple[int, str | None, int]]:
+    """Yields (tag, name, offset right after the record) for every record, with a None name for donations, stopping at a truncated last record.
+       The log is read in chunks, only a trailing partial record is carried over to the next one."""
+    _check_header(log_file)
+
+    start = _HEADER.size
+    pending = b''
+    while chunk := log_file.read(chunk_size):
+        data = pending + chunk if pending else chunk
+        size = len(data)
+        offset = 0
+
+        while offset < size:
+            tag = data[offset]
+            if tag == _DONATION_TAG:
+                end = offset + _DONATION_RECORD.size
+                if end > size:
+                    break
+                name = None
+            elif tag == _DONOR_TAG:
+                if offset + _DONOR_RECORD.size > size:
+                    break
+                _, name_length, _ = _DONOR_RECORD.unpack_from(data, offset)
+                end = offset + _DONOR_RECORD.size + name_length
+                if end > size:
+                    break
+                name = data[end - name_length:end].decode(_NAME_ENCODING)
+            elif tag == _CAMPAIGN_TAG:
+                if offset + _CAMPAIGN_RECORD.size > size:
+                    break
+                _, name_length = _CAMPAIGN_RECORD.unpack_from(data, offset)
+                end = offset + _CAMPAIGN_RECORD.size + name_length
+                if end > size:
+                    break
+                name = data[end - name_length:end].decode(_NAME_ENCODING)
+            else:
+                raise ValueError(f"Corrupted command log: unknown record tag {tag} at offset {start + offset}")
+
+            offset = end
+            yield tag, name, start + offset
+
+        pending = data[offset:]
+        start += offset
+
+
+def replay_command_log(path: str, consolidator: Consolidator, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+        Rebuilds the state of a consolidator from a command log written by CommandLogWriter. Records are applied as they are, without
+        reporter entries, since they were validated when they were logged. A record cut short at the end of the log (the process died while
+        writing it) is ignored. The log is read in chunks, so memory usage does not grow with its size.
+
+        Keyword arguments:
+        - path -- path of the log file
+        - consolidator -- Consolidator the donors, campaigns and donations are loaded into, replacing its current state
+        - chunk_size -- amount of bytes to read on each call
+
+        Returns:
+        The amount of records applied
+    """
+    donors: list[Donor] = list()
+    campaigns: list[Campaign] = list()
+    apply_donation = consolidator.apply_donation
+    # donors and campaigns are restored in the order they were logged, so the ids of the log are the ids the consolidator gives their keys
+    append_column = consolidator.donation_columns.append if consolidator.donation_columns is not None else None
+    unpack_donation = _DONATION_RECORD.unpack_from
+    donation_size = _DONATION_RECORD.size
+    records = 0
+
+    with open(path, 'rb') as log_file:
+        _check_header(log_file)
+
+        start = _HEADER.size
+        pending = b''
+        while chunk := log_file.read(chunk_size):
+            data = pending + chunk if pending else chunk
+            size = len(data)
+            offset = 0
+
+            while offset < size:
+                tag = data[offset]
+                if tag == _DONATION_TAG:
+                    if offset + donation_size > size:
+                        break
+                    _, donor_id, campaign_id, amount, weekly = unpack_donation(data, offset)
+                    offset += donation_size
+                    if weekly:
+                        apply_donation(donors[donor_id], campaigns[campaign_id], DonationFrequency.WEEKLY, amount, amount * 4)
+                    else:
+                        apply_donation(donors[donor_id], campaigns[campaign_id], DonationFrequency.MONTHLY, amount, amount)
+                    if append_column is not None:
+                        append_column(donor_id, campaign_id, DonationFrequency.WEEKLY if weekly else DonationFrequency.MONTHLY, amount)
+                elif tag == _DONOR_TAG:
+                    if offset + _DONOR_RECORD.size > size:
+                        break
+                    _, name_length, funds = _DONOR_RECORD.unpack_from(data, offset)
+                    end = offset + _DONOR_RECORD.size + name_length
+                    if end > size:
+                        break
+                    name = data[end - name_length:end].decode(_NAME_ENCODING)
+                    donors.append(Donor(name.lower(), name, funds))
+                    offset = end
+                elif tag == _CAMPAIGN_TAG:
+                    if offset + _CAMPAIGN_RECORD.size > size:
+                        break
+                    _, name_length = _CAMPAIGN_RECORD.unpack_from(data, offset)
+                    end = offset + _CAMPAIGN_RECORD.size + name_length
+                    if end > size:
+                        break
+                    name = data[end - name_length:end].decode(_NAME_ENCODING)
+                    campaigns.append(Campaign(name.lower(), name, 0))
+                    offset = end
+                else:
+                    raise ValueError(f"Corrupted command log: unknown record tag {tag} at offset {start + offset}")
+
+                records += 1
+
+            pending = data[offset:]
+            start += offset
+
+    consolidator.restore_state({"donors": {donor.key: donor for donor in donors}, "campaigns": {campaign.key: campaign for campaign in campaigns}})
+
+    return records
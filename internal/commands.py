@@ -1,14 +1,83 @@
 
 from abc import abstractmethod
 from enum import Enum
-from typing import Generic, Self, TypeVar
+from typing import Any, Dict, Generic, Iterable, Self, TypeVar
 
 from internal.models import DonationFrequency
+from internal.money import parse_cents
 
 AddDonation = TypeVar(Generic())
 AddDonor = TypeVar(Generic())
 AddCampaign = TypeVar(Generic())
 
+_FREQUENCIES: Dict[str, DonationFrequency] = {frequency.value: frequency for frequency in DonationFrequency}
+
+DEFAULT_DONATIONS_BATCH_SIZE = 4096
+
+MAX_NAME_BYTES = 0xFFFF
+"""Longest name, in UTF-8 bytes, a command accepts: the binary command format and the command log store name lengths in 2 bytes"""
+MAX_AMOUNT_CENTS = (1 << 63) - 1
+"""Largest amount of cents (in absolute value) a command accepts: the binary formats store amounts as signed 8 byte integers"""
+
+class ParseResult(object):
+    """
+        ParseResult is the outcome of parsing a line into a command. It never raises, so a rejected line is as cheap to process as an accepted one.
+        It holds:
+
+        - command: the Command instance, when the line could be parsed
+        - reason: description of why the line got rejected, when it could not
+        - malformed: whether the line got rejected because one of its values could not be converted (instead of not matching any command at all)
+    """
+    __slots__ = ('command', 'reason', 'malformed')
+
+    def __init__(self, command = None, reason: str | None = None, malformed: bool = False):
+        """
+            Constructor for this class. Prefer `parsed` and `rejected` class methods.
+
+            Keyword arguments:
+
+            - command -- parsed command, if any
+            - reason -- description of why the line got rejected
+            - malformed -- whether the rejection comes from a value that could not be converted
+        """
+        self.command = command
+        self.reason = reason
+        self.malformed = malformed
+
+    @classmethod
+    def parsed(cls, command) -> Self:
+        """Returns a result holding a successfully parsed command"""
+        return cls(command=command)
+
+    @classmethod
+    def rejected(cls, reason: str, malformed: bool = False) -> Self:
+        """Returns a result for a line that could not be turned into a command"""
+        return cls(reason=reason, malformed=malformed)
+
+    def __bool__(self) -> bool:
+        return self.command is not None
+
+def name_fits(name: str) -> bool:
+    """Returns whether a name is at most MAX_NAME_BYTES long once UTF-8 encoded"""
+    # a character takes at most 4 bytes, so only long names have to be encoded to know
+    return len(name) <= MAX_NAME_BYTES // 4 or len(name.encode('utf-8')) <= MAX_NAME_BYTES
+
+def amount_fits(amount: int) -> bool:
+    """Returns whether an amount of cents is within MAX_AMOUNT_CENTS"""
+    return -MAX_AMOUNT_CENTS <= amount <= MAX_AMOUNT_CENTS
+
+def parse_frequency(value: str) -> DonationFrequency | None:
+    """
+        Converts a string (case insensitive) to a DonationFrequency without raising.
+
+        Keyword arguments:
+        - value -- string to convert
+
+        Returns:
+        DonationFrequency | None
+    """
+    return _FREQUENCIES.get(value.upper())
+
 class CommandExecutor(object):
     """Consolidator is an abstract class that defines the interface for the subclasses to accept different types of commands by its methods."""
     @abstractmethod
@@ -44,8 +113,54 @@ class CommandExecutor(object):
         """
         pass
 
+    def accept_donations(self, donations: list[AddDonation]):
+        """ Executes a batch of AddDonation commands, in order. Executors can override it to execute them faster than one at a time, as long
+            as the outcome is the same one `accept_donation` gets with each one of them.
+
+            Keyword arguments:
+            - donations -- commands that hold data for executing the donations
+
+            Returns None
+        """
+        for donation in donations:
+            self.accept_donation(donation)
+
+    def accept_commands(self, commands: Iterable["Command"], batch_size: int = DEFAULT_DONATIONS_BATCH_SIZE) -> int:
+        """ Executes commands in order, handing runs of consecutive AddDonation commands (up to `batch_size` of them) to `accept_donations`
+            and dispatching every other command on its own. If iterating the commands raises (e.g. a corrupted binary stream), the donations
+            read before are still executed.
+
+            Keyword arguments:
+            - commands -- commands to execute
+            - batch_size -- maximum amount of donations executed at once
+
+            Returns:
+            The amount of commands executed
+        """
+        count = 0
+        donations: list[AddDonation] = list()
+
+        try:
+            for command in commands:
+                count += 1
+                if type(command) is AddDonation:
+                    donations.append(command)
+                    if len(donations) >= batch_size:
+                        batch, donations = donations, list()
+                        self.accept_donations(batch)
+                else:
+                    if donations:
+                        batch, donations = donations, list()
+                        self.accept_donations(batch)
+                    command.dispatch_to_executor(self)
+        finally:
+            if donations:
+                self.accept_donations(donations)
+
+        return count
+
 class Command(object):
-    index: int
+    __slots__ = ()
     """
         Root abstract class for Commands that defines the interface for the subclasses to accept different types of commands by its methods. For the following purposes:
 
@@ -54,11 +169,14 @@ class Command(object):
         - request a CommandExecutor to process the kind of command we are trying to execute.
         - create a json object representation of itself
     """
+    keywords: tuple[str, ...] = ()
+    """Lowercase tokens that prefix the string representation of the command (e.g. `('add', 'donor')`)"""
+
     @classmethod
-    @abstractmethod
     def instantiate_from_string(cls, line:str) -> Self | None:
         """
-            Method that creates an instance of the concret subclass parsing and processing the string received
+            Method that creates an instance of the concret subclass parsing and processing the string received.
+            The keywords of the command are matched case insensitive against the first tokens of the line and the remaining tokens are handed to `instantiate_from_params`.
 
             Keyword arguments:
             - line --  string that will be proceesed to create a subclass instance.
@@ -66,6 +184,28 @@ class Command(object):
             Returns:
             An instance of a Command subclass or None
         """
+        if not line:
+            return None
+
+        tokens = line.split()
+        keywords_count = len(cls.keywords)
+        if tuple(token.lower() for token in tokens[:keywords_count]) != cls.keywords:
+            return None
+
+        return cls.instantiate_from_params(tokens[keywords_count:]).command
+
+    @classmethod
+    @abstractmethod
+    def instantiate_from_params(cls, params:list[str]) -> ParseResult:
+        """
+            Method that creates an instance of the concret subclass from the tokens that follow the command keywords. It must not raise on bad input, but return a rejected ParseResult instead.
+
+            Keyword arguments:
+            - params --  tokens of the line after the keywords of the command.
+
+            Returns:
+            ParseResult
+        """
         pass
 
     @abstractmethod
@@ -89,51 +229,67 @@ class Command(object):
         pass
     
     def to_json_obj(self):
-        """ Returns a string with a JSON representation of this object and it's relevant information"""
-        return self.__dict__
+        """ Returns a JSON serializable object representation of this object and it's relevant information"""
+        return { key: getattr(self, key) for key in self.__slots__ }
+
+    def to_tuple(self) -> tuple:
+        """ Returns a tuple of plain values (cheap to pickle or pack) from which `from_tuple` can rebuild this command"""
+        return tuple(getattr(self, key) for key in self.__slots__)
+
+    @classmethod
+    def from_tuple(cls, values: tuple) -> Self:
+        """ Rebuilds a command out of the values returned by `to_tuple`"""
+        return cls(*values)
 
 class AddDonor(Command):
     """
         AddDonor implements Command's method signature, and holds variables that can be described as follows:
 
         - name: name of the donor
-        - amount: amount of money this donor has initially
+        - amount: amount of money (in cents) this donor has initially
     """
+    __slots__ = ('name', 'amount')
+    keywords = ('add', 'donor')
+
     @classmethod
-    def instantiate_from_string(cls, line:str) -> Command | None:
+    def instantiate_from_params(cls, params:list[str]) -> ParseResult:
         """
-            Class method that either returns an instance of this class or None in case we can't build an instance from the string received.
+            Class method that returns a ParseResult holding either an instance of this class or the reason why we can't build an instance from the tokens received.
 
             A well formed string to create an instance has the following structure: `Add Donor <name> <amount>`
             Where:
             - the prefix `Add Donor` will be processed case insensitive
             - name will be stored as it is in name instance variable
-            - amount can start with `$` prefix and it will be processed as long it can be parsed as float
+            - amount can start with `$` prefix and it will be processed as long it can be parsed as money with at most two decimals, and stored in cents
+            - names can't be longer than MAX_NAME_BYTES (UTF-8 encoded) and amounts can't exceed MAX_AMOUNT_CENTS
 
             Keyword arguments:
-            - line -- string to parse/process to create a new instance of this class
+            - params -- tokens that follow the `Add Donor` prefix
 
             Returns:
-            - An instance of this class or None in case we can't build an instance from the string received.
+            - ParseResult
         """
-        prefix='add donor'
+        if len(params) < 2:
+            return ParseResult.rejected("missing arguments for Add Donor")
+
+        amount = parse_cents(params[1])
+        if amount is None:
+            return ParseResult.rejected(f"could not convert string to amount: '{params[1].removeprefix('$')}'", malformed=True)
+        if not amount_fits(amount):
+            return ParseResult.rejected(f"amount out of range: '{params[1].removeprefix('$')}'", malformed=True)
+        if not name_fits(params[0]):
+            return ParseResult.rejected(f"name longer than {MAX_NAME_BYTES} bytes", malformed=True)
 
-        if line and line.lower().startswith(prefix):
-            params = line[len(prefix):].split()
-            if len(params) > 1:
-                name = params[0].strip()
-                return AddDonor(name=name, amount=float(params[1].strip().removeprefix("$")))
-            
-        return None
+        return ParseResult.parsed(AddDonor(name=params[0], amount=amount))
 
-    def __init__(self, name: str, amount: float):
+    def __init__(self, name: str, amount: int):
         """
             Constructor for this class
 
             Keyword arguments:
 
             - name -- name of the donor
-            - amount -- amount of money this donor has initially
+            - amount -- amount of money (in cents) this donor has initially
         """
 
         self.name = name
@@ -159,32 +315,32 @@ class AddCampaign(Command):
 
         - name: name of the campaign
     """
+    __slots__ = ('name',)
+    keywords = ('add', 'campaign')
+
     @classmethod
-    def instantiate_from_string(cls, line:str) -> Command | None:
+    def instantiate_from_params(cls, params:list[str]) -> ParseResult:
         """
-            Class method that either returns an instance of this class or None in case we can't build an instance from the string received.
+            Class method that returns a ParseResult holding either an instance of this class or the reason why we can't build an instance from the tokens received.
 
             A well formed string to create an instance has the following structure: `Add Campaign <name>`
             Where:
             - the prefix `Add Campaign` will be processed case insensitive
-            - name will be stored as it is in name instance variable
+            - name will be stored as it is in name instance variable, and can't be longer than MAX_NAME_BYTES (UTF-8 encoded)
 
             Keyword arguments:
-            - line -- string to parse/process to create a new instance of this class
+            - params -- tokens that follow the `Add Campaign` prefix
 
             Returns:
-            - An instance of this class or None in case we can't build an instance from the string received.
+            - ParseResult
         """
+        if not len(params):
+            return ParseResult.rejected("missing arguments for Add Campaign")
+        if not name_fits(params[0]):
+            return ParseResult.rejected(f"name longer than {MAX_NAME_BYTES} bytes", malformed=True)
+
+        return ParseResult.parsed(AddCampaign(name=params[0]))
 
-        prefix='add campaign'
-        if line and line.lower().startswith(prefix):
-            params = line[len(prefix):].split()
-            if len(params):
-                name = params[0].strip()
-                return AddCampaign(name=name)
-        else:
-            return None
-        
     def __init__(self, name: str):
         """
             Constructor for this class
@@ -214,41 +370,49 @@ class AddDonation(Command):
 
         - donor_name: name of the donor
         - campaign_name: name of the campaign
-        - amount: amount of money to donate
+        - amount: amount of money (in cents) to donate
     """
+    __slots__ = ('donor_name', 'campaign_name', 'amount', 'frequency')
+    keywords = ('donate',)
+
     @classmethod
-    def instantiate_from_string(cls, line:str) -> Command | None:
+    def instantiate_from_params(cls, params:list[str]) -> ParseResult:
         """
-            Class method that either returns an instance of this class or None in case we can't build an instance from the string received.
+            Class method that returns a ParseResult holding either an instance of this class or the reason why we can't build an instance from the tokens received.
 
-            A well formed string to create an instance has the following structure: `Donate <donor_name> <campaign_name> <amount>`
+            A well formed string to create an instance has the following structure: `Donate <donor_name> <frequency> <campaign_name> <amount>`
             Where:
             - the prefix `Donate` will be processed case insensitive
-            - donor_name will be stored as it is in name instance variable
-            - frequency
-            - campaign_name will be stored as it is in name instance variable
-            - amount can start with `$` prefix and it will be processed as long it can be parsed as float
+            - donor_name will be stored lowercased in donor_name instance variable
+            - frequency has to be one of DonationFrequency values (case insensitive)
+            - campaign_name will be stored lowercased in campaign_name instance variable
+            - amount can start with `$` prefix and it will be processed as long it can be parsed as money with at most two decimals, and stored in cents
+            - names can't be longer than MAX_NAME_BYTES (UTF-8 encoded) and amounts can't exceed MAX_AMOUNT_CENTS
 
             Keyword arguments:
-            - line -- string to parse/process to create a new instance of this class
+            - params -- tokens that follow the `Donate` prefix
 
             Returns:
-            - An instance of this class or None in case we can't build an instance from the string received.
-        """
-        prefix = 'donate'
-        if line and line.lower().startswith(prefix):
-            params = line.lower().removeprefix(prefix).split()
-
-            if len(params) > 3:
-                return cls(
-                    params[0].strip(),
-                    DonationFrequency(params[1].upper()),
-                    params[2].strip(),
-                    float(params[3].strip().removeprefix("$")))
-        
-        return None
+            - ParseResult
+        """
+        if len(params) < 4:
+            return ParseResult.rejected("missing arguments for Donate")
+
+        frequency = parse_frequency(params[1])
+        if frequency is None:
+            return ParseResult.rejected(f"'{params[1].upper()}' is not a valid DonationFrequency", malformed=True)
 
-    def __init__(self, donor_name:str, frequency: DonationFrequency, campaign_name:str, amount: float):
+        amount = parse_cents(params[3])
+        if amount is None:
+            return ParseResult.rejected(f"could not convert string to amount: '{params[3].removeprefix('$')}'", malformed=True)
+        if not amount_fits(amount):
+            return ParseResult.rejected(f"amount out of range: '{params[3].removeprefix('$')}'", malformed=True)
+        if not name_fits(params[0]) or not name_fits(params[2]):
+            return ParseResult.rejected(f"name longer than {MAX_NAME_BYTES} bytes", malformed=True)
+
+        return ParseResult.parsed(cls(params[0].lower(), frequency, params[2].lower(), amount))
+
+    def __init__(self, donor_name:str, frequency: DonationFrequency, campaign_name:str, amount: int):
         """
             Constructor for this class
 
@@ -257,13 +421,23 @@ class AddDonation(Command):
             - donor_name -- name of the donor
             - campaign_name -- name of the campaign
             - frequency -- Enum with the frequency (MONTHLY, WEEKLY)
-            - amount -- amount to donate
+            - amount -- amount to donate, in cents
         """
         self.donor_name = donor_name
         self.campaign_name = campaign_name
         self.amount = amount
         self.frequency = frequency
 
+    def to_tuple(self) -> tuple:
+        """ Returns a tuple of plain values (cheap to pickle or pack) from which `from_tuple` can rebuild this command"""
+        return (self.donor_name, self.frequency.value, self.campaign_name, self.amount)
+
+    @classmethod
+    def from_tuple(cls, values: tuple) -> Self:
+        """ Rebuilds a command out of the values returned by `to_tuple`"""
+        donor_name, frequency, campaign_name, amount = values
+        return cls(donor_name, _FREQUENCIES[frequency], campaign_name, amount)
+
     def get_donation_amount(self):
         final_amount = self.amount
         if self.frequency == DonationFrequency.WEEKLY:
@@ -283,4 +457,108 @@ class AddDonation(Command):
     
     def dispatch_to_executor(self, executor: CommandExecutor) -> None:
         """Dispatches itself to executor in the right method"""
-        executor.accept_donation(self)
\ No newline at end of file
+        executor.accept_donation(self)
+
+
+class CommandRegistry(object):
+    """
+        CommandRegistry builds, once, a dispatch table out of the keywords of the Command subclasses it receives, so a line can be
+        routed straight to the parser of the only command that could handle it after tokenizing it a single time.
+    """
+    def __init__(self, *command_classes: type[Command]):
+        """
+            Constructor for this class
+
+            Keyword arguments:
+
+            - command_classes -- Command subclasses to register, each of them with distinct keywords
+        """
+        self._dispatch_table: Dict[str, Any] = dict()
+
+        for command_class in command_classes:
+            self.register(command_class)
+
+    def register(self, command_class: type[Command]) -> None:
+        """
+            Adds a Command subclass to the dispatch table under its keywords
+
+            Keyword arguments:
+
+            - command_class -- Command subclass to register
+        """
+        if not command_class.keywords:
+            raise ValueError(f"{command_class.__name__} does not define any keywords")
+
+        node = self._dispatch_table
+        for keyword in command_class.keywords[:-1]:
+            node = node.setdefault(keyword, dict())
+            if not isinstance(node, dict):
+                raise ValueError(f"Keywords of {command_class.__name__} collide with an already registered command")
+
+        if command_class.keywords[-1] in node:
+            raise ValueError(f"Keywords of {command_class.__name__} collide with an already registered command")
+
+        node[command_class.keywords[-1]] = command_class
+
+    def resolve(self, tokens: list[str]) -> tuple[type[Command] | None, list[str]]:
+        """
+            Walks the dispatch table with the leading tokens of a line (case insensitive)
+
+            Keyword arguments:
+
+            - tokens -- tokens of the line
+
+            Returns:
+            A tuple with the Command subclass that handles the line (or None) and the tokens that follow its keywords
+        """
+        node = self._dispatch_table
+        index = 0
+
+        while isinstance(node, dict):
+            if index >= len(tokens):
+                return None, tokens
+            node = node.get(tokens[index].lower())
+            index += 1
+
+        if node is None:
+            return None, tokens
+
+        return node, tokens[index:]
+
+    def parse(self, line: str) -> ParseResult:
+        """
+            Tokenizes the line once and lets the matching Command subclass build an instance out of the remaining tokens
+
+            Keyword arguments:
+
+            - line -- string to parse/process
+
+            Returns:
+            ParseResult
+        """
+        if not line:
+            return _UNMATCHED
+
+        command_class, params = self.resolve(line.split())
+        if command_class is None:
+            return _UNMATCHED
+
+        return command_class.instantiate_from_params(params)
+
+    def instantiate_from_string(self, line: str) -> Command | None:
+        """
+            Same as `parse`, but returns only the instance of the Command subclass or None
+
+            Keyword arguments:
+
+            - line -- string to parse/process
+
+            Returns:
+            An instance of a Command subclass or None
+        """
+        return self.parse(line).command
+
+
+_UNMATCHED = ParseResult.rejected("no command could be created for it")
+
+COMMAND_REGISTRY = CommandRegistry(AddDonor, AddCampaign, AddDonation)
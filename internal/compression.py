@@ -0,0 +1,199 @@
+import queue
+import threading
+from typing import BinaryIO, Callable, Iterable, Iterator, TypeVar
+
+from internal.streaming import DEFAULT_CHUNK_SIZE, DEFAULT_ENCODING, decode_lines, iter_byte_lines
+
+
+DEFAULT_QUEUE_SIZE = 16
+
+_MAGIC_NUMBERS = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
+_MAGIC_LENGTH = max(len(magic) for magic, _ in _MAGIC_NUMBERS)
+
+T = TypeVar('T')
+
+
+def detect_compression(stream: BinaryIO) -> str | None:
+    """
+        Returns the compression format of a binary stream (`gzip`, `bz2`, `xz` or `zstd`) looking at its first bytes without consuming them,
+        or None when it is not compressed or the stream can't be peeked.
+
+        Keyword arguments:
+        - stream -- binary stream, buffered readers like files and `sys.stdin.buffer` can be peeked
+
+        Returns:
+        str | None
+    """
+    if not hasattr(stream, 'peek'):
+        return None
+
+    head = stream.peek(_MAGIC_LENGTH)[:_MAGIC_LENGTH]
+    for magic, compression in _MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return compression
+
+    return None
+
+def open_decompressed(stream: BinaryIO, compression: str) -> BinaryIO:
+    """
+        Wraps a compressed binary stream in a file object that reads it decompressed. zstd needs Python 3.14 or the `zstandard` package,
+        ValueError is raised if neither is available.
+
+        Keyword arguments:
+        - stream -- compressed binary stream
+        - compression -- format returned by `detect_compression`
+
+        Returns:
+        BinaryIO
+    """
+    # the modules of each format are only imported when an input actually uses it
+    if compression == "gzip":
+        import gzip
+        return gzip.GzipFile(fileobj=stream, mode='rb')
+    if compression == "bz2":
+        import bz2
+        return bz2.BZ2File(stream, mode='rb')
+    if compression == "xz":
+        import lzma
+        return lzma.LZMAFile(stream, mode='rb')
+    if compression == "zstd":
+        try:
+            from compression import zstd
+            return zstd.ZstdFile(stream, mode='rb')
+        except ImportError:
+            pass
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstd compressed input needs Python 3.14 or the zstandard package (pip install zstandard)")
+        return zstandard.ZstdDecompressor().stream_reader(stream)
+
+    raise ValueError(f"Unsupported compression: {compression}")
+
+def decompression_errors(compression: str) -> tuple[type[Exception], ...]:
+    """
+        Returns the exceptions a stream returned by `open_decompressed` raises when its input is truncated (EOFError) or corrupted (OSError
+        and the error of the codec, e.g. `zlib.error` or `lzma.LZMAError`, which are not OSErrors).
+
+        Keyword arguments:
+        - compression -- format returned by `detect_compression`
+
+        Returns:
+        tuple[type[Exception], ...]
+    """
+    errors: tuple[type[Exception], ...] = (EOFError, OSError)
+
+    # same imports as `open_decompressed`, they are already loaded by the time this is needed
+    if compression == "gzip":
+        import zlib
+        return errors + (zlib.error,)
+    if compression == "xz":
+        import lzma
+        return errors + (lzma.LZMAError,)
+    if compression == "zstd":
+        try:
+            from compression import zstd
+            return errors + (zstd.ZstdError,)
+        except ImportError:
+            pass
+        try:
+            import zstandard
+            return errors + (zstandard.ZstdError,)
+        except ImportError:
+            pass
+
+    return errors
+
+def stop_at_decompression_errors(items: Iterable[T], compression: str, on_error: Callable[[Exception], None]) -> Iterator[T]:
+    """
+        Yields the items of an iterable that reads a decompressed stream (e.g. the lines of `iter_lines_in_background`) until reading
+        raises one of the `decompression_errors` of its format. The error is handed to `on_error` and the iteration ends as if the input
+        did, so whatever was read before it is still processed.
+
+        Keyword arguments:
+        - items -- iterable reading a stream returned by `open_decompressed`
+        - compression -- format returned by `detect_compression`
+        - on_error -- called with the error that ended the iteration
+
+        Returns:
+        Iterator
+    """
+    try:
+        yield from items
+    except decompression_errors(compression) as exc:
+        on_error(exc)
+
+
+def iter_chunks_in_background(stream: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE, queue_size: int = DEFAULT_QUEUE_SIZE) -> Iterator[bytes]:
+    """Yields chunks read from a stream by a background thread, so reading (e.g. decompressing, which releases the GIL) overlaps with
+       the processing of the chunks already read.
+
+        The thread hands chunks over through a queue of at most `queue_size` chunks, so it never gets ahead of the consumer by more than
+        `queue_size * chunk_size` bytes. Errors raised while reading are raised again by this iterator.
+
+        Keyword arguments:
+        - stream -- binary stream to read from
+        - chunk_size -- maximum number of bytes to read on each call
+        - queue_size -- maximum amount of chunks read ahead
+
+        Returns:
+        Iterator[bytes]
+    """
+    chunks: queue.Queue[bytes | BaseException | None] = queue.Queue(maxsize=queue_size)
+    stopped = threading.Event()
+
+    def hand_over(item: bytes | BaseException | None) -> bool:
+        while not stopped.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    # like `iter_chunks`, `read1` hands over what is available: `read` would keep reading to fill the chunk, and a decompressing stream
+    # that fails halfway through it drops what it had already decompressed
+    read = getattr(stream, 'read1', stream.read)
+
+    def read_chunks() -> None:
+        try:
+            while chunk := read(chunk_size):
+                if not hand_over(chunk):
+                    return
+            hand_over(None)
+        except BaseException as exc:
+            hand_over(exc)
+
+    reader = threading.Thread(target=read_chunks, name="input-reader", daemon=True)
+    reader.start()
+
+    try:
+        while (chunk := chunks.get()) is not None:
+            if isinstance(chunk, BaseException):
+                raise chunk
+            yield chunk
+    finally:
+        stopped.set()
+        reader.join()
+
+
+def iter_lines_in_background(stream: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = DEFAULT_ENCODING,
+                             queue_size: int = DEFAULT_QUEUE_SIZE) -> Iterator[str]:
+    """Same as `iter_lines`, but the stream is read in a background thread (see `iter_chunks_in_background`). Meant for streams returned
+       by `open_decompressed`, so decompression overlaps with the processing of the lines.
+
+        Keyword arguments:
+        - stream -- binary stream to read from
+        - chunk_size -- maximum number of bytes handed over at once
+        - encoding -- encoding used to decode each line
+        - queue_size -- maximum amount of chunks read ahead
+
+        Returns:
+        Iterator[str]
+    """
+    return decode_lines(iter_byte_lines(iter_chunks_in_background(stream, chunk_size, queue_size)), encoding)
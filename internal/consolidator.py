@@ -1,35 +1,93 @@
 
-import json
-from typing import Dict
+import io
+from typing import Any, Dict, TextIO
 from internal.commands import AddCampaign, AddDonation, AddDonor, CommandExecutor
-from internal.models import Campaign, Donation, Donor
+from internal.models import Campaign, Donation, DonationFrequency, Donor
+from internal.money import format_cents
 from internal.entry_reporter import EntriesReporter
+from internal.json_stream import JsonObjectStream, write_json
+from internal.symbols import SymbolTable
+
+
+class ConsolidatorListener(object):
+    """Root class of the objects that want to follow the changes of a Consolidator as they happen (see `Consolidator.add_listener`). Methods do nothing by default."""
+    def donor_added(self, donor: Donor):
+        pass
+
+    def campaign_added(self, campaign: Campaign):
+        pass
+
+    def donation_applied(self, donor: Donor, campaign: Campaign):
+        pass
+
+    def state_restored(self):
+        """Called when the whole state is replaced, after which listeners must not assume anything they knew about it"""
+        pass
 
 
 class Consolidator(CommandExecutor):
     """Consolidator is a class that encapsulates domain objects (Donors and Campaigns) and also holds
        a EntriesReporter that will log the processing result of each one of the commands we receive.
+
+       Donor and campaign keys are interned in a SymbolTable each, and the models are kept in lists indexed by the id of their key.
     """
-    def __init__(self, reporter:EntriesReporter):
+    def __init__(self, reporter:EntriesReporter, retain_donations:bool = True, command_log = None, donation_columns = None):
         """
             Constructor for this class.
 
             Keyword arguments:
             reporter -- EntriesReporter instance
+            retain_donations -- whether donors keep every Donation they made. Running totals are kept either way
+            command_log -- optional CommandLogWriter (see internal/command_log.py) every successfully applied command is appended to
+            donation_columns -- optional DonationColumns (see internal/columnar.py) every applied donation is appended to, by donor and campaign id
         """
-        self._donors:Dict[str,Donor] = dict()
-        self._campaigns:Dict[str,Campaign] = dict()
+        self._donor_symbols = SymbolTable()
+        self._campaign_symbols = SymbolTable()
+        self._donors:list[Donor] = list()
+        self._campaigns:list[Campaign] = list()
         self._reporter = reporter
+        self._retain_donations = retain_donations
+        self._command_log = command_log
+        self._donation_columns = donation_columns
+        self._listeners: list[ConsolidatorListener] = list()
+
+    def add_listener(self, listener: ConsolidatorListener):
+        """Registers a listener that gets notified of every change of the donors and campaigns. Without listeners, notifications cost nothing."""
+        self._listeners.append(listener)
     
+    @property
+    def donation_columns(self):
+        """Returns the DonationColumns the applied donations are appended to, if any"""
+        return self._donation_columns
+
     @property
     def all_donors(self) -> list[Donor]:
         """Returns a copy of the donors list currently in the system."""
-        return list(self._donors.values())
+        return list(self._donors)
 
     @property
     def all_campaigns(self) -> list[Campaign]:
         """Returns a copy of the campaigns list currently in the system."""
-        return list(self._campaigns.values())
+        return list(self._campaigns)
+
+    def export_state(self) -> Dict[str, Any]:
+        """Returns the model data held by this consolidator (donors and campaigns, with their running balances) so it can be persisted and later handed to `restore_state`.
+
+            returns Dict[str, Any]
+        """
+        return {"donors": {donor.key: donor for donor in self._donors}, "campaigns": {campaign.key: campaign for campaign in self._campaigns}}
+
+    def restore_state(self, state: Dict[str, Any]):
+        """Replaces the model data held by this consolidator with the one returned by `export_state`.
+
+            Keyword arguments:
+            state -- model data as returned by `export_state`
+        """
+        self._donors = self._intern_models(self._donor_symbols, state["donors"])
+        self._campaigns = self._intern_models(self._campaign_symbols, state["campaigns"])
+
+        for listener in self._listeners:
+            listener.state_restored()
 
     def has_any_data(self):
         """Returns a boolean indicating if the consolidator holds some data as result of the processing of commands.
@@ -44,31 +102,115 @@ class Consolidator(CommandExecutor):
             Keyword arguments:
             donation -- command that holds data for executing the donation
         """
-        if not self._donors.get(donation.donor_name.lower()):
+        donor_id = self._donor_symbols.find(donation.donor_name)
+        if donor_id is None:
             self._reporter.report_skipped_donation(donation, f"Unable to find donor with key: {donation.donor_name.lower()} while trying to process donation")
             return
-            
-        if not self._campaigns.get(donation.campaign_name.lower()):
+
+        campaign_id = self._campaign_symbols.find(donation.campaign_name)
+        if campaign_id is None:
             self._reporter.report_skipped_donation(donation, f"Unable to find campaign with key: {donation.donor_name.lower()} while trying to process donation")
             return
 
         if not donation.validate():
-            self._reporter.report_skipped_donation(donation, f"Invalid donation from: {donation.donor_name.lower()} to: {donation.campaign_name.lower()} with amount: {str(donation.amount)}")
+            self._reporter.report_skipped_donation(donation, f"Invalid donation from: {donation.donor_name.lower()} to: {donation.campaign_name.lower()} with amount: {format_cents(donation.amount)}")
             return
 
-        donor = self._donors[donation.donor_name.lower()]
-        campaign = self._campaigns[donation.campaign_name.lower()]
+        donor = self._donors[donor_id]
+        campaign = self._campaigns[campaign_id]
 
         total_donation_amount = donation.get_donation_amount()
         if donor.funds < total_donation_amount:
-            self._reporter.report_skipped_donation(donation, f"Donation funds ({str(total_donation_amount)}) exceeds donor funds ({str(donor.funds)})")
+            self._reporter.report_skipped_donation(donation, f"Donation funds ({format_cents(total_donation_amount)}) exceeds donor funds ({format_cents(donor.funds)})")
         else:
-            campaign.funds += total_donation_amount
-            donor.funds -= total_donation_amount
-            donor.donations.append(Donation(campaign_key=donation.campaign_name.lower(), frequency=donation.frequency, amount=donation.amount))
+            # the log goes first: if it can't take the record, the models are left untouched
+            if self._command_log is not None:
+                self._command_log.append_donation(donor.key, campaign.key, donation.frequency, donation.amount)
+            self.apply_donation(donor, campaign, donation.frequency, donation.amount, total_donation_amount)
+            if self._donation_columns is not None:
+                self._donation_columns.append(donor_id, campaign_id, donation.frequency, donation.amount)
 
             self._reporter.report_success_donation(donation)
 
+    def accept_donations(self, donations: list[AddDonation]):
+        """ Executes a batch of AddDonation commands, leaving the same models and reporter entries as `accept_donation` does with each one of
+            them in order. Names are looked up straight in the ids of the symbol tables first, since parsed commands already hold them
+            lowercased, and through `SymbolTable.find` when that fails. Runs of successful donations are recorded in the reporter at once.
+
+            Keyword arguments:
+            donations -- commands that hold data for executing the donations
+        """
+        reporter = self._reporter
+        command_log = self._command_log
+        donation_columns = self._donation_columns
+        apply_donation = self.apply_donation
+        donors = self._donors
+        campaigns = self._campaigns
+        donor_ids = self._donor_symbols.ids
+        campaign_ids = self._campaign_symbols.ids
+        find_donor = self._donor_symbols.find
+        find_campaign = self._campaign_symbols.find
+        weekly = DonationFrequency.WEEKLY
+        succeeded: list[AddDonation] = list()
+
+        for donation in donations:
+            donor_id = donor_ids.get(donation.donor_name)
+            if donor_id is None:
+                donor_id = find_donor(donation.donor_name)
+            campaign_id = campaign_ids.get(donation.campaign_name)
+            if campaign_id is None:
+                campaign_id = find_campaign(donation.campaign_name)
+
+            if donor_id is None:
+                description = f"Unable to find donor with key: {donation.donor_name.lower()} while trying to process donation"
+            elif campaign_id is None:
+                description = f"Unable to find campaign with key: {donation.donor_name.lower()} while trying to process donation"
+            elif not donation.validate():
+                description = f"Invalid donation from: {donation.donor_name.lower()} to: {donation.campaign_name.lower()} with amount: {format_cents(donation.amount)}"
+            else:
+                donor = donors[donor_id]
+                campaign = campaigns[campaign_id]
+                amount = donation.amount
+                total_donation_amount = amount * 4 if donation.frequency == weekly else amount
+                if donor.funds < total_donation_amount:
+                    description = f"Donation funds ({format_cents(total_donation_amount)}) exceeds donor funds ({format_cents(donor.funds)})"
+                else:
+                    if command_log is not None:
+                        command_log.append_donation(donor.key, campaign.key, donation.frequency, amount)
+                    apply_donation(donor, campaign, donation.frequency, amount, total_donation_amount)
+                    if donation_columns is not None:
+                        donation_columns.append(donor_id, campaign_id, donation.frequency, amount)
+                    succeeded.append(donation)
+                    continue
+
+            # entries are recorded in order: the successful donations that came before this one go first
+            if succeeded:
+                reporter.report_success_donations(succeeded)
+                succeeded = list()
+            reporter.report_skipped_donation(donation, description)
+
+        if succeeded:
+            reporter.report_success_donations(succeeded)
+
+    def apply_donation(self, donor: Donor, campaign: Campaign, frequency: DonationFrequency, amount: int, total_donation_amount: int):
+        """ Moves the funds of an already validated donation from the donor to the campaign, updating their aggregates.
+
+            Keyword arguments:
+            donor -- Donor making the donation
+            campaign -- Campaign receiving the donation
+            frequency -- frequency of the donation
+            amount -- amount of each donation in cents
+            total_donation_amount -- final amount donated in cents (already taking frequency into account)
+        """
+        campaign.record_donation(total_donation_amount)
+        donor.funds -= total_donation_amount
+        donor.record_donation(total_donation_amount,
+                              Donation(campaign_key=campaign.key, frequency=frequency, amount=amount) if self._retain_donations else None)
+
+        if self._listeners:
+            for listener in self._listeners:
+                listener.donation_applied(donor, campaign)
+
     def accept_donor(self, add_donor: AddDonor):
         """ Executes a command syncying the contents of the models to its effects as it creates entries in reporter for the processing of the command.
 
@@ -76,12 +218,18 @@ class Consolidator(CommandExecutor):
             add_donor -- command that holds data for creating a donor
         """
         if not add_donor.validate():
-            self._reporter.report_skipped_donation(add_donor, f"Invalid donor: {add_donor.name} with amount: {str(add_donor.amount)}")
+            self._reporter.report_skipped_donation(add_donor, f"Invalid donor: {add_donor.name} with amount: {format_cents(add_donor.amount)}")
             return
         
-        if not self._donors.get(add_donor.name.lower(), None):
-
-            self._donors[add_donor.name.lower()] = Donor(add_donor.name.lower(), add_donor.name, add_donor.amount)
+        if self._donor_symbols.find(add_donor.name) is None:
+            if self._command_log is not None:
+                self._command_log.append_donor(add_donor.name, add_donor.amount)
+            key = add_donor.name.lower()
+            self._donor_symbols.add(key)
+            donor = Donor(key, add_donor.name, add_donor.amount)
+            self._donors.append(donor)
+            for listener in self._listeners:
+                listener.donor_added(donor)
             self._reporter.report_success_donor(add_donor)
         else:
             self._reporter.report_skipped_donor(add_donor, f"Ignoring donor with key: {add_donor.name.lower()} since it already exists another donor for the same key")
@@ -97,18 +245,46 @@ class Consolidator(CommandExecutor):
             self._reporter.report_skipped_donation(add_campaign, f"Invalid donor: {add_campaign.name}")
             return
 
-        if not self._campaigns.get(add_campaign.name.lower(), None):
-            self._campaigns[add_campaign.name.lower()] = Campaign(add_campaign.name.lower(), add_campaign.name, 0)
+        if self._campaign_symbols.find(add_campaign.name) is None:
+            if self._command_log is not None:
+                self._command_log.append_campaign(add_campaign.name)
+            key = add_campaign.name.lower()
+            self._campaign_symbols.add(key)
+            campaign = Campaign(key, add_campaign.name, 0)
+            self._campaigns.append(campaign)
+            for listener in self._listeners:
+                listener.campaign_added(campaign)
             self._reporter.report_success_campaign(add_campaign)
         else:
             self._reporter.report_skipped_campaign(add_campaign, f"Ignoring campaign with key: {add_campaign.name.lower()} since it already exists another campaign for the same key")
             return
 
-    def to_json(self):
-        """ Returns a string with a JSON representation of this object and it's relevant information"""
+    @staticmethod
+    def _intern_models(symbols: SymbolTable, models: Dict[str, Any]) -> list:
+        """Interns again the keys of the models of a state, by key, in their order, and returns the models as a list indexed by id"""
+        symbols.clear()
+        for key in models:
+            symbols.add(key)
+
+        return list(models.values())
+
+    def to_json(self, stream: TextIO | None = None):
+        """ Returns a string with a JSON representation of this object and it's relevant information.
+            When a stream is received the JSON is written to it incrementally, one donor, campaign or reporter entry at a time, and nothing is returned.
+
+            Keyword arguments:
+            stream -- optional text stream to write the JSON representation to
+        """
+        json_obj = JsonObjectStream([
+            ("donors", JsonObjectStream((donor.key, donor.to_json_obj()) for donor in self._donors)),
+            ("campaigns", JsonObjectStream((campaign.key, campaign.to_json_obj()) for campaign in self._campaigns)),
+            ("report", self._reporter.to_json_stream_obj())
+            ])
+
+        if stream is not None:
+            write_json(stream, json_obj)
+            return
 
-        return json.dumps({
-            "donors": dict([(key, value.to_json_obj()) for key, value in self._donors.items()]),
-            "campaigns": dict([(key, value.to_json_obj()) for key, value in self._campaigns.items()]),
-            "report": self._reporter.to_json_obj()
-            }, indent=4)
\ No newline at end of file
+        buffer = io.StringIO()
+        write_json(buffer, json_obj)
+        return buffer.getvalue()
@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 import logging
 import sys
 from typing import Generic, TypeVar
@@ -6,15 +7,39 @@ from typing import Generic, TypeVar
 TIMESTAMP_FORMAT='%Y-%m-%dT%H:%M:%S.%f'
 T = TypeVar(Generic())
 
-def config_stdout_logger(logger, level):
-    """ Takes an already created logger and configures it with the format for each line and the output stream that it will use (stdout)"""
+def timestamp_ns_to_datetime(timestamp_ns: int) -> datetime:
+    """ Converts a UTC timestamp in nanoseconds (as returned by `time.time_ns()`) to a datetime in UTC, with microsecond precision"""
+    return datetime.fromtimestamp(timestamp_ns // 1_000_000_000, timezone.utc).replace(microsecond=(timestamp_ns // 1_000) % 1_000_000)
+
+def format_timestamp_ns(timestamp_ns: int) -> str:
+    """ Formats a UTC timestamp in nanoseconds with TIMESTAMP_FORMAT"""
+    return timestamp_ns_to_datetime(timestamp_ns).strftime(TIMESTAMP_FORMAT)
+
+def skip_unused_log_record_fields():
+    """ The formats we log with only use the time, the logger name, the level and the message of each record. This stops logging from looking up
+        the caller, thread and process of every record it creates, which is most of the cost of logging a line (see the Optimization section
+        of the logging HOWTO)"""
+    logging._srcfile = None
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+def config_stdout_logger(logger, level, queued: bool = False):
+    """ Takes an already created logger and configures it with the format for each line and the output stream that it will use (stdout).
+        With `queued`, records are written by a background thread (see `internal.queued_logging.enqueue_handlers`)."""
 
     logger.setLevel(level)
 
-    handler = logging.StreamHandler(sys.stdout)
+    if queued:
+        from internal.queued_logging import BatchFlushingStreamHandler, enqueue_handlers
+
+    handler = BatchFlushingStreamHandler(sys.stdout) if queued else logging.StreamHandler(sys.stdout)
     handler.setLevel(level)
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     handler.setFormatter(formatter)
     logger.addHandler(handler)
 
-    return logger
\ No newline at end of file
+    if queued:
+        enqueue_handlers(logger)
+
+    return logger
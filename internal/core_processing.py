@@ -1,16 +1,39 @@
 
-from functools import reduce
+import logging
 import sys
-import traceback
-from venv import logger
+from typing import Iterable
 
-from internal.commands import Command
+from internal.commands import COMMAND_REGISTRY, Command, ParseResult
 from internal.consolidator import Consolidator
 from internal.entry_reporter import EntriesReporter
+from internal.models import Campaign, Donor
+from internal.money import format_cents
 
+logger = logging.getLogger(__name__)
+
+
+def parse_command(line: str) -> ParseResult:
+    """This functions takes a string and routes it, through the dispatch table of COMMAND_REGISTRY, to the Command subclass that could handle and create an instance of itself processing this string.
+        It never raises: lines that don't match any command, can't be converted or create an invalid command are returned as rejected results with the reason.
+
+        Keyword arguments:
+        - line -- string that has to be evaluated by command classes.
+
+        Returns:
+        ParseResult
+    """
+    result = COMMAND_REGISTRY.parse(line)
+    if result.command is not None and not result.command.validate():
+        return reject_invalid_command(result.command)
+
+    return result
+
+def reject_invalid_command(command: Command) -> ParseResult:
+    """Returns the rejected ParseResult of a line whose command got created but didn't pass its validation"""
+    return ParseResult.rejected(f"invalid {command.__class__.__name__} command")
 
 def extract_command(line: str) -> Command | None:
-    """This functions takes a string and searches for Command subclasses that could handle and create an instance of themselves processing this string. If none is found it returns None.
+    """This functions takes a string and returns the valid Command instance `parse_command` could create out of it. If none is found it returns None.
 
         Keyword arguments:
         - line -- string that has to be evaluated by command classes.
@@ -18,37 +41,117 @@ def extract_command(line: str) -> Command | None:
         Returns:
         Command | None
     """
-    for command_subclass in Command.__subclasses__():
-        instance: Command | None = command_subclass.instantiate_from_string(line)
-        if instance and instance.validate():
-            return instance
-        
-    return None
+    return parse_command(line).command
 
 def process_command_line(consolidator: Consolidator, reporter:EntriesReporter, line: str):
-    """This functions takes a string and searches for Command subclasses that could handle and create an instance of themselves processing this string. If none is found it returns None.
+    """This functions takes a string, parses it into a command and executes it with the consolidator. Lines that can't be turned into a valid command are recorded in the reporter
+        as skipped input, or as error input when one of their values can't be converted.
     
         Keyword arguments:
         - consolidator -- Consolidator that will hold model data
         - reporter -- EntriesReporter that coordinates the generation of processing logs
     """
-    logger.info(f"Processing line: {line}")
-    try:
-        command = extract_command(line)
-        if command:
-            logger.warning(f"Processing command: {command.__class__.__name__}")
-            command.dispatch_to_executor(consolidator)
+    apply_parse_result(consolidator, reporter, line, parse_command(line))
+
+def apply_parse_result(consolidator: Consolidator, reporter:EntriesReporter, line: str, result: ParseResult):
+    """This functions executes with the consolidator the command of an already parsed line, or records in the reporter why the line got rejected.
+        Parsing and applying are split so lines can be parsed elsewhere (e.g. in other processes) while results are still applied in input order.
+
+        Keyword arguments:
+        - consolidator -- Consolidator that will hold model data
+        - reporter -- EntriesReporter that coordinates the generation of processing logs
+        - line -- the line the result was parsed from
+        - result -- ParseResult of the line
+    """
+    logger.info("Processing line: %s", line)
+
+    if result.command is None:
+        if result.malformed:
+            reporter.report_error_input(line, result.reason)
         else:
-            reporter.report_skipped_input(line, f"Record got discarded, no command could be created for it: {line}")
+            reporter.report_skipped_input(line, f"Record got discarded, {result.reason}: {line}")
+        return
+
+    logger.warning("Processing command: %s", result.command.__class__.__name__)
+    try:
+        result.command.dispatch_to_executor(consolidator)
     except Exception as e:
-        _exc_type, _exc_value, exc_traceback = sys.exc_info()
+        if logger.isEnabledFor(logging.DEBUG):
+            import traceback
+            logger.debug(traceback.format_exc())
 
-        traces = traceback.extract_tb(exc_traceback)
+        reporter.report_error_input(line, str(e))
 
-        logger.debug(''.join(traces.format()))
+def process_command_lines(consolidator: Consolidator, reporter:EntriesReporter, lines: Iterable[str]):
+    """This functions feeds every line of an iterable (usually a lazy stream of lines) to `process_command_line`, one at a time, so
+        lines are processed as soon as they are produced and are not kept in memory afterwards.
+
+        Keyword arguments:
+        - consolidator -- Consolidator that will hold model data
+        - reporter -- EntriesReporter that coordinates the generation of processing logs
+        - lines -- iterable of strings to process
+    """
+    for line in lines:
+        process_command_line(consolidator, reporter, line)
+
+def dump_consolidator_state(consolidator: Consolidator, debug_logger: logging.Logger, path: str | None = None):
+    """This function writes the JSON representation of the consolidator incrementally, so it is only built when someone is going to read it:
+        - to the file at `path`, when received
+        - otherwise to stderr, only if `debug_logger` has DEBUG level enabled
+
+        Keyword arguments:
+        - consolidator -- Consolidator to dump
+        - debug_logger -- logger whose level decides if the dump is written to stderr
+        - path -- optional path of the file to write the dump to
+    """
+    if path:
+        with open(path, 'w', encoding='utf-8') as dump_file:
+            consolidator.to_json(dump_file)
+    elif debug_logger.isEnabledFor(logging.DEBUG):
+        consolidator.to_json(sys.stderr)
+        sys.stderr.write("\n")
 
-        reporter.report_error_input(line, str(e))
 
+def format_donor_report_line(donor: Donor) -> str:
+    """Returns the line of the report for a donor (e.g. `Greg: Total: $300 Average: $150`)"""
+    return format_donor_totals_line(donor.name, donor.total_donated, donor.average_donation)
+
+def format_donor_totals_line(name: str, total_cents: int, average_cents: int) -> str:
+    """Same as `format_donor_report_line`, for totals that don't come from a Donor"""
+    return f"{name}: Total: ${format_cents(total_cents)} Average: ${format_cents(average_cents)}"
+
+def format_campaign_report_line(campaign: Campaign) -> str:
+    """Returns the line of the report for a campaign (e.g. `SaveTheDogs: Total: $150`)"""
+    return format_campaign_totals_line(campaign.name, campaign.funds)
+
+def format_campaign_totals_line(name: str, total_cents: int) -> str:
+    """Same as `format_campaign_report_line`, for totals that don't come from a Campaign"""
+    return f"{name}: Total: ${format_cents(total_cents)}"
+
+def join_report_sections(donor_lines: list[str], campaign_lines: list[str]) -> str:
+    """
+        Returns the text of the report made of the given lines, already sorted by name. Sections without lines are left out.
+
+        Keyword arguments:
+        - donor_lines -- lines of the donors section
+        - campaign_lines -- lines of the campaigns section
+        Returns:
+        str
+    """
+    results = []
+
+    if len(donor_lines):
+        results.append('Donors:')
+        results.extend(donor_lines)
+
+    if len(results) and len(campaign_lines):
+        results.append("")
+
+    if len(campaign_lines):
+        results.append("Campaigns:")
+        results.extend(campaign_lines)
+
+    return "\n".join(results)
 
 def create_recurring_report_from(consolidator: Consolidator) -> str:
     """This creates a final report as text having the base of the consolidator with the following format:
@@ -71,30 +174,6 @@ def create_recurring_report_from(consolidator: Consolidator) -> str:
 
     if not consolidator:
         return ""
-    
-    results = []
-
-    if len(consolidator.all_donors):
-        results.append('Donors:')
-
-        for donor in sorted(consolidator.all_donors, key=lambda donor: donor.name):
-            average_expent = 0
-            donated = 0
-
-            if len(donor.donations):
-                donated = reduce(lambda acumulator, donation : donation.get_donation_amount() + acumulator, donor.donations, 0)
-                average_expent =  donated / len(donor.donations)
-            
-            results.append(f"{donor.name}: Total: ${donated} Average: ${average_expent}")
-    
-    if len(results) and len(consolidator.all_campaigns):
-        results.append("")
-
-    if len(consolidator.all_campaigns):
-        results.append("Campaigns:")
-
-        for campaign in sorted(consolidator.all_campaigns, key=lambda campaign: campaign.name):
-            results.append(f"{campaign.name}: Total: ${campaign.funds}")
-
 
-    return "\n".join(results)
\ No newline at end of file
+    return join_report_sections([format_donor_report_line(donor) for donor in sorted(consolidator.all_donors, key=lambda donor: donor.name)],
+                                [format_campaign_report_line(campaign) for campaign in sorted(consolidator.all_campaigns, key=lambda campaign: campaign.name)])
\ No newline at end of file
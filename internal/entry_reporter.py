@@ -1,11 +1,14 @@
 
-from datetime import datetime, timezone
+from datetime import datetime
 from enum import Enum
 import logging
+import time
 from typing import Dict
 
 from internal.commands import AddCampaign, AddDonation, AddDonor, Command
-from internal.core import T, TIMESTAMP_FORMAT
+from internal.core import T, format_timestamp_ns, timestamp_ns_to_datetime
+from internal.json_stream import JsonObjectStream
+from internal.entry_stores import DEFAULT_RING_SIZE, CountingEntryStore, EntryStore, ListEntryStore, ReporterRetention, RingBufferEntryStore, SpillEntryStore, SpillLog
 
 class ReporterEntryStatus(str, Enum):
     """Enum that represents the different status a ReporterEntry can be in a given time"""
@@ -21,6 +24,8 @@ class ReporterEntry(object):
       - target: the object onto this entry has been created
       - timestamp: a timestamp in UTC for the creation time of this entry"""
     
+    __slots__ = ('result_type', 'description', 'target', '_timestamp_ns')
+
     def __init__(self, result_type: ReporterEntryStatus, description: str, target: T):
         """
             Constructor for this class
@@ -34,15 +39,21 @@ class ReporterEntry(object):
         self.result_type: ReporterEntryStatus = result_type
         self.description: str = description
         self.target:T = target
-        self.timestamp: datetime = datetime.now(timezone.utc)
+        self._timestamp_ns: int = time.time_ns()
+
+    @property
+    def timestamp(self) -> datetime:
+        """Returns the creation time of this entry in UTC"""
+        return timestamp_ns_to_datetime(self._timestamp_ns)
 
     def to_json_obj(self):
-        """ Returns a string with a JSON representation of this object and it's relevant information"""
-        return {key: (value.to_json_obj() 
-                      if isinstance(value, Command) else (
-                          value.strftime(TIMESTAMP_FORMAT) if isinstance(value, datetime) else value))
-                    for key, value in self.__dict__.items()
-                }
+        """ Returns a JSON serializable object representation of this object and it's relevant information"""
+        return {
+            "result_type": self.result_type,
+            "description": self.description,
+            "target": self.target.to_json_obj() if isinstance(self.target, Command) else self.target,
+            "timestamp": format_timestamp_ns(self._timestamp_ns)
+        }
 
 class EntriesReporter(object):
     """EntriesReporter creates and stores reporter entries for:
@@ -50,18 +61,43 @@ class EntriesReporter(object):
       - donors
       - campaigns
       - donations
-      - input"""
-    def __init__(self, logger:logging.Logger):
+      - input
+
+      How many entries are kept depends on the retention:
+      - ALL: every entry is kept in memory
+      - COUNTS: only the amount of entries per status is kept
+      - RING: only the last `ring_size` entries of each category are kept in memory
+      - SPILL: every entry is appended to the file at `spill_path` instead of being kept in memory"""
+    def __init__(self, logger:logging.Logger, retention: ReporterRetention = ReporterRetention.ALL, ring_size: int = DEFAULT_RING_SIZE, spill_path: str | None = None):
         """Constructor for this class
         
         Keyword arguments:
-        - logger: The logger to use"""
-        self._donor_entries: list[ReporterEntry[AddDonor]] = list()
-        self._campaign_entries: list[ReporterEntry[AddCampaign]] = list()
-        self._donation_entries: list[ReporterEntry[AddDonation]] = list()
-        self._input_entries: list[ReporterEntry[str]] = list()
+        - logger: The logger to use
+        - retention: how many of the entries are kept, and where
+        - ring_size: amount of entries kept per category with RING retention
+        - spill_path: path of the file entries are appended to with SPILL retention"""
+        self._spill_log: SpillLog | None = None
+        if retention == ReporterRetention.SPILL:
+            if not spill_path:
+                raise ValueError("A spill path is required for SPILL retention")
+            self._spill_log = SpillLog(spill_path)
+
+        self._donor_entries: EntryStore = self._create_store(retention, ring_size, "donor_entries")
+        self._campaign_entries: EntryStore = self._create_store(retention, ring_size, "campaign_entries")
+        self._donation_entries: EntryStore = self._create_store(retention, ring_size, "donation_entries")
+        self._input_entries: EntryStore = self._create_store(retention, ring_size, "input_entries")
         self.logger = logger
 
+    def _create_store(self, retention: ReporterRetention, ring_size: int, category: str) -> EntryStore:
+        if retention == ReporterRetention.COUNTS:
+            return CountingEntryStore()
+        if retention == ReporterRetention.RING:
+            return RingBufferEntryStore(ReporterEntry, ring_size)
+        if retention == ReporterRetention.SPILL:
+            return SpillEntryStore(ReporterEntry, self._spill_log, category)
+
+        return ListEntryStore(ReporterEntry)
+
     def report_success_donation(self, add_donation: AddDonation):
         """
             Adds a ReporterEntry with status of SUCCESS to donation's collection
@@ -70,7 +106,17 @@ class EntriesReporter(object):
 
             - add_donation -- target of the new ReporterEntry
         """
-        self._donation_entries.append(ReporterEntry(result_type=ReporterEntryStatus.SUCCESS, target=add_donation, description=""))
+        self._donation_entries.record(ReporterEntryStatus.SUCCESS, "", add_donation)
+
+    def report_success_donations(self, add_donations: list[AddDonation]):
+        """
+            Adds a ReporterEntry with status of SUCCESS to donation's collection for each one of the donations, in order
+
+            Keyword arguments:
+
+            - add_donations -- targets of the new ReporterEntries
+        """
+        self._donation_entries.record_many(ReporterEntryStatus.SUCCESS, "", add_donations)
 
     def report_skipped_donation(self, add_donation: AddDonation, description:str=""):
         """
@@ -81,7 +127,7 @@ class EntriesReporter(object):
             - add_donation -- target of the new ReporterEntry
             - description -- optional string describing this entry
         """
-        self._donation_entries.append(ReporterEntry(result_type=ReporterEntryStatus.SKIPPED, description=description, target=add_donation))
+        self._donation_entries.record(ReporterEntryStatus.SKIPPED, description, add_donation)
         
         if self.logger:
             self.logger.warning(description)
@@ -95,7 +141,7 @@ class EntriesReporter(object):
             - add_donation -- target of the new ReporterEntry
             - description -- optional string describing this entry
         """
-        self._donation_entries.append(ReporterEntry(result_type=ReporterEntryStatus.ERROR, description=description, target=add_donation))
+        self._donation_entries.record(ReporterEntryStatus.ERROR, description, add_donation)
         
         if self.logger:
             self.logger.error(description)
@@ -108,7 +154,7 @@ class EntriesReporter(object):
 
             - add_donor -- target of the new ReporterEntry
         """
-        self._donor_entries.append(ReporterEntry(result_type=ReporterEntryStatus.SUCCESS, target=add_donor, description=""))
+        self._donor_entries.record(ReporterEntryStatus.SUCCESS, "", add_donor)
 
     def report_skipped_donor(self, add_donor: AddDonor, description:str=""):
         """
@@ -119,7 +165,7 @@ class EntriesReporter(object):
             - add_donor -- target of the new ReporterEntry
             - description -- optional string describing this entry
         """
-        self._donor_entries.append(ReporterEntry(result_type=ReporterEntryStatus.SKIPPED, description=description, target=add_donor))
+        self._donor_entries.record(ReporterEntryStatus.SKIPPED, description, add_donor)
         
         if self.logger:
             self.logger.warning(description)
@@ -133,7 +179,7 @@ class EntriesReporter(object):
             - add_donor -- target of the new ReporterEntry
             - description -- optional string describing this entry
         """
-        self._donor_entries.append(ReporterEntry(result_type=ReporterEntryStatus.ERROR, description=description, target=add_donor))
+        self._donor_entries.record(ReporterEntryStatus.ERROR, description, add_donor)
         
         if self.logger:
             self.logger.error(description)
@@ -146,7 +192,7 @@ class EntriesReporter(object):
 
             - add_campaign -- target of the new ReporterEntry
         """
-        self._campaign_entries.append(ReporterEntry(result_type=ReporterEntryStatus.SUCCESS, target=add_campaign, description=""))
+        self._campaign_entries.record(ReporterEntryStatus.SUCCESS, "", add_campaign)
 
     def report_skipped_campaign(self, add_campaign: AddCampaign, description:str=""):
         """
@@ -157,7 +203,7 @@ class EntriesReporter(object):
             - add_campaign -- target of the new ReporterEntry
             - description -- optional string describing this entry
         """
-        self._campaign_entries.append(ReporterEntry(result_type=ReporterEntryStatus.SKIPPED, description=description, target=add_campaign))
+        self._campaign_entries.record(ReporterEntryStatus.SKIPPED, description, add_campaign)
         
         if self.logger:
             self.logger.warning(description)
@@ -171,7 +217,7 @@ class EntriesReporter(object):
             - add_campaign -- target of the new ReporterEntry
             - description -- optional string describing this entry
         """
-        self._campaign_entries.append(ReporterEntry(result_type=ReporterEntryStatus.ERROR, description=description, target=add_campaign))
+        self._campaign_entries.record(ReporterEntryStatus.ERROR, description, add_campaign)
         
         if self.logger:
             self.logger.error(description)
@@ -184,7 +230,7 @@ class EntriesReporter(object):
 
             - line -- target of the new ReporterEntry
         """
-        self._input_entries.append(ReporterEntry(result_type=ReporterEntryStatus.SUCCESS, target=line, description=""))
+        self._input_entries.record(ReporterEntryStatus.SUCCESS, "", line)
 
     def report_skipped_input(self, line: str, description:str=""):
         """
@@ -195,7 +241,7 @@ class EntriesReporter(object):
             - line -- target of the new ReporterEntry
             - description -- optional string describing this entry
         """
-        self._input_entries.append(ReporterEntry(result_type=ReporterEntryStatus.SKIPPED, description=description, target=line))
+        self._input_entries.record(ReporterEntryStatus.SKIPPED, description, line)
         
         if self.logger:
             self.logger.warning(description)
@@ -209,13 +255,21 @@ class EntriesReporter(object):
             - line -- target of the new ReporterEntry
             - description -- optional string describing this entry
         """
-        self._input_entries.append(ReporterEntry(result_type=ReporterEntryStatus.ERROR, description=description, target=line))
+        self._input_entries.record(ReporterEntryStatus.ERROR, description, line)
         
         if self.logger:
             self.logger.error(description)
 
+    def close(self):
+        """Releases the resources (like the spill file) held by the entry stores"""
+        if self._spill_log:
+            self._spill_log.close()
+
     def to_json_obj(self):
-        """ Returns a string with a JSON representation of this object and it's relevant information"""
-        dict_attributes:Dict[str,list[ReporterEntry]] = { key:value for key, value in self.__dict__.items() if value and not isinstance(value, logging.Logger)}
-        return {key.removeprefix('_'):[internal_value.to_json_obj() for internal_value in value] for key, value in dict_attributes.items() if len(value)}
-    
\ No newline at end of file
+        """ Returns a JSON serializable object representation of this object and it's relevant information, using whatever each entry store retained"""
+        entry_stores:Dict[str,EntryStore] = { key: value for key, value in self.__dict__.items() if isinstance(value, EntryStore)}
+        return {key.removeprefix('_'):value.to_json_obj() for key, value in entry_stores.items() if len(value)}
+
+    def to_json_stream_obj(self) -> JsonObjectStream:
+        """ Same as `to_json_obj`, but entries are serialized lazily by `write_json` instead of being built upfront"""
+        return JsonObjectStream((key.removeprefix('_'), value.to_json_stream_obj()) for key, value in self.__dict__.items() if isinstance(value, EntryStore) and len(value))
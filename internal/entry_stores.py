@@ -0,0 +1,190 @@
+from abc import abstractmethod
+from collections import deque
+from enum import Enum
+from typing import Any, Dict, Iterator, TextIO
+
+from internal.core import T
+from internal.json_stream import JsonArrayStream
+
+
+class ReporterRetention(str, Enum):
+    """Enum that represents how much of the ReporterEntries an EntriesReporter keeps"""
+    ALL = "all"
+    COUNTS = "counts"
+    RING = "ring"
+    SPILL = "spill"
+
+DEFAULT_RING_SIZE = 1000
+
+
+class EntryStore(object):
+    """EntryStore is the abstract backing store for one category of ReporterEntries. Every store keeps a count of the
+       entries recorded for each status, no matter how many of the entries themselves it retains."""
+    def __init__(self):
+        self.counts: Dict[str, int] = dict()
+
+    def record(self, result_type: str, description: str, target: T) -> None:
+        """
+            Records a new entry in this store
+
+            Keyword arguments:
+
+            - result_type -- status of the entry
+            - description -- description attached to the entry
+            - target -- target object for which the entry has been created
+        """
+        self.counts[result_type] = self.counts.get(result_type, 0) + 1
+        self._retain(result_type, description, target)
+
+    def record_many(self, result_type: str, description: str, targets: list[T]) -> None:
+        """
+            Records a new entry for each one of the targets, all of them with the same status and description. Same as calling `record`
+            with each target in order.
+
+            Keyword arguments:
+
+            - result_type -- status of the entries
+            - description -- description attached to the entries
+            - targets -- target objects for which the entries have been created
+        """
+        self.counts[result_type] = self.counts.get(result_type, 0) + len(targets)
+        self._retain_many(result_type, description, targets)
+
+    def __len__(self) -> int:
+        """Returns the amount of entries recorded, retained or not"""
+        return sum(self.counts.values())
+
+    @abstractmethod
+    def _retain(self, result_type: str, description: str, target: T) -> None:
+        """Keeps (or not) the entry being recorded"""
+        pass
+
+    def _retain_many(self, result_type: str, description: str, targets: list[T]) -> None:
+        """Keeps (or not) the entries being recorded by `record_many`"""
+        for target in targets:
+            self._retain(result_type, description, target)
+
+    @abstractmethod
+    def to_json_obj(self) -> Any:
+        """ Returns a JSON serializable object representation of this object and it's relevant information"""
+        pass
+
+    def to_json_stream_obj(self) -> Any:
+        """ Same as `to_json_obj`, but retained entries are returned as a JsonArrayStream to be serialized lazily"""
+        return self.to_json_obj()
+
+    def close(self) -> None:
+        """Releases any resource held by this store"""
+        pass
+
+
+class ListEntryStore(EntryStore):
+    """Keeps every entry in memory"""
+    def __init__(self, entry_class: type):
+        super(ListEntryStore, self).__init__()
+        self._entry_class = entry_class
+        self._entries: list = list()
+
+    def _retain(self, result_type: str, description: str, target: T) -> None:
+        self._entries.append(self._entry_class(result_type=result_type, description=description, target=target))
+
+    def _retain_many(self, result_type: str, description: str, targets: list[T]) -> None:
+        entry_class = self._entry_class
+        self._entries.extend([entry_class(result_type, description, target) for target in targets])
+
+    def to_json_obj(self) -> list:
+        return [entry.to_json_obj() for entry in self._entries]
+
+    def to_json_stream_obj(self) -> JsonArrayStream:
+        return JsonArrayStream(entry.to_json_obj() for entry in self._entries)
+
+
+class CountingEntryStore(EntryStore):
+    """Keeps only the amount of entries recorded for each status"""
+    def _retain(self, result_type: str, description: str, target: T) -> None:
+        pass
+
+    def _retain_many(self, result_type: str, description: str, targets: list[T]) -> None:
+        pass
+
+    def to_json_obj(self) -> Dict[str, int]:
+        return dict(self.counts)
+
+
+class RingBufferEntryStore(EntryStore):
+    """Keeps in memory only the last `size` entries"""
+    def __init__(self, entry_class: type, size: int = DEFAULT_RING_SIZE):
+        super(RingBufferEntryStore, self).__init__()
+        self._entry_class = entry_class
+        self._entries: deque = deque(maxlen=size)
+
+    def _retain(self, result_type: str, description: str, target: T) -> None:
+        self._entries.append(self._entry_class(result_type=result_type, description=description, target=target))
+
+    def _retain_many(self, result_type: str, description: str, targets: list[T]) -> None:
+        # only the last `size` targets can be kept, there is no point in creating entries for the rest
+        entry_class = self._entry_class
+        self._entries.extend([entry_class(result_type, description, target) for target in targets[-self._entries.maxlen:]])
+
+    def to_json_obj(self) -> list:
+        return [entry.to_json_obj() for entry in self._entries]
+
+    def to_json_stream_obj(self) -> JsonArrayStream:
+        return JsonArrayStream(entry.to_json_obj() for entry in self._entries)
+
+
+class SpillLog(object):
+    """Append-only file, shared among SpillEntryStores, in which each entry is written as a JSON line tagged with its category"""
+    def __init__(self, path: str):
+        """
+            Constructor for this class
+
+            Keyword arguments:
+
+            - path -- path of the file to append entries to. It is truncated when opened
+        """
+        self.path = path
+        self._file: TextIO | None = open(path, 'w', encoding='utf-8')
+
+    def write(self, category: str, entry_json_obj: Dict[str, Any]) -> None:
+        import json
+
+        entry_json_obj["category"] = category
+        self._file.write(json.dumps(entry_json_obj))
+        self._file.write("\n")
+
+    def read(self, category: str) -> Iterator[Dict[str, Any]]:
+        """Yields the JSON objects of the entries written for a category, reading them back from the file one at a time"""
+        import json
+
+        if self._file:
+            self._file.flush()
+
+        with open(self.path, 'r', encoding='utf-8') as spill_file:
+            for line in spill_file:
+                entry_json_obj = json.loads(line)
+                if entry_json_obj.pop("category") == category:
+                    yield entry_json_obj
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class SpillEntryStore(EntryStore):
+    """Writes every entry to a SpillLog instead of keeping it in memory"""
+    def __init__(self, entry_class: type, spill_log: SpillLog, category: str):
+        super(SpillEntryStore, self).__init__()
+        self._entry_class = entry_class
+        self._spill_log = spill_log
+        self._category = category
+
+    def _retain(self, result_type: str, description: str, target: T) -> None:
+        self._spill_log.write(self._category, self._entry_class(result_type=result_type, description=description, target=target).to_json_obj())
+
+    def to_json_obj(self) -> list:
+        return list(self._spill_log.read(self._category))
+
+    def to_json_stream_obj(self) -> JsonArrayStream:
+        return JsonArrayStream(self._spill_log.read(self._category))
@@ -0,0 +1,167 @@
+import logging
+import os
+import threading
+from typing import BinaryIO, Iterator
+
+from internal.streaming import DEFAULT_CHUNK_SIZE, DEFAULT_ENCODING
+
+
+DEFAULT_MIN_INTERVAL = 0.05
+DEFAULT_MAX_INTERVAL = 2.0
+DEFAULT_CHUNKS_PER_BATCH = 64
+
+
+class FileFollower(object):
+    """FileFollower reads a file that keeps growing (like `tail -F` does), handing over its complete lines as they are appended.
+
+       - When there is nothing new to read it polls the file again after a wait that doubles each time (from `min_interval` up to `max_interval`),
+         and goes back to `min_interval` as soon as new data shows up, so a busy file is read right away and an idle one costs almost nothing.
+       - A line is only handed over once its `\\n` has been written, the trailing partial line waits for the rest of it.
+       - Rotation is detected by the path pointing to a different file (it got renamed and created again), in which case the rest of the old file is
+         read before switching to the new one, and by the file getting smaller than what was read (it got truncated), in which case it is read
+         again from the beginning.
+    """
+    def __init__(self, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = DEFAULT_ENCODING,
+                 min_interval: float = DEFAULT_MIN_INTERVAL, max_interval: float = DEFAULT_MAX_INTERVAL, chunks_per_batch: int = DEFAULT_CHUNKS_PER_BATCH,
+                 logger: logging.Logger | None = None):
+        """
+            Constructor for this class
+
+            Keyword arguments:
+
+            - path -- path of the file to follow
+            - chunk_size -- maximum number of bytes to read on each call
+            - encoding -- encoding used to decode each line
+            - min_interval -- seconds to wait before polling again right after reading something
+            - max_interval -- maximum seconds to wait between polls of an idle file
+            - chunks_per_batch -- maximum amount of chunks read into a single batch of lines (a big backlog is handed over in several batches)
+            - logger -- optional logger to report rotations
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.chunks_per_batch = chunks_per_batch
+        self.logger = logger
+        self.rotations = 0
+        self._file: BinaryIO | None = None
+        self._pending = b''
+
+    def iter_batches(self, stopped: threading.Event) -> Iterator[list[str]]:
+        """
+            Yields the complete lines read from the file in batches, until `stopped` is set. An empty batch is yielded on each idle poll, so the caller
+            gets control back periodically even when nothing is written (e.g. to emit a report). Once stopped, what is left of the file is yielded
+            as a last batch, with the trailing line that has no line terminator (if any) as its last line.
+
+            Keyword arguments:
+            - stopped -- event that stops following the file, waits are interrupted as soon as it is set
+
+            Returns:
+            Iterator[list[str]]
+        """
+        interval = self.min_interval
+
+        try:
+            while not stopped.is_set():
+                lines = self.read_available_lines()
+                yield lines
+
+                if lines:
+                    interval = self.min_interval
+                else:
+                    stopped.wait(interval)
+                    interval = min(interval * 2, self.max_interval)
+
+            if self._file is not None:
+                lines = self._read_to_end()
+                lines.extend(self._take_pending())
+                if lines:
+                    yield lines
+        finally:
+            self.close()
+
+    def read_available_lines(self) -> list[str]:
+        """Reads what has been appended since the last call, up to `chunks_per_batch` chunks (switching files on rotation), and returns the complete lines in it"""
+        if self._file is None and not self._open():
+            return list()
+
+        lines, at_end = self._read_lines()
+        if not at_end:
+            return lines
+
+        current = self._current_status()
+        opened = os.fstat(self._file.fileno())
+        if current is None:
+            return lines
+
+        if (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino):
+            # the old file is done: whatever was left without a line terminator is its last line
+            lines.extend(self._read_to_end())
+            lines.extend(self._take_pending())
+            self.close()
+            self._rotated("replaced")
+            if self._open():
+                lines.extend(self._read_lines()[0])
+        elif current.st_size < self._file.tell():
+            self._pending = b''
+            self._file.seek(0)
+            self._rotated("truncated")
+            lines.extend(self._read_lines()[0])
+
+        return lines
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self) -> bool:
+        try:
+            self._file = open(self.path, 'rb')
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _current_status(self) -> os.stat_result | None:
+        try:
+            return os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+    def _rotated(self, how: str) -> None:
+        self.rotations += 1
+        if self.logger:
+            self.logger.info(f"{self.path} got {how}, following it from the beginning")
+
+    def _take_pending(self) -> list[str]:
+        """Returns the trailing partial line as a line of its own (once the file it belongs to is done), if there is one"""
+        if not self._pending:
+            return list()
+
+        line = self._pending.decode(self.encoding, errors='replace')
+        self._pending = b''
+        return [line]
+
+    def _read_lines(self) -> tuple[list[str], bool]:
+        """Returns the complete lines of the next `chunks_per_batch` chunks and whether the end of the file was reached"""
+        lines: list[str] = list()
+
+        for _ in range(self.chunks_per_batch):
+            chunk = self._file.read(self.chunk_size)
+            if not chunk:
+                return lines, True
+
+            byte_lines = (self._pending + chunk).split(b'\n')
+            self._pending = byte_lines.pop()
+            lines.extend(line.decode(self.encoding, errors='replace') for line in byte_lines)
+
+        return lines, False
+
+    def _read_to_end(self) -> list[str]:
+        lines, at_end = self._read_lines()
+        while not at_end:
+            more_lines, at_end = self._read_lines()
+            lines.extend(more_lines)
+
+        return lines
@@ -0,0 +1,58 @@
+from typing import Any, Iterable, TextIO
+
+
+class JsonObjectStream(object):
+    """Wraps an iterable of (key, value) pairs that has to be written as a JSON object without materializing it"""
+    def __init__(self, items: Iterable[tuple[str, Any]]):
+        self.items = items
+
+class JsonArrayStream(object):
+    """Wraps an iterable of values that has to be written as a JSON array without materializing it"""
+    def __init__(self, values: Iterable[Any]):
+        self.values = values
+
+
+def write_json(stream: TextIO, value: Any, indent: int = 4, level: int = 0) -> None:
+    """Writes a JSON representation of `value` to a text stream, item by item, so we never hold the whole document as a string.
+        JsonObjectStream and JsonArrayStream values (and dicts or lists holding them) are consumed lazily while writing.
+
+        Keyword arguments:
+        - stream -- text stream to write to
+        - value -- JSON serializable value, JsonObjectStream or JsonArrayStream
+        - indent -- spaces used for each nesting level
+        - level -- current nesting level
+    """
+    import json
+
+    if isinstance(value, (dict, JsonObjectStream)):
+        items = value.items() if isinstance(value, dict) else value.items
+        _write_container(stream, "{", "}", ((_encode_key(json, key) + ": ", item) for key, item in items), indent, level)
+    elif isinstance(value, (list, JsonArrayStream)):
+        values = value if isinstance(value, list) else value.values
+        _write_container(stream, "[", "]", (("", item) for item in values), indent, level)
+    else:
+        stream.write(json.dumps(value))
+
+def _encode_key(json, key: Any) -> str:
+    # same keys `json.dumps` writes: strings (str enums too) by their value, bools, None and numbers as their JSON in quotes (e.g. "true")
+    if isinstance(key, str):
+        return json.dumps(key)
+    if key is None or isinstance(key, (bool, int, float)):
+        return json.dumps(json.dumps(key))
+
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+
+def _write_container(stream: TextIO, opening: str, closing: str, entries: Iterable[tuple[str, Any]], indent: int, level: int) -> None:
+    inner_padding = "\n" + " " * (indent * (level + 1))
+
+    stream.write(opening)
+    empty = True
+    for prefix, item in entries:
+        stream.write(inner_padding if empty else "," + inner_padding)
+        stream.write(prefix)
+        write_json(stream, item, indent, level + 1)
+        empty = False
+
+    if not empty:
+        stream.write("\n" + " " * (indent * level))
+    stream.write(closing)
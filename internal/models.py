@@ -1,7 +1,9 @@
-from datetime import datetime, timezone
+from datetime import datetime
 from enum import Enum
+import time
 
-from internal.core import TIMESTAMP_FORMAT
+from internal.core import format_timestamp_ns, timestamp_ns_to_datetime
+from internal.money import average_cents
 
 class DonationFrequency(str, Enum):
     """Enum that represents the different status a ReporterEntry can be in a given time"""
@@ -9,16 +11,34 @@ class DonationFrequency(str, Enum):
     WEEKLY = "WEEKLY"
 
 class Model(object):
+    """ Root class of the models. Models use `__slots__` and keep their creation time as an integer timestamp in nanoseconds, since we hold millions of them.
+        Money amounts (`amount`, `funds`, `total_donated`) are integer cents.
+
+        Subclasses list in `_json_fields` the attributes that make up their JSON representation.
+    """
+    __slots__ = ('_created_ns',)
+    _json_fields: tuple[str, ...] = ('created',)
+
     def __init__(self):
-        self.created: datetime = datetime.now(timezone.utc)
+        self._created_ns: int = time.time_ns()
+
+    @property
+    def created(self) -> datetime:
+        """Returns the creation time of this object in UTC"""
+        return timestamp_ns_to_datetime(self._created_ns)
 
     def to_json_obj(self):
         """ Returns a JSON serializable object representation of this object and it's relevant information"""
-        return { key: (value.strftime(TIMESTAMP_FORMAT) if isinstance(value, datetime) else value) for key, value in self.__dict__.items() }
+        json_obj = { key: getattr(self, key) for key in self._json_fields }
+        json_obj['created'] = format_timestamp_ns(self._created_ns)
+        return json_obj
 
 
 class Donation(Model):
-    def __init__(self, campaign_key:str, frequency:DonationFrequency, amount:float):
+    __slots__ = ('campaign_key', 'frequency', 'amount')
+    _json_fields = Model._json_fields + __slots__
+
+    def __init__(self, campaign_key:str, frequency:DonationFrequency, amount:int):
         super(Donation, self).__init__()
         self.campaign_key = campaign_key
         self.frequency = frequency
@@ -33,22 +53,58 @@ class Donation(Model):
 
     
 class Donor(Model):
-    def __init__(self, key:str, name:str, funds:float):
+    __slots__ = ('key', 'name', 'funds', 'donations', 'total_donated', 'donation_count')
+    _json_fields = Model._json_fields + __slots__
+
+    def __init__(self, key:str, name:str, funds:int):
         super(Donor, self).__init__()
         self.key = key
         self.name=name
         self.funds = funds
         self.donations:list[Donation] = list()
+        self.total_donated = 0
+        self.donation_count = 0
+
+    @property
+    def average_donation(self) -> int:
+        """Returns the average amount (in cents, rounded half up) donated by this donor, or 0 if it has not donated yet"""
+        return average_cents(self.total_donated, self.donation_count)
+
+    def record_donation(self, amount:int, donation:Donation | None = None):
+        """ Updates the running total and count of donations of this donor in O(1).
+
+            Keyword arguments:
+            - amount -- final amount donated in cents (already taking frequency into account)
+            - donation -- Donation to keep in `donations`. When None, the donation only counts towards the aggregates
+        """
+        self.total_donated += amount
+        self.donation_count += 1
+
+        if donation is not None:
+            self.donations.append(donation)
 
     def to_json_obj(self):
         """ Returns a JSON serializable object representation of this object and it's relevant information"""
-        return { key: ([object.to_json_obj() for object in value] if isinstance(value, list) else (
-                        value.strftime(TIMESTAMP_FORMAT) if isinstance(value, datetime) else value))
-                        for key, value in self.__dict__.items() }
+        json_obj = super(Donor, self).to_json_obj()
+        json_obj['donations'] = [donation.to_json_obj() for donation in self.donations]
+        return json_obj
 
 class Campaign(Model):
-    def __init__(self, key:str, name:str, funds:float):
+    __slots__ = ('key', 'name', 'funds', 'donation_count')
+    _json_fields = Model._json_fields + __slots__
+
+    def __init__(self, key:str, name:str, funds:int):
         super(Campaign, self).__init__()
         self.key = key
         self.name=name
-        self.funds = funds
\ No newline at end of file
+        self.funds = funds
+        self.donation_count = 0
+
+    def record_donation(self, amount:int):
+        """ Updates the running total (`funds`) and count of donations received by this campaign in O(1).
+
+            Keyword arguments:
+            - amount -- final amount received in cents (already taking frequency into account)
+        """
+        self.funds += amount
+        self.donation_count += 1
@@ -0,0 +1,69 @@
+import re
+
+
+CENTS_PER_UNIT = 100
+
+MAX_UNIT_DIGITS = 100
+"""Longest amount of units (digits before the decimal point) a money string can have, far more than any amount commands accept and well
+   below the amount of digits CPython refuses to convert to an int (640 at the very least, see `sys.set_int_max_str_digits`)"""
+
+_MONEY_PATTERN = re.compile(rf'([+-]?)([0-9]{{0,{MAX_UNIT_DIGITS}}})(?:\.([0-9]{{0,2}}))?')
+
+
+def parse_cents(value: str) -> int | None:
+    """
+        Converts a money string, with an optional `$` prefix, at most MAX_UNIT_DIGITS units and at most two decimals, to an integer amount of
+        cents without raising.
+        Doing all the money arithmetic on integer cents keeps totals exact, no matter how many donations we add up.
+
+        Keyword arguments:
+        - value -- string to convert (e.g. `$10`, `10.5`, `-3.25`)
+
+        Returns:
+        int | None
+    """
+    match = _MONEY_PATTERN.fullmatch(value.removeprefix("$"))
+    if not match:
+        return None
+
+    sign, units, decimals = match.groups()
+    if not units and not decimals:
+        return None
+
+    cents = int(units or 0) * CENTS_PER_UNIT + (int(decimals.ljust(2, '0')) if decimals else 0)
+
+    return -cents if sign == '-' else cents
+
+def format_cents(cents: int) -> str:
+    """
+        Formats an integer amount of cents as a money string without the currency sign, omitting decimals for whole amounts (e.g. `300`, `12.50`).
+
+        Keyword arguments:
+        - cents -- amount of cents
+
+        Returns:
+        str
+    """
+    units, remainder = divmod(abs(cents), CENTS_PER_UNIT)
+    sign = '-' if cents < 0 else ''
+
+    if not remainder:
+        return f"{sign}{units}"
+
+    return f"{sign}{units}.{remainder:02d}"
+
+def average_cents(total_cents: int, count: int) -> int:
+    """
+        Returns the average of `count` amounts that add up to `total_cents`, rounded half up to the nearest cent, or 0 when `count` is 0.
+
+        Keyword arguments:
+        - total_cents -- sum of the amounts
+        - count -- amount of amounts
+
+        Returns:
+        int
+    """
+    if not count:
+        return 0
+
+    return (2 * total_cents + count) // (2 * count)
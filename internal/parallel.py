@@ -0,0 +1,78 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterable
+
+from internal.commands import AddCampaign, AddDonation, AddDonor, ParseResult
+from internal.consolidator import Consolidator
+from internal.core_processing import apply_parse_result, parse_command
+from internal.entry_reporter import EntriesReporter
+from internal.streaming import DEFAULT_BATCH_SIZE, iter_batches
+
+
+_COMMAND_CLASSES = (AddDonor, AddCampaign, AddDonation)
+_COMMAND_CLASS_INDEXES = {command_class: index for index, command_class in enumerate(_COMMAND_CLASSES)}
+_REJECTED = -1
+
+
+def parse_batch(lines: list[str]) -> list[tuple]:
+    """Parses a batch of lines. It runs in the worker processes, so it only depends on the lines received.
+
+        ParseResults are returned encoded as tuples of plain values, since pickling them as objects costs more than parsing the lines:
+        - (index of the command class, command.to_tuple(), False) for parsed lines
+        - (_REJECTED, reason, malformed) for rejected lines
+
+        Keyword arguments:
+        - lines -- batch of lines to parse
+
+        Returns:
+        list[tuple]
+    """
+    encoded_results = list()
+
+    for line in lines:
+        result = parse_command(line)
+        if result.command is None:
+            encoded_results.append((_REJECTED, result.reason, result.malformed))
+        else:
+            encoded_results.append((_COMMAND_CLASS_INDEXES[result.command.__class__], result.command.to_tuple(), False))
+
+    return encoded_results
+
+def decode_result(encoded_result: tuple) -> ParseResult:
+    """Rebuilds a ParseResult out of a tuple returned by `parse_batch`"""
+    class_index, payload, malformed = encoded_result
+    if class_index == _REJECTED:
+        return ParseResult.rejected(payload, malformed)
+
+    return ParseResult.parsed(_COMMAND_CLASSES[class_index].from_tuple(payload))
+
+def process_command_lines_parallel(consolidator: Consolidator, reporter: EntriesReporter, lines: Iterable[str], workers: int, batch_size: int = DEFAULT_BATCH_SIZE):
+    """This functions parses batches of lines in a pool of `workers` processes while the results are applied to the consolidator in this process,
+        strictly in input order. Since the consolidator is only mutated here, and in the same order as `process_command_lines` would, the resulting
+        state (donors and campaigns existing before their donations, first-wins uniqueness, funds checks) is the same as in serial mode.
+
+        At most `2 * workers` batches are in flight, so memory usage stays bounded no matter the size of the input.
+
+        Keyword arguments:
+        - consolidator -- Consolidator that will hold model data
+        - reporter -- EntriesReporter that coordinates the generation of processing logs
+        - lines -- iterable of strings to process
+        - workers -- amount of worker processes
+        - batch_size -- amount of lines sent to a worker at once
+    """
+    max_pending = 2 * workers
+    pending: deque[tuple[list[str], Future]] = deque()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch in iter_batches(lines, batch_size):
+            pending.append((batch, pool.submit(parse_batch, batch)))
+
+            if len(pending) >= max_pending:
+                _apply_batch(consolidator, reporter, *pending.popleft())
+
+        while pending:
+            _apply_batch(consolidator, reporter, *pending.popleft())
+
+def _apply_batch(consolidator: Consolidator, reporter: EntriesReporter, batch: list[str], future: Future):
+    for line, encoded_result in zip(batch, future.result()):
+        apply_parse_result(consolidator, reporter, line, decode_result(encoded_result))
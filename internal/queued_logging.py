@@ -0,0 +1,86 @@
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
+import threading
+
+
+class BatchFlushingStreamHandler(logging.StreamHandler):
+    """StreamHandler that doesn't flush its stream after each record. Meant to be used behind a BatchFlushingQueueListener, which flushes it
+       once it has written every record queued so far"""
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class LazyQueueHandler(QueueHandler):
+    """QueueHandler that enqueues records as they are, so their messages are formatted (with `%` and their args) by the listener thread instead
+       of the thread that logs them. Records never leave the process and what gets logged is immutable (strings and numbers), so they don't
+       have to be formatted upfront like QueueHandler does. Only tracebacks are, since the frames they reference keep changing."""
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+
+        return record
+
+
+class BatchFlushingQueueListener(QueueListener):
+    """QueueListener that flushes its handlers when the queue runs empty, instead of after each record. An Event put in the queue is set
+       once every record queued before it has been written (see `wait_for_queued_logging`)."""
+    def stop(self) -> None:
+        """Writes the pending records and stops the listener thread. It is called at exit as well, so calling it again does nothing"""
+        if self._thread is not None:
+            super().stop()
+
+    def handle(self, record: logging.LogRecord | threading.Event) -> None:
+        if isinstance(record, threading.Event):
+            for handler in self.handlers:
+                handler.flush()
+            record.set()
+            return
+
+        super().handle(record)
+
+        if self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+
+
+def enqueue_handlers(logger: logging.Logger) -> QueueListener:
+    """
+        Moves the handlers of a logger to a background thread: the logger gets a LazyQueueHandler instead, so logging a record only costs
+        putting it in a queue, and a BatchFlushingQueueListener formats and writes the records. The listener is stopped (writing whatever is
+        pending) at exit, `wait_for_queued_logging` waits for it to catch up before then.
+
+        Keyword arguments:
+        - logger -- logger whose handlers are moved
+
+        Returns:
+        The started QueueListener
+    """
+    # SimpleQueue is the cheapest queue to put records in, logging threads never wait on it
+    records: queue.SimpleQueue[logging.LogRecord | threading.Event] = queue.SimpleQueue()
+    listener = BatchFlushingQueueListener(records, *logger.handlers, respect_handler_level=True)
+
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(LazyQueueHandler(records))
+
+    listener.start()
+    atexit.register(listener.stop)
+
+    return listener
+
+def wait_for_queued_logging(*loggers: logging.Logger) -> None:
+    """Waits until the records queued by the LazyQueueHandlers of these loggers have been written, e.g. before writing to the same stream"""
+    for logger in loggers:
+        for handler in logger.handlers:
+            if isinstance(handler, LazyQueueHandler):
+                written = threading.Event()
+                handler.queue.put(written)
+                written.wait()
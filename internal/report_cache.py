@@ -0,0 +1,109 @@
+from bisect import bisect_left
+from typing import Callable, Generic, TypeVar
+
+from internal.consolidator import Consolidator, ConsolidatorListener
+from internal.core_processing import format_campaign_report_line, format_donor_report_line
+from internal.models import Campaign, Donor
+
+M = TypeVar('M', Donor, Campaign)
+
+
+class _ReportSection(Generic[M]):
+    """Lines of one section of the report (donors or campaigns), sorted by name and rendered only when the model they belong to changes.
+
+       New models are appended and the section is sorted again on the next render: lots of them can be added in between renders, and sorting
+       an already sorted list with a few new items at its end is close to linear, while inserting each one in place would be quadratic."""
+    def __init__(self, title: str, format_line: Callable[[M], str]):
+        self.title = title
+        self.format_line = format_line
+        self._names: list[str] = list()
+        self._lines: list[str] = list()
+        self._text: str | None = None
+        self._sorted = True
+        self.dirty: dict[str, M] = dict()
+        """Models whose line has to be rendered again, by name. Callers add to it directly, it is the hot path."""
+
+    def reset(self, models: list[M]) -> None:
+        models = sorted(models, key=lambda model: model.name)
+        self._names = [model.name for model in models]
+        self._lines = [self.format_line(model) for model in models]
+        self.dirty.clear()
+        self._text = None
+        self._sorted = True
+
+    def add(self, model: M) -> None:
+        self._names.append(model.name)
+        self._lines.append(self.format_line(model))
+        self._text = None
+        self._sorted = False
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def render(self) -> str:
+        if not self._sorted:
+            # names are unique, so lines are never compared
+            self._names, self._lines = map(list, zip(*sorted(zip(self._names, self._lines))))
+            self._sorted = True
+
+        if self.dirty:
+            for name, model in self.dirty.items():
+                self._lines[bisect_left(self._names, name)] = self.format_line(model)
+            self.dirty.clear()
+            self._text = None
+
+        if self._text is None:
+            self._text = "\n".join([self.title, *self._lines])
+
+        return self._text
+
+
+class ReportCache(ConsolidatorListener):
+    """ReportCache keeps the output of `create_recurring_report_from` up to date as a Consolidator changes, for callers that ask for the report often
+       (e.g. the ingestion server).
+
+       Each section keeps its lines sorted by name: new donors and campaigns are appended and the section is sorted again on the next render (see
+       `_ReportSection`), and a donation only marks the lines of its donor and campaign as dirty. Rendering re-formats just the dirty lines, found
+       by binary search, and asking again for the report without changes in between returns the same string.
+    """
+    def __init__(self, consolidator: Consolidator):
+        """
+            Constructor for this class. The cache registers itself as a listener of the consolidator.
+
+            Keyword arguments:
+
+            - consolidator -- Consolidator to report
+        """
+        self._donors: _ReportSection[Donor] = _ReportSection("Donors:", format_donor_report_line)
+        self._campaigns: _ReportSection[Campaign] = _ReportSection("Campaigns:", format_campaign_report_line)
+        self._report: str | None = None
+        self._dirty_donors = self._donors.dirty
+        self._dirty_campaigns = self._campaigns.dirty
+        self.consolidator = consolidator
+
+        consolidator.add_listener(self)
+        self.state_restored()
+
+    def donor_added(self, donor: Donor):
+        self._donors.add(donor)
+        self._report = None
+
+    def campaign_added(self, campaign: Campaign):
+        self._campaigns.add(campaign)
+        self._report = None
+
+    def donation_applied(self, donor: Donor, campaign: Campaign):
+        self._dirty_donors[donor.name] = donor
+        self._dirty_campaigns[campaign.name] = campaign
+
+    def state_restored(self):
+        self._donors.reset(self.consolidator.all_donors)
+        self._campaigns.reset(self.consolidator.all_campaigns)
+        self._report = None
+
+    def render(self) -> str:
+        """Returns the same report `create_recurring_report_from` returns for the consolidator"""
+        if self._report is None or self._dirty_donors or self._dirty_campaigns:
+            self._report = "\n\n".join(section.render() for section in (self._donors, self._campaigns) if len(section))
+
+        return self._report
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+
+from internal.consolidator import Consolidator
+from internal.core_processing import process_command_line
+from internal.entry_reporter import EntriesReporter
+from internal.report_cache import ReportCache
+from internal.streaming import DEFAULT_ENCODING
+
+
+DEFAULT_QUEUE_SIZE = 10_000
+DEFAULT_DRAIN_SIZE = 1_000
+
+REPORT_REQUEST = "REPORT"
+END_OF_REPORT = "."
+
+
+class IngestionServer(object):
+    """IngestionServer keeps a single Consolidator alive and feeds it the command lines it receives over Unix or TCP sockets from any amount of
+       concurrent producers.
+
+       The protocol is line based. Each line a producer sends is a command line, except for `REPORT` (case insensitive), to which the server answers
+       with the output of `create_recurring_report_from` followed by a line holding only `.`. Reports come from a ReportCache, so asking for them
+       often is cheap.
+
+       Every line goes through one bounded queue and a single task applies them to the consolidator in order of arrival, so a report always
+       reflects every command received before it. When producers outpace the consolidation the queue fills up and the server stops reading from
+       their sockets until there is room again, which makes the OS push back on them.
+    """
+    def __init__(self, consolidator: Consolidator, reporter: EntriesReporter, logger: logging.Logger,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, drain_size: int = DEFAULT_DRAIN_SIZE, encoding: str = DEFAULT_ENCODING):
+        """
+            Constructor for this class
+
+            Keyword arguments:
+
+            - consolidator -- Consolidator the command lines are applied to
+            - reporter -- EntriesReporter that records the outcome of each command line
+            - logger -- logger for connection events
+            - queue_size -- maximum amount of lines waiting to be applied
+            - drain_size -- maximum amount of lines applied before letting other tasks run
+            - encoding -- encoding of the lines producers send
+        """
+        self.consolidator = consolidator
+        self.reporter = reporter
+        self.logger = logger
+        self.encoding = encoding
+        self.drain_size = drain_size
+        self.lines = 0
+        self._report_cache = ReportCache(consolidator)
+        self._queue: asyncio.Queue[str | asyncio.Future] = asyncio.Queue(maxsize=queue_size)
+        self._servers: list[asyncio.AbstractServer] = list()
+        self._consumer: asyncio.Task | None = None
+        self._producers: dict[asyncio.Task, asyncio.StreamWriter] = dict()
+        """Writer of the connection each producer handling task serves"""
+
+    async def start_unix(self, path: str) -> None:
+        """Starts accepting producers on a Unix socket at `path`"""
+        self._servers.append(await asyncio.start_unix_server(self._handle_producer, path=path))
+        self._start_consumer()
+
+    async def start_tcp(self, host: str, port: int) -> int:
+        """Starts accepting producers on a TCP socket and returns the port it listens on (useful with port 0)"""
+        server = await asyncio.start_server(self._handle_producer, host=host, port=port)
+        self._servers.append(server)
+        self._start_consumer()
+
+        return server.sockets[0].getsockname()[1]
+
+    async def report(self) -> str:
+        """Returns the report once every line received so far has been applied"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(future)
+
+        return await future
+
+    async def close(self) -> None:
+        """Stops accepting producers, disconnects the ones still connected and waits until every line received has been applied"""
+        for server in self._servers:
+            server.close()
+
+        # since Python 3.12.1 `wait_closed` also waits for the connections of producers, which would only end when they disconnect. Aborting
+        # them stops reading from their sockets, their tasks still hand over the lines already read before they end.
+        while self._producers:
+            for writer in self._producers.values():
+                writer.transport.abort()
+            await asyncio.gather(*self._producers, return_exceptions=True)
+
+        for server in self._servers:
+            await server.wait_closed()
+
+        await self._queue.join()
+        if self._consumer:
+            self._consumer.cancel()
+
+    def _start_consumer(self) -> None:
+        if self._consumer is None:
+            self._consumer = asyncio.get_running_loop().create_task(self._consume())
+
+    async def _handle_producer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info('peername') or writer.get_extra_info('sockname')
+        self.logger.info(f"Producer connected: {peer}")
+        task = asyncio.current_task()
+        self._producers[task] = writer
+
+        try:
+            while raw_line := await reader.readline():
+                line = raw_line.decode(self.encoding, errors='replace').rstrip('\r\n')
+
+                if line.strip().upper() == REPORT_REQUEST:
+                    report = await self.report()
+                    writer.write(f"{report}\n{END_OF_REPORT}\n".encode(self.encoding) if report else f"{END_OF_REPORT}\n".encode(self.encoding))
+                    await writer.drain()
+                else:
+                    await self._queue.put(line)
+        except (ConnectionError, asyncio.IncompleteReadError) as exc:
+            self.logger.error(f"Producer {peer} disconnected abruptly: {exc}")
+        except ValueError as exc:
+            self.logger.error(f"Producer {peer} sent a line over the size limit, closing its connection: {exc}")
+        finally:
+            del self._producers[task]
+            writer.close()
+            self.logger.info(f"Producer disconnected: {peer}")
+
+    async def _consume(self) -> None:
+        queue = self._queue
+
+        while True:
+            self._apply(await queue.get())
+
+            # apply whatever is already queued in one go (up to drain_size lines), without a round trip to the event loop per line
+            for _ in range(self.drain_size - 1):
+                if queue.empty():
+                    break
+                self._apply(queue.get_nowait())
+
+            await asyncio.sleep(0)
+
+    def _apply(self, item: str | asyncio.Future) -> None:
+        if isinstance(item, asyncio.Future):
+            if not item.done():
+                item.set_result(self._report_cache.render())
+        else:
+            process_command_line(self.consolidator, self.reporter, item)
+            self.lines += 1
+
+        self._queue.task_done()
@@ -0,0 +1,190 @@
+import logging
+import os
+import queue
+import threading
+from typing import Any, Dict, Iterable
+
+from internal.consolidator import Consolidator
+from internal.core_processing import process_command_line
+from internal.entry_reporter import EntriesReporter
+from internal.models import Campaign, Donor
+
+
+SNAPSHOT_VERSION = 2
+DEFAULT_SNAPSHOT_EVERY = 100_000
+
+
+class Snapshot(object):
+    """Snapshot is the persisted state of a Consolidator after consuming the input up to a byte offset:
+
+      - state: donors and campaigns, as returned by `Consolidator.export_state`. Only their balances and aggregates get serialized, which is
+        all the report needs: the donations donors retain are left out, so taking a snapshot costs the same no matter how many donations
+        were applied
+      - offset: byte offset of the input right after the last line applied to the state
+      - lines: amount of lines applied to the state
+      - command_log_size: size in bytes of the command log when the snapshot was taken, if the run had one"""
+    def __init__(self, state: Dict[str, Any], offset: int, lines: int, command_log_size: int | None = None):
+        self.state = state
+        self.offset = offset
+        self.lines = lines
+        self.command_log_size = command_log_size
+
+    def to_bytes(self) -> bytes:
+        """Serializes this snapshot in a binary format"""
+        import pickle
+
+        state = {"donors": [(donor.key, donor.name, donor.funds, donor.total_donated, donor.donation_count, donor._created_ns)
+                            for donor in self.state["donors"].values()],
+                 "campaigns": [(campaign.key, campaign.name, campaign.funds, campaign.donation_count, campaign._created_ns)
+                               for campaign in self.state["campaigns"].values()]}
+
+        return pickle.dumps({"version": SNAPSHOT_VERSION, "state": state, "offset": self.offset, "lines": self.lines,
+                             "command_log_size": self.command_log_size}, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Snapshot":
+        """Deserializes a snapshot written by `to_bytes`. Raises ValueError if it was written by an incompatible version or it is corrupted
+           (e.g. cut short)."""
+        import pickle
+
+        try:
+            content = pickle.loads(data)
+            version = content.get("version")
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError, KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"Corrupted snapshot: {exc!r}")
+
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {version}")
+
+        try:
+            return cls._from_content(content)
+        except (AttributeError, KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"Corrupted snapshot: {exc!r}")
+
+    @classmethod
+    def _from_content(cls, content: Dict[str, Any]) -> "Snapshot":
+        donors: Dict[str, Donor] = dict()
+        for key, name, funds, total_donated, donation_count, created_ns in content["state"]["donors"]:
+            donor = donors[key] = Donor(key, name, funds)
+            donor.total_donated = total_donated
+            donor.donation_count = donation_count
+            donor._created_ns = created_ns
+
+        campaigns: Dict[str, Campaign] = dict()
+        for key, name, funds, donation_count, created_ns in content["state"]["campaigns"]:
+            campaign = campaigns[key] = Campaign(key, name, funds)
+            campaign.donation_count = donation_count
+            campaign._created_ns = created_ns
+
+        return cls({"donors": donors, "campaigns": campaigns}, content["offset"], content["lines"], content.get("command_log_size"))
+
+
+def load_snapshot(path: str) -> Snapshot | None:
+    """Returns the snapshot stored at `path`, or None if there is none. Raises ValueError if it can't be read (see `Snapshot.from_bytes`)."""
+    try:
+        with open(path, 'rb') as snapshot_file:
+            return Snapshot.from_bytes(snapshot_file.read())
+    except FileNotFoundError:
+        return None
+
+def write_snapshot_file(path: str, data: bytes) -> None:
+    """Writes a serialized snapshot atomically: the data goes to a temporary file that replaces `path` once it is on disk,
+        so `path` always holds a complete snapshot even if the process dies while writing"""
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'wb') as snapshot_file:
+        snapshot_file.write(data)
+        snapshot_file.flush()
+        os.fsync(snapshot_file.fileno())
+
+    os.replace(temporary_path, path)
+
+
+class SnapshotWriter(object):
+    """SnapshotWriter writes snapshots of a Consolidator from a background thread, so ingestion does not wait for the disk.
+
+       The state is serialized in the calling thread (that's the only way to get a consistent copy of it while it keeps changing) and then
+       handed over to the writer thread. If the previous snapshot is still being written, the new one replaces it in the queue instead of
+       piling up, since only the latest snapshot matters."""
+    def __init__(self, path: str, logger: logging.Logger | None = None, command_log = None):
+        """
+            Constructor for this class
+
+            Keyword arguments:
+
+            - path -- path of the snapshot file
+            - logger -- optional logger to report write failures
+            - command_log -- optional CommandLogWriter of the run, whose size is recorded in each snapshot (it gets flushed for that)
+        """
+        self.path = path
+        self.logger = logger
+        self.command_log = command_log
+        self.written = 0
+        self._queue: queue.Queue[bytes | None] = queue.Queue(maxsize=1)
+        self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, consolidator: Consolidator, offset: int, lines: int) -> None:
+        """
+            Takes a snapshot of the consolidator and schedules it to be written
+
+            Keyword arguments:
+
+            - consolidator -- Consolidator to snapshot
+            - offset -- byte offset of the input right after the last line applied to the consolidator
+            - lines -- amount of lines applied to the consolidator
+        """
+        command_log_size = self.command_log.size() if self.command_log is not None else None
+        data = Snapshot(consolidator.export_state(), offset, lines, command_log_size).to_bytes()
+
+        while True:
+            try:
+                self._queue.put_nowait(data)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def close(self) -> None:
+        """Waits until the pending snapshot (if any) is written and stops the writer thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while (data := self._queue.get()) is not None:
+            try:
+                write_snapshot_file(self.path, data)
+                self.written += 1
+            except OSError as exc:
+                if self.logger:
+                    self.logger.error(f"Unable to write snapshot {self.path}: {exc}")
+
+
+def process_command_lines_with_snapshots(consolidator: Consolidator, reporter: EntriesReporter, lines_with_offsets: Iterable[tuple[str, int]],
+                                         writer: SnapshotWriter, every: int = DEFAULT_SNAPSHOT_EVERY, lines: int = 0) -> int:
+    """This functions processes lines like `process_command_lines` does, submitting a snapshot to the writer every `every` lines and once more at the end.
+
+        Keyword arguments:
+        - consolidator -- Consolidator that will hold model data
+        - reporter -- EntriesReporter that coordinates the generation of processing logs
+        - lines_with_offsets -- iterable of (line, byte offset right after the line) tuples, like `iter_lines_with_offsets` yields
+        - writer -- SnapshotWriter to submit snapshots to
+        - every -- amount of lines between snapshots
+        - lines -- amount of lines already applied to the consolidator (when resuming)
+
+        Returns:
+        The amount of lines applied to the consolidator, including the ones already applied before
+    """
+    offset = None
+    for line, offset in lines_with_offsets:
+        process_command_line(consolidator, reporter, line)
+        lines += 1
+
+        if not lines % every:
+            writer.submit(consolidator, offset, lines)
+
+    if offset is not None:
+        writer.submit(consolidator, offset, lines)
+
+    return lines
@@ -0,0 +1,164 @@
+from datetime import datetime
+from typing import Dict
+
+from internal.consolidator import Consolidator
+from internal.models import Campaign, Donor
+
+
+MONTH_FORMAT = "%Y-%m"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS months (
+    month TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS donors (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    funds INTEGER NOT NULL,
+    created_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS campaigns (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    created_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS donor_months (
+    month TEXT NOT NULL,
+    donor_key TEXT NOT NULL REFERENCES donors (key),
+    funds INTEGER NOT NULL,
+    total_donated INTEGER NOT NULL,
+    donation_count INTEGER NOT NULL,
+    PRIMARY KEY (month, donor_key)
+);
+CREATE TABLE IF NOT EXISTS campaign_months (
+    month TEXT NOT NULL,
+    campaign_key TEXT NOT NULL REFERENCES campaigns (key),
+    funds INTEGER NOT NULL,
+    donation_count INTEGER NOT NULL,
+    PRIMARY KEY (month, campaign_key)
+);
+"""
+
+
+def parse_month(value: str) -> str:
+    """Validates a month in `YYYY-MM` format and returns it normalized. Raises ValueError if it isn't a valid month."""
+    return datetime.strptime(value, MONTH_FORMAT).strftime(MONTH_FORMAT)
+
+
+class StateStore(object):
+    """StateStore persists consolidated donors and campaigns in a SQLite file, month by month, so each run only has to ingest the commands of a new month.
+
+       - donors / campaigns hold the current state: every donor and campaign ever added, and the funds donors have left
+       - donor_months / campaign_months hold the aggregates of each ingested month (and the funds donors had left when it closed), which is all
+         `create_recurring_report_from` needs to report that month again
+    """
+    def __init__(self, path: str):
+        """
+            Constructor for this class
+
+            Keyword arguments:
+
+            - path -- path of the SQLite database, it is created if it does not exist
+        """
+        import sqlite3
+
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def months(self) -> list[str]:
+        """Returns the ingested months, from the oldest to the latest one"""
+        return [month for month, in self._connection.execute("SELECT month FROM months ORDER BY month")]
+
+    def check_month_can_be_ingested(self, month: str) -> None:
+        """Raises ValueError when `month` is not after the latest ingested month, since ingesting it would count donations twice or out of order"""
+        months = self.months()
+        if months and month <= months[-1]:
+            raise ValueError(f"Month {month} can't be ingested, the latest ingested month is {months[-1]}")
+
+    def load_current_state(self, consolidator: Consolidator) -> None:
+        """
+            Loads into a consolidator every donor and campaign stored, with the funds donors have left and empty aggregates, so that processing the
+            commands of a new month on it leaves only that month's aggregates in it.
+
+            Keyword arguments:
+
+            - consolidator -- Consolidator to load the state into
+        """
+        donors: Dict[str, Donor] = dict()
+        for key, name, funds, created_ns in self._connection.execute("SELECT key, name, funds, created_ns FROM donors"):
+            donors[key] = _build_donor(key, name, funds, created_ns)
+
+        campaigns: Dict[str, Campaign] = dict()
+        for key, name, created_ns in self._connection.execute("SELECT key, name, created_ns FROM campaigns"):
+            campaigns[key] = _build_campaign(key, name, 0, created_ns)
+
+        consolidator.restore_state({"donors": donors, "campaigns": campaigns})
+
+    def save_month(self, consolidator: Consolidator, month: str) -> None:
+        """
+            Stores the state of a consolidator loaded with `load_current_state` after processing the commands of `month`, in a single transaction.
+            Raises ValueError when `month` can't be ingested (see `check_month_can_be_ingested`).
+
+            Keyword arguments:
+
+            - consolidator -- Consolidator holding the state after processing the month
+            - month -- month in `YYYY-MM` format
+        """
+        self.check_month_can_be_ingested(month)
+
+        donors = consolidator.all_donors
+        campaigns = consolidator.all_campaigns
+
+        with self._connection:
+            self._connection.execute("INSERT INTO months (month) VALUES (?)", (month,))
+            self._connection.executemany("INSERT INTO donors (key, name, funds, created_ns) VALUES (?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET funds = excluded.funds",
+                                         ((donor.key, donor.name, donor.funds, donor._created_ns) for donor in donors))
+            self._connection.executemany("INSERT OR IGNORE INTO campaigns (key, name, created_ns) VALUES (?, ?, ?)",
+                                         ((campaign.key, campaign.name, campaign._created_ns) for campaign in campaigns))
+            self._connection.executemany("INSERT INTO donor_months (month, donor_key, funds, total_donated, donation_count) VALUES (?, ?, ?, ?, ?)",
+                                         ((month, donor.key, donor.funds, donor.total_donated, donor.donation_count) for donor in donors))
+            self._connection.executemany("INSERT INTO campaign_months (month, campaign_key, funds, donation_count) VALUES (?, ?, ?, ?)",
+                                         ((month, campaign.key, campaign.funds, campaign.donation_count) for campaign in campaigns))
+
+    def load_month(self, consolidator: Consolidator, month: str) -> None:
+        """
+            Loads into a consolidator the donors and campaigns as they were when `month` closed, with that month's aggregates, without replaying any command.
+            Raises ValueError when `month` has not been ingested.
+
+            Keyword arguments:
+
+            - consolidator -- Consolidator to load the state into
+            - month -- month in `YYYY-MM` format
+        """
+        if not self._connection.execute("SELECT 1 FROM months WHERE month = ?", (month,)).fetchone():
+            raise ValueError(f"Month {month} has not been ingested")
+
+        donors: Dict[str, Donor] = dict()
+        for key, name, funds, created_ns, total_donated, donation_count in self._connection.execute(
+                "SELECT d.key, d.name, m.funds, d.created_ns, m.total_donated, m.donation_count FROM donor_months m JOIN donors d ON d.key = m.donor_key WHERE m.month = ?", (month,)):
+            donor = donors[key] = _build_donor(key, name, funds, created_ns)
+            donor.total_donated = total_donated
+            donor.donation_count = donation_count
+
+        campaigns: Dict[str, Campaign] = dict()
+        for key, name, created_ns, funds, donation_count in self._connection.execute(
+                "SELECT c.key, c.name, c.created_ns, m.funds, m.donation_count FROM campaign_months m JOIN campaigns c ON c.key = m.campaign_key WHERE m.month = ?", (month,)):
+            campaign = campaigns[key] = _build_campaign(key, name, funds, created_ns)
+            campaign.donation_count = donation_count
+
+        consolidator.restore_state({"donors": donors, "campaigns": campaigns})
+
+
+def _build_donor(key: str, name: str, funds: int, created_ns: int) -> Donor:
+    donor = Donor(key, name, funds)
+    donor._created_ns = created_ns
+    return donor
+
+def _build_campaign(key: str, name: str, funds: int, created_ns: int) -> Campaign:
+    campaign = Campaign(key, name, funds)
+    campaign._created_ns = created_ns
+    return campaign
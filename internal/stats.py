@@ -0,0 +1,209 @@
+import json
+import time
+from typing import Callable, Dict, Iterable, Iterator
+
+from internal.commands import COMMAND_REGISTRY
+from internal.consolidator import Consolidator
+from internal.core_processing import apply_parse_result, reject_invalid_command
+from internal.entry_reporter import EntriesReporter
+from internal.entry_stores import EntryStore
+
+
+STAGES = ("read", "parse", "validate", "dispatch", "reporter", "report")
+"""Stages of processing that get timed:
+
+  - read: getting the next line from the input (reading, decompressing and decoding)
+  - parse: turning a line into a command (`COMMAND_REGISTRY.parse`)
+  - validate: `Command.validate`
+  - dispatch: applying the command to the consolidator (or rejecting the line), without the reporter bookkeeping it triggers
+  - reporter: recording entries in the EntriesReporter
+  - report: rendering and writing the final report"""
+
+
+class StageTimer(object):
+    """Amount of calls and total nanoseconds spent in one stage (or by one type of command)"""
+    __slots__ = ('calls', 'total_ns')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+
+    def add(self, elapsed_ns: int) -> None:
+        self.calls += 1
+        self.total_ns += elapsed_ns
+
+    def to_json_obj(self):
+        """ Returns a JSON serializable object representation of this object and it's relevant information"""
+        return {"calls": self.calls, "total_ns": self.total_ns}
+
+
+class ProcessingStats(object):
+    """ProcessingStats collects timings and counters of a run, for `--stats`:
+
+      - per stage (see STAGES) and per type of command dispatched, the amount of calls and the nanoseconds spent, measured with
+        `time.perf_counter_ns` (monotonic, with the highest resolution available)
+      - the amount of lines rejected before reaching the consolidator
+      - the outcome of every entry the reporter recorded (success, skipped and error counts, per category)
+
+       Nothing here runs unless --stats is used: lines are processed by this class' own instrumented loop instead of `process_command_lines`,
+       and the reporter is only timed once `instrument_reporter` wraps its entry stores.
+    """
+    def __init__(self):
+        """Constructor for this class. The total elapsed time is measured from here until `finish` is called."""
+        self.stages: Dict[str, StageTimer] = {stage: StageTimer() for stage in STAGES}
+        self.commands: Dict[str, StageTimer] = dict()
+        self.rejected_lines = 0
+        self.elapsed_ns = 0
+        self._started_ns = time.perf_counter_ns()
+        self._reporter: EntriesReporter | None = None
+
+    def add(self, stage: str, elapsed_ns: int) -> None:
+        """Adds a call that took `elapsed_ns` nanoseconds to a stage"""
+        self.stages[stage].add(elapsed_ns)
+
+    def instrument_reporter(self, reporter: EntriesReporter) -> None:
+        """Times every entry recorded by the reporter, as the `reporter` stage, and keeps it to read the outcome counts of its entry stores"""
+        self._reporter = reporter
+        for store in _entry_stores(reporter).values():
+            store.record = self._timed(store.record, self.stages["reporter"])
+            store.record_many = self._timed(store.record_many, self.stages["reporter"])
+
+    def timed_lines(self, lines: Iterable[str]) -> Iterator[str]:
+        """Yields the lines of an iterable timing how long it takes to get each one of them, as the `read` stage"""
+        clock = time.perf_counter_ns
+        timer = self.stages["read"]
+        lines = iter(lines)
+
+        while True:
+            started_ns = clock()
+            line = next(lines, None)
+            timer.add(clock() - started_ns)
+            if line is None:
+                return
+            yield line
+
+    def process_command_lines(self, consolidator: Consolidator, reporter: EntriesReporter, lines: Iterable[str]) -> None:
+        """
+            Same as `process_command_lines`, timing each stage of every line and each type of command dispatched.
+
+            Keyword arguments:
+            - consolidator -- Consolidator that will hold model data
+            - reporter -- EntriesReporter that coordinates the generation of processing logs
+            - lines -- iterable of strings to process
+        """
+        clock = time.perf_counter_ns
+        parse = COMMAND_REGISTRY.parse
+        parse_timer, validate_timer, dispatch_timer = self.stages["parse"], self.stages["validate"], self.stages["dispatch"]
+        commands = self.commands
+
+        for line in self.timed_lines(lines):
+            started_ns = clock()
+            result = parse(line)
+            parsed_ns = clock()
+            parse_timer.add(parsed_ns - started_ns)
+
+            command = result.command
+            if command is not None:
+                valid = command.validate()
+                validated_ns = clock()
+                validate_timer.add(validated_ns - parsed_ns)
+                parsed_ns = validated_ns
+                if not valid:
+                    result = reject_invalid_command(command)
+
+            apply_parse_result(consolidator, reporter, line, result)
+            elapsed_ns = clock() - parsed_ns
+            dispatch_timer.add(elapsed_ns)
+
+            if result.command is None:
+                self.rejected_lines += 1
+            else:
+                name = type(command).__name__
+                timer = commands.get(name)
+                if timer is None:
+                    timer = commands[name] = StageTimer()
+                timer.add(elapsed_ns)
+
+    def finish(self) -> None:
+        """Stops measuring the total elapsed time"""
+        self.elapsed_ns = time.perf_counter_ns() - self._started_ns
+
+    def outcomes(self) -> Dict[str, Dict[str, int]]:
+        """Returns the amount of entries the reporter recorded per status (SUCCESS, SKIPPED, ERROR), per category"""
+        if self._reporter is None:
+            return dict()
+
+        return {category.removeprefix('_'): {getattr(status, 'value', status): count for status, count in store.counts.items()}
+                for category, store in _entry_stores(self._reporter).items() if len(store)}
+
+    def _exclusive_stages(self) -> Dict[str, StageTimer]:
+        # reporter entries are recorded while dispatching, so their time is taken out of the dispatch stage
+        stages = dict(self.stages)
+        dispatch = stages["dispatch"] = StageTimer()
+        dispatch.calls = self.stages["dispatch"].calls
+        if dispatch.calls:
+            dispatch.total_ns = max(0, self.stages["dispatch"].total_ns - self.stages["reporter"].total_ns)
+
+        return stages
+
+    def to_json_obj(self):
+        """ Returns a JSON serializable object representation of this object and it's relevant information"""
+        return {
+            "elapsed_ns": self.elapsed_ns,
+            "stages": {stage: timer.to_json_obj() for stage, timer in self._exclusive_stages().items()},
+            "commands": {name: timer.to_json_obj() for name, timer in self.commands.items()},
+            "rejected_lines": self.rejected_lines,
+            "outcomes": self.outcomes(),
+        }
+
+    def format_summary(self) -> str:
+        """Returns a human readable summary of the stats, as printed by --stats"""
+        results = [f"Stats: {_format_ns(self.elapsed_ns)} elapsed", f"  {'Stage':<12}{'Calls':>12}{'Total':>12}{'Average':>12}{'Share':>8}"]
+
+        elapsed_ns = self.elapsed_ns or 1
+        for stage, timer in self._exclusive_stages().items():
+            if timer.calls:
+                results.append(f"  {stage:<12}{timer.calls:>12}{_format_ns(timer.total_ns):>12}{_format_ns(timer.total_ns // timer.calls):>12}{timer.total_ns / elapsed_ns:>8.1%}")
+
+        if self.commands:
+            results.append(f"  {'Command':<12}{'Calls':>12}{'Total':>12}{'Average':>12}")
+            for name, timer in sorted(self.commands.items()):
+                results.append(f"  {name:<12}{timer.calls:>12}{_format_ns(timer.total_ns):>12}{_format_ns(timer.total_ns // timer.calls):>12}")
+            results.append(f"  Rejected lines: {self.rejected_lines}")
+
+        for category, counts in self.outcomes().items():
+            total = sum(counts.values())
+            results.append(f"  {category}: " + ", ".join(f"{status} {count} ({count / total:.1%})" for status, count in sorted(counts.items())))
+
+        return "\n".join(results)
+
+    @staticmethod
+    def _timed(function: Callable, timer: StageTimer) -> Callable:
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            started_ns = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timer.add(clock() - started_ns)
+
+        return timed
+
+
+def _entry_stores(reporter: EntriesReporter) -> Dict[str, EntryStore]:
+    return {key: value for key, value in reporter.__dict__.items() if isinstance(value, EntryStore)}
+
+def _format_ns(elapsed_ns: int) -> str:
+    if elapsed_ns >= 1_000_000_000:
+        return f"{elapsed_ns / 1_000_000_000:.2f}s"
+    if elapsed_ns >= 1_000_000:
+        return f"{elapsed_ns / 1_000_000:.1f}ms"
+    if elapsed_ns >= 1_000:
+        return f"{elapsed_ns / 1_000:.1f}us"
+    return f"{elapsed_ns}ns"
+
+def write_stats_json(stats: ProcessingStats, path: str) -> None:
+    """Writes the JSON representation of the stats to the file at `path`"""
+    with open(path, 'w', encoding='utf-8') as stats_file:
+        json.dump(stats.to_json_obj(), stats_file, indent=2)
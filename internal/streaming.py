@@ -0,0 +1,168 @@
+import mmap
+import os
+import stat
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_ENCODING = 'utf-8'
+DEFAULT_BATCH_SIZE = 10_000
+DEFAULT_WINDOW_SIZE = 4 * 1024 * 1024
+
+
+def iter_chunks(stream: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yields raw chunks from a binary stream until it is exhausted.
+
+        When the stream supports `read1` (buffered readers like files and `sys.stdin.buffer`) we use it, so a chunk is
+        handed over as soon as any data is available instead of blocking until `chunk_size` bytes are read.
+
+        Keyword arguments:
+        - stream -- binary stream to read from
+        - chunk_size -- maximum number of bytes to read on each call
+
+        Returns:
+        Iterator[bytes]
+    """
+    read = getattr(stream, 'read1', stream.read)
+
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_byte_lines(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Splits a sequence of byte chunks into lines (without the line terminator), keeping only the trailing partial
+       line of each chunk in memory.
+
+        Keyword arguments:
+        - chunks -- iterable of byte chunks
+
+        Returns:
+        Iterator[bytes]
+    """
+    pending = b''
+
+    for chunk in chunks:
+        lines = (pending + chunk).split(b'\n') if pending else chunk.split(b'\n')
+        pending = lines.pop()
+        yield from lines
+
+    if pending:
+        yield pending
+
+
+def iter_lines(stream: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = DEFAULT_ENCODING) -> Iterator[str]:
+    """Streams decoded lines out of a binary stream reading it in chunks, so memory usage does not depend on the size of
+       the input and the first line is available as soon as it has been read.
+
+        Splitting happens on bytes before decoding, which is safe for UTF-8 since a `\\n` byte is never part of a
+        multibyte sequence. Undecodable bytes are replaced instead of aborting the whole ingestion.
+
+        Keyword arguments:
+        - stream -- binary stream to read from
+        - chunk_size -- maximum number of bytes to read on each call
+        - encoding -- encoding used to decode each line
+
+        Returns:
+        Iterator[str]
+    """
+    return decode_lines(iter_byte_lines(iter_chunks(stream, chunk_size)), encoding)
+
+
+def decode_lines(byte_lines: Iterable[bytes], encoding: str = DEFAULT_ENCODING) -> Iterator[str]:
+    """Decodes lines split on bytes, replacing undecodable bytes"""
+    for line in byte_lines:
+        yield line.decode(encoding, errors='replace')
+
+
+def can_mmap(stream: BinaryIO) -> bool:
+    """Returns whether a binary stream is backed by a non empty regular file, which is what `iter_mmap_lines` needs"""
+    try:
+        status = os.fstat(stream.fileno())
+    except (AttributeError, OSError, ValueError):
+        return False
+
+    return stat.S_ISREG(status.st_mode) and status.st_size > 0
+
+
+def iter_mmap_lines(stream: BinaryIO, window_size: int = DEFAULT_WINDOW_SIZE, encoding: str = DEFAULT_ENCODING) -> Iterator[str]:
+    """Streams decoded lines out of a file by memory mapping it, reading from the current position of the stream to its end.
+
+        The mapping is walked in windows of about `window_size` bytes that end right after a `\\n`. Each window is decoded with a single
+        call and split as a string, which is much cheaper than decoding every line on its own, and the file pages are read by the OS on
+        demand instead of being copied into read buffers first. Lines are the same ones `iter_lines` yields.
+
+        Keyword arguments:
+        - stream -- binary stream of a regular file (see `can_mmap`)
+        - window_size -- approximate amount of bytes decoded at once
+        - encoding -- encoding used to decode the lines
+
+        Returns:
+        Iterator[str]
+    """
+    start = stream.tell()
+    with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        size = len(mapped)
+        if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+
+        while start < size:
+            end = size
+            if start + window_size < size:
+                end = mapped.rfind(b'\n', start, start + window_size) + 1
+                if not end:
+                    # a single line longer than the window
+                    end = mapped.find(b'\n', start + window_size) + 1 or size
+
+            text = mapped[start:end].decode(encoding, errors='replace')
+            lines = text.split('\n')
+            if text.endswith('\n'):
+                lines.pop()
+
+            yield from lines
+            start = end
+
+
+def iter_lines_with_offsets(stream: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = DEFAULT_ENCODING, start_offset: int = 0) -> Iterator[tuple[str, int]]:
+    """Same as `iter_lines`, but each line comes with the byte offset of the stream right after it (line terminator included), which is
+        where reading has to start over to continue after that line.
+
+        Keyword arguments:
+        - stream -- binary stream to read from, already positioned at `start_offset`
+        - chunk_size -- maximum number of bytes to read on each call
+        - encoding -- encoding used to decode each line
+        - start_offset -- byte offset of the stream where reading starts
+
+        Returns:
+        Iterator[tuple[str, int]]
+    """
+    offset = start_offset
+    pending = b''
+
+    for chunk in iter_chunks(stream, chunk_size):
+        lines = (pending + chunk).split(b'\n') if pending else chunk.split(b'\n')
+        pending = lines.pop()
+        for line in lines:
+            offset += len(line) + 1
+            yield line.decode(encoding, errors='replace'), offset
+
+    if pending:
+        yield pending.decode(encoding, errors='replace'), offset + len(pending)
+
+
+def iter_batches(lines: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[list[str]]:
+    """Groups an iterable of lines in lists of at most `batch_size` lines, keeping their order.
+
+        Keyword arguments:
+        - lines -- iterable of strings
+        - batch_size -- maximum amount of lines per batch
+
+        Returns:
+        Iterator[list[str]]
+    """
+    iterator = iter(lines)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
@@ -0,0 +1,60 @@
+from typing import Dict
+
+
+class SymbolTable(object):
+    """SymbolTable interns names case insensitively: each key (a lowercased name) is stored once and gets a dense integer id, in the order keys
+       are added, so whatever is kept per key can live in a list indexed by id.
+
+       Looking a name up lowercases it only the first time that spelling shows up: spellings that resolve to a key are remembered in `ids` next
+       to the keys themselves (a key is its own spelling), so the usual case, a name that is already lowercase, costs a single dict lookup and no
+       new string. Spellings that resolve to nothing are not remembered, so names that are never added can't make the table grow.
+    """
+    __slots__ = ('keys', 'ids')
+
+    def __init__(self):
+        self.keys: list[str] = list()
+        """Keys by id"""
+        self.ids: Dict[str, int] = dict()
+        """Ids by key and by every other spelling looked up so far. Callers read it directly, it is the hot path."""
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key: str) -> int:
+        """
+            Interns a key and returns its id (the one it already had, if it was added before)
+
+            Keyword arguments:
+            - key -- lowercased name
+
+            Returns:
+            int
+        """
+        symbol_id = self.ids.get(key)
+        if symbol_id is None:
+            symbol_id = self.ids[key] = len(self.keys)
+            self.keys.append(key)
+
+        return symbol_id
+
+    def find(self, name: str) -> int | None:
+        """
+            Returns the id of the key of a name in any case, or None if it was not added
+
+            Keyword arguments:
+            - name -- name to look up, as written
+
+            Returns:
+            int | None
+        """
+        symbol_id = self.ids.get(name)
+        if symbol_id is None:
+            symbol_id = self.ids.get(name.lower())
+            if symbol_id is not None:
+                self.ids[name] = symbol_id
+
+        return symbol_id
+
+    def clear(self) -> None:
+        self.keys.clear()
+        self.ids.clear()
@@ -1,32 +1,44 @@
 import argparse
+import signal
 import sys
 import logging
+import threading
+import time
+from typing import TYPE_CHECKING, BinaryIO, Iterable
 
+from internal.binary_commands import convert_text_to_binary, is_binary_commands, process_binary_commands
+from internal.compression import decompression_errors, detect_compression, iter_lines_in_background, open_decompressed, stop_at_decompression_errors
 from internal.consolidator import Consolidator
-from internal.core import config_stdout_logger
-from internal.core_processing import create_recurring_report_from, process_command_line
+from internal.core import config_stdout_logger, skip_unused_log_record_fields
+from internal.core_processing import create_recurring_report_from, dump_consolidator_state, process_command_lines
 from internal.entry_reporter import EntriesReporter
+from internal.entry_stores import DEFAULT_RING_SIZE, ReporterRetention
+from internal.state_store import StateStore, parse_month
+from internal.snapshot import DEFAULT_SNAPSHOT_EVERY, SnapshotWriter, load_snapshot, process_command_lines_with_snapshots
+from internal.streaming import DEFAULT_BATCH_SIZE, DEFAULT_CHUNK_SIZE, can_mmap, iter_lines, iter_lines_with_offsets, iter_mmap_lines
 
-logger: logging.Logger
-
+# Most runs are short, so interpreter startup matters: the modules only some modes need (asyncio for the server above all) are imported
+# by the functions of those modes. tests/test_startup.py keeps them out of the plain processing path.
+if TYPE_CHECKING:
+    from internal.command_log import CommandLogWriter
+    from internal.stats import ProcessingStats
 
-def process_commands_from_stdin_pipe():
-    logger_level = logging.CRITICAL
-    logging.basicConfig(level=logger_level)
-    logger=config_stdout_logger(logging.getLogger(__name__), logger_level)
+logger: logging.Logger
 
-    reporter = EntriesReporter(logger=logger)
-    consolidator = Consolidator(reporter)
 
-    for line in sys.stdin.readlines():
-        process_command_line(consolidator, reporter, line)
-    
-    logger.debug(consolidator.to_json())
+def parse_positive_int(value: str) -> int:
+    """Argument type of the sizes and amounts that have to be at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {number}")
 
-    if consolidator.has_any_data():
-        sys.stdout.writelines(create_recurring_report_from(consolidator))
+    return number
 
-def process_commands_from_loading_file():
+def build_argument_parser() -> argparse.ArgumentParser:
+    """Creates the parser for the command line arguments shared by both entry points"""
     parser = argparse.ArgumentParser(
         prog='recurring',
         epilog="Thanks for using %(prog)s! :)",
@@ -34,43 +46,451 @@ def process_commands_from_loading_file():
         add_help=True,
         allow_abbrev=True,
         )
-    
-    parser.add_argument('filename', type=str, nargs=1, help="Filename to process")
+
+    parser.add_argument('filename', type=str, nargs='?', help="Filename to process. When omitted, commands are read from stdin")
     parser.add_argument('-v', '--verbose', action="store_true")
-    
-    args = parser.parse_args()
-    
-    if not args.verbose:
+    parser.add_argument('--debug', action="store_true", help="Log debug messages and dump the consolidated state as JSON to stderr")
+    parser.add_argument('--sync-logging', action="store_true", help="Write logs from the processing thread as they happen, instead of queueing them to a background thread")
+    parser.add_argument('--dump-json', type=str, help="File to write the consolidated state to as JSON")
+    parser.add_argument('--chunk-size', type=parse_positive_int, default=DEFAULT_CHUNK_SIZE, help="Size in bytes of each read from the input")
+    parser.add_argument('--no-mmap', action="store_false", dest="mmap", help="Read input files in chunks instead of memory mapping them")
+    parser.add_argument('--retention', type=ReporterRetention, choices=[retention.value for retention in ReporterRetention], default=ReporterRetention.ALL,
+                        help="How many processing entries are kept: all of them, only counts, the last --ring-size ones per category, or spilled to --spill-file")
+    parser.add_argument('--ring-size', type=parse_positive_int, default=DEFAULT_RING_SIZE, help="Amount of processing entries kept per category with ring retention")
+    parser.add_argument('--spill-file', type=str, help="File processing entries are appended to with spill retention")
+    parser.add_argument('--workers', type=int, default=1, help="Amount of processes used to parse lines. Results are still applied in input order")
+    parser.add_argument('--batch-size', type=parse_positive_int, default=DEFAULT_BATCH_SIZE, help="Amount of lines sent to a parsing process at once when --workers is greater than 1")
+    parser.add_argument('--snapshot', type=str, help="File to periodically write snapshots of the consolidated state (and the input offset) to")
+    parser.add_argument('--snapshot-every', type=parse_positive_int, default=DEFAULT_SNAPSHOT_EVERY, help="Amount of lines between snapshots")
+    parser.add_argument('--resume', action="store_true", help="Start from the latest --snapshot, reading the input file from the offset it recorded")
+    parser.add_argument('--state', type=str, help="SQLite file with the state consolidated by previous runs. The input is ingested as the commands of --month on top of it")
+    parser.add_argument('--month', type=parse_month, help="Month (YYYY-MM) the input belongs to, it must be after the latest month stored in --state")
+    parser.add_argument('--report-month', type=parse_month, help="Print the report of a month stored in --state instead of processing any input")
+    parser.add_argument('--command-log', type=str, help="Binary file every successfully applied command is appended to, so the state can be rebuilt with --replay-log")
+    parser.add_argument('--replay-log', type=str, help="Rebuild the state from a --command-log file and print its report instead of processing any input")
+    parser.add_argument('--to-binary', type=str, help="Convert the input to the binary command format, writing it to this file, instead of processing it")
+    parser.add_argument('--serve-unix', type=str, help="Run as a server accepting command lines (and REPORT requests) on a Unix socket at this path")
+    parser.add_argument('--serve-tcp', type=str, help="Run as a server accepting command lines (and REPORT requests) on this HOST:PORT")
+    parser.add_argument('--queue-size', type=parse_positive_int, default=None, help="Amount of received lines waiting to be applied before the server pushes back on producers (10000 by default)")
+    parser.add_argument('-f', '--follow', action="store_true", help="Keep following the input file as commands get appended to it (handling rotation) until SIGINT or SIGTERM")
+    parser.add_argument('--report-every', type=float, default=60.0, help="Seconds between the reports printed while following a file (only printed when it changed)")
+    parser.add_argument('--stats', action="store_true", help="Time each processing stage and count the outcome of each command, printing a summary to stderr at the end")
+    parser.add_argument('--stats-json', default=None, metavar='PATH', help="Also write the --stats metrics as JSON to the given file (implies --stats)")
+    parser.add_argument('--no-retain-donations', action="store_false", dest="retain_donations",
+                        help="Only keep running totals for donors and campaigns instead of every donation")
+    parser.add_argument('--columnar', action="store_true",
+                        help="Keep every donation as compact columns instead of Donation objects and compute the report from them with NumPy (needs numpy)")
+
+    return parser
+
+def build_logger(args: argparse.Namespace) -> logging.Logger:
+    if args.debug:
+        logger_level=logging.DEBUG
+    elif args.verbose:
+        logger_level=logging.INFO
+    else:
         logger_level=logging.CRITICAL
+
+    skip_unused_log_record_fields()
+
+    queued = is_logging_queued(args)
+    if queued:
+        from internal.queued_logging import BatchFlushingStreamHandler, enqueue_handlers
+        logging.basicConfig(level=logger_level, handlers=[BatchFlushingStreamHandler(sys.stderr)])
+        enqueue_handlers(logging.getLogger())
     else:
-        logger_level=logging.INFO
+        logging.basicConfig(level=logger_level)
+
+    return config_stdout_logger(logging.getLogger(__name__), logger_level, queued=queued)
+
+def is_logging_queued(args: argparse.Namespace) -> bool:
+    """Logs (only written with --verbose or --debug) are queued to a background thread unless --sync-logging is used"""
+    return (args.verbose or args.debug) and not args.sync_logging
+
+def wait_for_logs(logger: logging.Logger, args: argparse.Namespace):
+    """Waits until queued logs have been written. The state dump and the report go to the same streams logs do, after every one of them"""
+    if is_logging_queued(args):
+        from internal.queued_logging import wait_for_queued_logging
+        wait_for_queued_logging(logger, logging.getLogger())
+
+def build_consolidator(logger: logging.Logger, args: argparse.Namespace) -> tuple[EntriesReporter, Consolidator, "CommandLogWriter | None"]:
+    """Creates the reporter, the command log (with --command-log) and the consolidator set up by the command line arguments"""
+    reporter = EntriesReporter(logger=logger, retention=args.retention, ring_size=args.ring_size, spill_path=args.spill_file)
+    command_log = None
+    if args.command_log:
+        from internal.command_log import CommandLogWriter
+        command_log = CommandLogWriter(args.command_log)
+    consolidator = Consolidator(reporter, retain_donations=args.retain_donations and not args.columnar, command_log=command_log,
+                                donation_columns=build_donation_columns(args))
+
+    # when resuming from a snapshot, the snapshot holds the state instead (see `process_commands_with_snapshots`)
+    if command_log and command_log.has_records() and not (args.snapshot and args.resume):
+        continue_command_log(consolidator, command_log, logger)
+
+    return reporter, consolidator, command_log
+
+def continue_command_log(consolidator: Consolidator, command_log: "CommandLogWriter", logger: logging.Logger):
+    """Replays the records a --command-log already holds into the consolidator, so the run continues the state the log describes and the records
+       it appends refer to the donors and campaigns already logged (instead of logging them again)"""
+    from internal.command_log import replay_command_log
+
+    records = replay_command_log(command_log.path, consolidator)
+    logger.info(f"Continuing {command_log.path} after its {records} records")
 
-    logging.basicConfig(level=logger_level)
+def build_donation_columns(args: argparse.Namespace):
+    """Returns the DonationColumns applied donations are kept in with --columnar, otherwise None"""
+    if not args.columnar:
+        return None
 
-    logger=config_stdout_logger(logging.getLogger(__name__), logger_level)
+    from internal.columnar import DonationColumns
+    return DonationColumns()
+
+def create_report(consolidator: Consolidator) -> str:
+    """Returns the final report, computed from the donation columns of the consolidator with --columnar"""
+    if consolidator.donation_columns is not None:
+        from internal.columnar import create_columnar_report
+        return create_columnar_report(consolidator)
+
+    return create_recurring_report_from(consolidator)
+
+def build_stats(reporter: EntriesReporter, args: argparse.Namespace) -> "ProcessingStats | None":
+    """Returns the ProcessingStats of the run, timing the reporter, with --stats or --stats-json. Otherwise None, so nothing gets instrumented"""
+    if not (args.stats or args.stats_json):
+        return None
+
+    from internal.stats import ProcessingStats
+    stats = ProcessingStats()
+    stats.instrument_reporter(reporter)
+
+    return stats
+
+def finish_processing(consolidator: Consolidator, reporter: EntriesReporter, command_log: "CommandLogWriter | None", logger: logging.Logger, args: argparse.Namespace,
+                      stats: "ProcessingStats | None" = None):
+    """Closes the command log and the reporter, dumps the consolidated state (with --debug or --dump-json), prints the final report and
+       the --stats summary"""
+    if command_log:
+        command_log.close(sync=True)
+
+    wait_for_logs(logger, args)
+    dump_consolidator_state(consolidator, logger, args.dump_json)
+    reporter.close()
+
+    if consolidator.has_any_data():
+        started_ns = time.perf_counter_ns()
+        sys.stdout.writelines(create_report(consolidator))
+        if stats:
+            sys.stdout.flush()
+            stats.add("report", time.perf_counter_ns() - started_ns)
+
+    if stats:
+        stats.finish()
+        sys.stderr.write(f"\n{stats.format_summary()}\n")
+        if args.stats_json:
+            from internal.stats import write_stats_json
+            write_stats_json(stats, args.stats_json)
+
+def read_until_decompression_error(items: Iterable, compression: str | None, logger: logging.Logger) -> Iterable:
+    """Items read from a compressed stream end at a truncated or corrupted part of it, which is logged as critical (see
+       `stop_at_decompression_errors`), so the report of what was read before is still printed. Uncompressed input is left as is."""
+    if not compression:
+        return items
+
+    return stop_at_decompression_errors(items, compression, lambda exc: logger.critical(f"Unable to read the rest of the {compression} compressed input: {exc}"))
+
+def process_commands_from_stream(stream: BinaryIO, logger: logging.Logger, args: argparse.Namespace):
+    """Streams the commands of a binary stream through the consolidator and prints the final report"""
+    compression = detect_compression(stream) if stream else None
+    if compression:
+        try:
+            stream = open_decompressed(stream, compression)
+        except ValueError as exc:
+            logger.critical(f"Unable to read {compression} compressed input: {exc}")
+            stream = None
+
+    if stream and args.to_binary:
+        with open(args.to_binary, 'wb') as binary_file:
+            written, skipped = convert_text_to_binary(read_until_decompression_error(iter_lines(stream, chunk_size=args.chunk_size), compression, logger),
+                                                      binary_file)
+        logger.info(f"{written} commands written to {args.to_binary}, {skipped} lines left out since they would be discarded")
+        return
+
+    reporter, consolidator, command_log = build_consolidator(logger, args)
+    stats = build_stats(reporter, args)
+
+    store = StateStore(args.state) if args.state else None
+    if store:
+        store.load_current_state(consolidator)
+
+    if stream and is_binary_commands(stream):
+        if args.snapshot:
+            logger.warning("Snapshots are not taken for input in the binary command format")
+        try:
+            process_binary_commands(consolidator, stream, chunk_size=args.chunk_size)
+        except (ValueError, *(decompression_errors(compression) if compression else ())) as exc:
+            logger.critical(f"Unable to read the rest of the binary command input: {exc}")
+    elif stream and args.snapshot:
+        process_commands_with_snapshots(stream, consolidator, reporter, command_log, logger, args, compression)
+    elif stream:
+        if compression:
+            lines = read_until_decompression_error(iter_lines_in_background(stream, chunk_size=args.chunk_size), compression, logger)
+        elif args.mmap and can_mmap(stream):
+            lines = iter_mmap_lines(stream)
+        else:
+            lines = iter_lines(stream, chunk_size=args.chunk_size)
+        if args.workers > 1:
+            from internal.parallel import process_command_lines_parallel
+            process_command_lines_parallel(consolidator, reporter, stats.timed_lines(lines) if stats else lines, workers=args.workers, batch_size=args.batch_size)
+        elif stats:
+            stats.process_command_lines(consolidator, reporter, lines)
+        else:
+            process_command_lines(consolidator, reporter, lines)
+
+    if store:
+        if stream:
+            store.save_month(consolidator, args.month)
+        store.close()
+
+    finish_processing(consolidator, reporter, command_log, logger, args, stats)
+
+def process_commands_with_snapshots(stream: BinaryIO, consolidator: Consolidator, reporter: EntriesReporter, command_log: "CommandLogWriter | None",
+                                    logger: logging.Logger, args: argparse.Namespace, compression: str | None = None):
+    """Processes the commands of a binary stream writing periodic snapshots of the consolidator. With --resume, the consolidator
+       starts from the latest snapshot and the stream is read from the offset it recorded, and the command log (if any) goes back to the
+       size it had then, dropping the records that will be written again. Otherwise a snapshot is taken before processing any line when
+       there is a command log, so a run that dies early can be resumed without logging its records twice."""
+    offset, lines = 0, 0
+    snapshot = None
+    if args.resume:
+        try:
+            snapshot = load_snapshot(args.snapshot)
+        except (OSError, ValueError) as exc:
+            logger.critical(f"Unable to resume from snapshot {args.snapshot}: {exc}")
+            return
+        if snapshot and command_log:
+            try:
+                if snapshot.command_log_size is None:
+                    raise ValueError("the snapshot was taken without --command-log")
+                command_log.truncate(snapshot.command_log_size)
+            except ValueError as exc:
+                logger.critical(f"Unable to resume {args.command_log} from snapshot {args.snapshot}: {exc}")
+                return
+        if snapshot:
+            consolidator.restore_state(snapshot.state)
+            offset, lines = snapshot.offset, snapshot.lines
+            stream.seek(offset)
+            logger.info(f"Resuming from snapshot {args.snapshot} at line {lines} (byte offset {offset})")
+        else:
+            logger.info(f"No snapshot found at {args.snapshot}, starting from the beginning")
+            if command_log and command_log.has_records():
+                continue_command_log(consolidator, command_log, logger)
+
+    writer = SnapshotWriter(args.snapshot, logger, command_log=command_log)
+    try:
+        if command_log and not snapshot:
+            writer.submit(consolidator, offset, lines)
+        lines_with_offsets = read_until_decompression_error(iter_lines_with_offsets(stream, chunk_size=args.chunk_size, start_offset=offset),
+                                                            compression, logger)
+        process_command_lines_with_snapshots(consolidator, reporter, lines_with_offsets, writer, every=args.snapshot_every, lines=lines)
+    finally:
+        writer.close()
 
-    reporter = EntriesReporter(logger=logger)
-    consolidator = Consolidator(reporter)
+def print_stored_month_report(args: argparse.Namespace):
+    """Prints the report of a month stored in --state, without processing any command"""
+    logger = build_logger(args)
+    consolidator = Consolidator(EntriesReporter(logger=logger))
 
-    filename = str(args.filename[0])
+    store = StateStore(args.state)
     try:
-        source_file = open(filename, 'r', encoding='utf-8')
+        store.load_month(consolidator, args.report_month)
+    finally:
+        store.close()
+
+    wait_for_logs(logger, args)
+    if consolidator.has_any_data():
+        sys.stdout.writelines(create_recurring_report_from(consolidator))
+
+def print_replayed_log_report(args: argparse.Namespace):
+    """Rebuilds the state from a command log and prints its report, without processing any command"""
+    from internal.command_log import replay_command_log
+
+    logger = build_logger(args)
+    consolidator = Consolidator(EntriesReporter(logger=logger), retain_donations=args.retain_donations and not args.columnar,
+                                donation_columns=build_donation_columns(args))
+
+    records = replay_command_log(args.replay_log, consolidator)
+    logger.info(f"Replayed {records} records from {args.replay_log}")
+
+    wait_for_logs(logger, args)
+    dump_consolidator_state(consolidator, logger, args.dump_json)
+    if consolidator.has_any_data():
+        sys.stdout.writelines(create_report(consolidator))
+
+async def serve_commands(args: argparse.Namespace):
+    """Runs the ingestion server until SIGINT or SIGTERM are received, then prints the final report"""
+    import asyncio
+    from internal.server import DEFAULT_QUEUE_SIZE, IngestionServer
+
+    logger = build_logger(args)
+    reporter, consolidator, command_log = build_consolidator(logger, args)
+    stats = build_stats(reporter, args)
+    server = IngestionServer(consolidator, reporter, logger, queue_size=DEFAULT_QUEUE_SIZE if args.queue_size is None else args.queue_size)
+
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signal_number, stopped.set)
+
+    if args.serve_unix:
+        await server.start_unix(args.serve_unix)
+        logger.info(f"Listening on {args.serve_unix}")
+    if args.serve_tcp:
+        host, _, port = args.serve_tcp.rpartition(':')
+        port = await server.start_tcp(host or None, int(port))
+        logger.info(f"Listening on {host or '*'}:{port}")
+
+    await stopped.wait()
+    await server.close()
+    logger.info(f"Stopped after applying {server.lines} lines")
+
+    finish_processing(consolidator, reporter, command_log, logger, args, stats)
+
+def follow_commands_from_file(args: argparse.Namespace):
+    """Processes the input file and keeps following it until SIGINT or SIGTERM are received, printing the report every --report-every seconds
+       when it changed and the final report at the end"""
+    from internal.follow import FileFollower
+    from internal.report_cache import ReportCache
+
+    logger = build_logger(args)
+    reporter, consolidator, command_log = build_consolidator(logger, args)
+    stats = build_stats(reporter, args)
+    process_lines = stats.process_command_lines if stats else process_command_lines
+    report_cache = ReportCache(consolidator)
+
+    stopped = threading.Event()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signal_number, lambda *_: stopped.set())
+
+    follower = FileFollower(args.filename, chunk_size=args.chunk_size, logger=logger)
+    last_report = report_cache.render()
+    next_report_at = time.monotonic() + args.report_every
+
+    for lines in follower.iter_batches(stopped):
+        process_lines(consolidator, reporter, lines)
+
+        if time.monotonic() >= next_report_at:
+            report = report_cache.render()
+            if report is not last_report:
+                sys.stdout.write(f"{report}\n\n")
+                sys.stdout.flush()
+                last_report = report
+            next_report_at = time.monotonic() + args.report_every
+
+    logger.info(f"Stopped following {args.filename}")
+    finish_processing(consolidator, reporter, command_log, logger, args, stats)
+
+def process_commands_from_stdin_pipe(args: argparse.Namespace):
+    logger = build_logger(args)
+
+    process_commands_from_stream(sys.stdin.buffer, logger, args)
+
+def process_commands_from_loading_file(args: argparse.Namespace):
+    logger = build_logger(args)
+
+    filename = str(args.filename)
+    try:
+        source_file = open(filename, 'rb')
     except FileNotFoundError:
         logger.error(f"Unable to read file {filename}")
+        process_commands_from_stream(None, logger, args)
     else:
         with source_file:
-            for line in source_file:
-                process_command_line(consolidator, reporter, line)
+            process_commands_from_stream(source_file, logger, args)
 
-    logger.debug(consolidator.to_json())
 
-    if consolidator.has_any_data():
-        sys.stdout.writelines(create_recurring_report_from(consolidator))
+if __name__ == "__main__":
+    parser = build_argument_parser()
+    args = parser.parse_args()
 
+    if args.retention == ReporterRetention.SPILL and not args.spill_file:
+        parser.error("--spill-file is required with spill retention")
 
-if __name__ == "__main__":
+    if args.resume and not (args.snapshot and args.filename):
+        parser.error("--resume requires --snapshot and an input file")
+
+    if args.snapshot and args.workers > 1:
+        parser.error("--snapshot can't be combined with --workers")
+
+    if args.to_binary and (args.state or args.snapshot or args.command_log):
+        parser.error("--to-binary only converts the input, it can't be combined with --state, --snapshot or --command-log")
 
-    if sys.stdin.readable() and not sys.stdin.isatty():
-        process_commands_from_stdin_pipe()
-    elif len(sys.argv) > 1:
-        process_commands_from_loading_file()
\ No newline at end of file
+    if args.command_log and args.state:
+        parser.error("--command-log can't be combined with --state: the donors and campaigns loaded from it are not in the log")
+
+    if args.command_log:
+        from internal.command_log import check_command_log
+        try:
+            check_command_log(args.command_log)
+        except (OSError, ValueError) as exc:
+            parser.error(f"Unable to append to {args.command_log}: {exc}")
+
+    if args.columnar:
+        if args.state or args.snapshot or args.to_binary or args.follow or args.serve_unix or args.serve_tcp:
+            parser.error("--columnar can't be combined with --state, --snapshot, --to-binary, --follow or server mode")
+        from internal.columnar import import_numpy
+        try:
+            import_numpy()
+        except ValueError as exc:
+            parser.error(str(exc))
+
+    if args.replay_log:
+        try:
+            print_replayed_log_report(args)
+        except (OSError, ValueError) as exc:
+            parser.error(f"Unable to replay {args.replay_log}: {exc}")
+        sys.exit(0)
+
+    if (args.month or args.report_month) and not args.state:
+        parser.error("--month and --report-month require --state")
+
+    if args.state and args.report_month:
+        try:
+            print_stored_month_report(args)
+        except ValueError as exc:
+            parser.error(str(exc))
+        sys.exit(0)
+
+    if args.state:
+        if not args.month:
+            parser.error("--state requires the --month the input belongs to")
+
+        store = StateStore(args.state)
+        try:
+            store.check_month_can_be_ingested(args.month)
+        except ValueError as exc:
+            parser.error(str(exc))
+        finally:
+            store.close()
+
+    if args.serve_unix or args.serve_tcp:
+        if args.filename or args.state or args.snapshot or args.to_binary:
+            parser.error("server mode can't be combined with an input file, --state, --snapshot or --to-binary")
+        if args.serve_tcp and not args.serve_tcp.rpartition(':')[2].isdigit():
+            parser.error("--serve-tcp expects HOST:PORT")
+        import asyncio
+        asyncio.run(serve_commands(args))
+        sys.exit(0)
+
+    if args.follow:
+        if not args.filename:
+            parser.error("--follow requires an input file")
+        if args.state or args.snapshot or args.to_binary or args.workers > 1:
+            parser.error("--follow can't be combined with --state, --snapshot, --to-binary or --workers")
+        follow_commands_from_file(args)
+        sys.exit(0)
+
+    if args.filename:
+        process_commands_from_loading_file(args)
+    elif sys.stdin.readable() and not sys.stdin.isatty():
+        process_commands_from_stdin_pipe(args)
+    else:
+        parser.print_help()
@@ -0,0 +1,14 @@
+import logging
+import pytest
+
+from internal.consolidator import Consolidator
+from internal.entry_reporter import EntriesReporter
+
+
+@pytest.fixture
+def build_consolidator():
+    """Factory of Consolidators, each one with an EntriesReporter of its own. Keyword arguments (e.g. command_log) go to the Consolidator."""
+    def build(**kwargs) -> Consolidator:
+        return Consolidator(EntriesReporter(logging.getLogger("test")), **kwargs)
+
+    return build
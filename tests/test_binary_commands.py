@@ -0,0 +1,99 @@
+import io
+import pytest
+
+from internal.binary_commands import convert_text_to_binary, encode_command, is_binary_commands, iter_binary_commands, process_binary_commands, write_binary_commands
+from internal.commands import AddCampaign, AddDonation, AddDonor
+from internal.core_processing import create_recurring_report_from, process_command_lines
+from internal.models import DonationFrequency
+
+lines = [
+    "Add Donor Greg $1000",
+    "Add Donor Señora $100.50",
+    "Add Campaign SaveTheDogs",
+    "Add Campaign HelpTheKids",
+    "Donate Greg Weekly SaveTheDogs $100",
+    "Donate greg Monthly HELPTHEKIDS $200.25",
+    "Donate Señora Monthly SaveTheDogs $50",
+    "Donate Señora Monthly SaveTheDogs $60",
+    "Donate Nobody Monthly SaveTheDogs $60",
+    "Donate Greg Yearly SaveTheDogs $60",
+    "Add Donor Janine $-10",
+    "saraza",
+]
+
+def _to_binary(lines):
+    stream = io.BytesIO()
+    convert_text_to_binary(lines, stream)
+    return stream.getvalue()
+
+###
+## ENCODING
+###
+
+def test_roundtrip():
+    commands = [AddDonor("Greg", 100000), AddCampaign("SaveTheDogs"), AddDonation("greg", DonationFrequency.WEEKLY, "savethedogs", 1050)]
+    stream = io.BytesIO()
+    write_binary_commands(stream, commands)
+
+    decoded = list(iter_binary_commands(io.BytesIO(stream.getvalue())))
+
+    assert [(type(command), command.to_tuple()) for command in decoded] == [(type(command), command.to_tuple()) for command in commands]
+
+def test_encode_unknown_command():
+    with pytest.raises(ValueError):
+        encode_command(object())
+
+@pytest.mark.parametrize('command', [AddDonor("Greg", 1 << 63), AddDonor("G" * 0xFFFF, 100), AddDonation("g" * 40000, DonationFrequency.WEEKLY, "s" * 40000, 100)])
+def test_encode_commands_that_do_not_fit(command):
+    with pytest.raises(ValueError):
+        encode_command(command)
+
+def test_converter_leaves_out_discarded_lines():
+    stream = io.BytesIO()
+
+    assert convert_text_to_binary(lines, stream) == (9, 3)
+
+def test_converter_leaves_out_commands_that_do_not_fit():
+    stream = io.BytesIO()
+
+    assert convert_text_to_binary(lines + [f"Donate {'g' * 40000} Weekly {'s' * 40000} $10"], stream) == (9, 4)
+    assert len(list(iter_binary_commands(io.BytesIO(stream.getvalue())))) == 9
+
+###
+## DECODING
+###
+
+@pytest.mark.parametrize('chunk_size', [1, 5, 64 * 1024])
+def test_same_report_as_text(chunk_size, build_consolidator):
+    text_consolidator = build_consolidator()
+    process_command_lines(text_consolidator, text_consolidator._reporter, lines)
+
+    binary_consolidator = build_consolidator()
+    assert process_binary_commands(binary_consolidator, io.BytesIO(_to_binary(lines)), chunk_size=chunk_size) == 9
+
+    assert create_recurring_report_from(binary_consolidator) == create_recurring_report_from(text_consolidator)
+    assert [donor.funds for donor in binary_consolidator.all_donors] == [donor.funds for donor in text_consolidator.all_donors]
+
+def test_detect_binary_commands():
+    assert is_binary_commands(io.BufferedReader(io.BytesIO(_to_binary(lines))))
+    assert not is_binary_commands(io.BufferedReader(io.BytesIO("\n".join(lines).encode())))
+
+def _with_corrupted_frequency():
+    data = bytearray(_to_binary(["Add Donor Greg $10", "Add Campaign Dogs", "Donate Greg Monthly Dogs $1"]))
+    # the frequency byte follows the header of the last record and its amount
+    data[-len("GregDogs") - 3] = 200
+    return bytes(data)
+
+@pytest.mark.parametrize('data', [b"", b"Add Donor Greg $1000\n", _to_binary(lines)[:-1], _with_corrupted_frequency()])
+def test_decode_invalid_streams(data):
+    with pytest.raises(ValueError):
+        list(iter_binary_commands(io.BytesIO(data)))
+
+def test_commands_before_a_corrupted_record_are_executed(build_consolidator):
+    data = _to_binary(["Add Donor Greg $1000", "Add Campaign Dogs", "Donate Greg Monthly Dogs $10", "Donate Greg Monthly Dogs $20"])
+    consolidator = build_consolidator()
+
+    with pytest.raises(ValueError):
+        process_binary_commands(consolidator, io.BytesIO(data + b"\x00\x00\x09"))
+
+    assert [donor.total_donated for donor in consolidator.all_donors] == [3000]
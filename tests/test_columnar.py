@@ -0,0 +1,88 @@
+import pytest
+
+from internal.columnar import DonationColumns, aggregate_donations, create_columnar_report
+from internal.commands import COMMAND_REGISTRY
+from internal.command_log import CommandLogWriter, replay_command_log
+from internal.core_processing import create_recurring_report_from, process_command_lines
+from internal.models import DonationFrequency
+
+lines = [
+    "Add Donor Greg $1000",
+    "Add Donor Janine $100",
+    "Add Donor Abel $20",
+    "Add Campaign SaveTheDogs",
+    "Add Campaign HelpTheKids",
+    "Add Campaign Nobody",
+    "Donate Greg Weekly SaveTheDogs $100",
+    "Donate GREG Monthly helpthekids $200.50",
+    "Donate Janine Monthly SaveTheDogs $50",
+    "Donate Janine Monthly SaveTheDogs $60",
+    "Donate Janine Monthly HelpTheKids $0.25",
+    "Donate Nobody Monthly SaveTheDogs $60",
+    "Donate Greg Yearly SaveTheDogs $60",
+]
+
+def _rows(columns: DonationColumns):
+    return list(zip(columns.donor_ids, columns.campaign_ids, columns.frequency_codes, columns.amounts))
+
+###
+## COLUMNS
+###
+
+def test_applied_donations_are_appended_by_id(build_consolidator):
+    consolidator = build_consolidator(donation_columns=DonationColumns())
+    process_command_lines(consolidator, consolidator._reporter, lines)
+
+    assert _rows(consolidator.donation_columns) == [(0, 0, 1, 10000), (0, 1, 0, 20050), (1, 0, 0, 5000), (1, 1, 0, 25)]
+
+def test_batched_donations_are_appended_too(build_consolidator):
+    consolidator = build_consolidator(donation_columns=DonationColumns())
+    process_command_lines(consolidator, consolidator._reporter, lines)
+
+    batched = build_consolidator(donation_columns=DonationColumns())
+    process_command_lines(batched, batched._reporter, [line for line in lines if line.startswith("Add")])
+    donations = [COMMAND_REGISTRY.parse(line).command for line in lines if line.startswith("Donate")]
+    batched.accept_commands(iter([donation for donation in donations if donation is not None]))
+
+    assert _rows(batched.donation_columns) == _rows(consolidator.donation_columns)
+
+def test_replay_appends_logged_donations(tmp_path, build_consolidator):
+    path = str(tmp_path / "commands.log")
+    command_log = CommandLogWriter(path)
+    consolidator = build_consolidator(command_log=command_log, donation_columns=DonationColumns())
+    process_command_lines(consolidator, consolidator._reporter, lines)
+    command_log.close()
+
+    replayed = build_consolidator(donation_columns=DonationColumns())
+    replay_command_log(path, replayed)
+
+    assert _rows(replayed.donation_columns) == _rows(consolidator.donation_columns)
+
+###
+## AGGREGATION
+###
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 1 << 20])
+def test_columnar_report_matches_the_recurring_report(chunk_size, build_consolidator):
+    pytest.importorskip("numpy")
+    consolidator = build_consolidator(donation_columns=DonationColumns())
+    process_command_lines(consolidator, consolidator._reporter, lines)
+
+    assert create_columnar_report(consolidator, chunk_size=chunk_size) == create_recurring_report_from(consolidator)
+
+def test_columnar_report_of_an_empty_consolidator(build_consolidator):
+    assert create_columnar_report(build_consolidator(donation_columns=DonationColumns())) == ""
+
+def test_aggregates_are_exact_beyond_float_precision():
+    pytest.importorskip("numpy")
+    columns = DonationColumns()
+    for amount in (2 ** 51 + 1, 2 ** 51 + 1, 3):
+        columns.append(0, 0, DonationFrequency.MONTHLY, amount)
+    columns.append(1, 0, DonationFrequency.WEEKLY, 2 ** 49 + 1)
+
+    aggregates = aggregate_donations(columns, donors=3, campaigns=1)
+
+    assert aggregates.donor_totals.tolist() == [2 ** 52 + 5, 2 ** 51 + 4, 0]
+    assert aggregates.donor_counts.tolist() == [3, 1, 0]
+    assert aggregates.donor_averages.tolist() == [(2 ** 52 + 5 + 1) // 3, 2 ** 51 + 4, 0]
+    assert aggregates.campaign_totals.tolist() == [2 ** 52 + 2 ** 51 + 9]
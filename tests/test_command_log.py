@@ -0,0 +1,148 @@
+import os
+import pytest
+import struct
+
+from internal.commands import COMMAND_REGISTRY
+from internal.command_log import CommandLogWriter, check_command_log, replay_command_log
+from internal.core_processing import create_recurring_report_from, process_command_lines
+from internal.models import DonationFrequency
+
+lines = [
+    "Add Donor Greg $1000",
+    "Add Donor Janine $100",
+    "Add Donor greg $5",
+    "Add Campaign SaveTheDogs",
+    "Add Campaign HelpTheKids",
+    "Donate Greg Weekly SaveTheDogs $100",
+    "Donate Greg Monthly HelpTheKids $200.50",
+    "Donate Janine Monthly SaveTheDogs $50",
+    "Donate Janine Monthly SaveTheDogs $60",
+    "Donate Nobody Monthly SaveTheDogs $60",
+    "Donate Greg Yearly SaveTheDogs $60",
+]
+
+def _process_and_log(build_consolidator, path, lines):
+    command_log = CommandLogWriter(path)
+    consolidator = build_consolidator(command_log=command_log)
+    process_command_lines(consolidator, consolidator._reporter, lines)
+    command_log.close()
+    return consolidator
+
+def _state_of(consolidator):
+    return ({donor.key: (donor.name, donor.funds, donor.total_donated, donor.donation_count, [(donation.campaign_key, donation.frequency, donation.amount) for donation in donor.donations])
+             for donor in consolidator.all_donors},
+            {campaign.key: (campaign.name, campaign.funds, campaign.donation_count) for campaign in consolidator.all_campaigns})
+
+###
+## REPLAY
+###
+
+def test_replay_rebuilds_the_same_state(tmp_path, build_consolidator):
+    path = str(tmp_path / "commands.log")
+    consolidator = _process_and_log(build_consolidator, path, lines)
+
+    replayed = build_consolidator()
+    records = replay_command_log(path, replayed)
+
+    # only applied commands are logged: 2 donors, 2 campaigns and 3 donations
+    assert records == 7
+    assert _state_of(replayed) == _state_of(consolidator)
+    assert create_recurring_report_from(replayed) == create_recurring_report_from(consolidator)
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64 * 1024])
+def test_replay_reads_the_log_in_chunks(tmp_path, build_consolidator, chunk_size):
+    path = str(tmp_path / "commands.log")
+    consolidator = _process_and_log(build_consolidator, path, lines)
+
+    replayed = build_consolidator()
+
+    assert replay_command_log(path, replayed, chunk_size=chunk_size) == 7
+    assert _state_of(replayed) == _state_of(consolidator)
+
+def test_appending_to_existing_log(tmp_path, build_consolidator):
+    path = str(tmp_path / "commands.log")
+    _process_and_log(build_consolidator, path, lines[:5])
+
+    command_log = CommandLogWriter(path)
+    consolidator = build_consolidator(command_log=command_log)
+    replay_command_log(path, consolidator)
+    process_command_lines(consolidator, consolidator._reporter, lines[5:])
+    command_log.close()
+
+    replayed = build_consolidator()
+    replay_command_log(path, replayed)
+
+    assert _state_of(replayed) == _state_of(_process_and_log(build_consolidator, str(tmp_path / "other.log"), lines))
+
+def test_models_are_untouched_when_the_log_rejects_a_donation(tmp_path, build_consolidator):
+    source = build_consolidator()
+    process_command_lines(source, source._reporter, lines[:5])
+
+    command_log = CommandLogWriter(str(tmp_path / "commands.log"))
+    consolidator = build_consolidator(command_log=command_log)
+    consolidator.restore_state(source.export_state())
+
+    # donors and campaigns restored from elsewhere have no id in the log
+    with pytest.raises(KeyError):
+        consolidator.accept_donation(COMMAND_REGISTRY.parse("Donate Greg Monthly SaveTheDogs $10").command)
+    command_log.close()
+
+    assert [(donor.funds, donor.donation_count) for donor in consolidator.all_donors] == [(100000, 0), (10000, 0)]
+    assert [campaign.funds for campaign in consolidator.all_campaigns] == [0, 0]
+
+def test_records_that_do_not_fit_get_no_id(tmp_path, build_consolidator):
+    path = str(tmp_path / "commands.log")
+    command_log = CommandLogWriter(path)
+    command_log.append_donor("Greg", 1000)
+    with pytest.raises(struct.error):
+        command_log.append_donor("Janine", 1 << 63)
+    with pytest.raises(struct.error):
+        command_log.append_campaign("x" * 65536)
+    command_log.append_donor("Abel", 20)
+    command_log.append_campaign("Dogs")
+    command_log.append_donation("abel", "dogs", DonationFrequency.MONTHLY, 10)
+    command_log.close()
+
+    replayed = build_consolidator()
+    replay_command_log(path, replayed)
+
+    assert [(donor.name, donor.total_donated) for donor in replayed.all_donors] == [("Greg", 0), ("Abel", 10)]
+
+###
+## DAMAGED LOGS
+###
+
+def test_replay_ignores_truncated_last_record(tmp_path, build_consolidator):
+    path = str(tmp_path / "commands.log")
+    _process_and_log(build_consolidator, path, lines)
+    with open(path, 'r+b') as log_file:
+        log_file.truncate(os.path.getsize(path) - 3)
+
+    replayed = build_consolidator()
+
+    assert replay_command_log(path, replayed) == 6
+
+    command_log = CommandLogWriter(path)
+    command_log.append_donation("janine", "savethedogs", replayed.all_donors[0].donations[0].frequency, 100)
+    command_log.close()
+
+    assert replay_command_log(path, build_consolidator()) == 7
+
+def test_replay_rejects_other_files(tmp_path, build_consolidator):
+    path = str(tmp_path / "commands.log")
+    with open(path, 'wb') as log_file:
+        log_file.write(b"Add Donor Greg $1000\n")
+
+    with pytest.raises(ValueError):
+        replay_command_log(path, build_consolidator())
+
+    with pytest.raises(ValueError):
+        check_command_log(path)
+
+def test_check_accepts_logs_and_missing_files(tmp_path, build_consolidator):
+    path = str(tmp_path / "commands.log")
+    check_command_log(path)
+
+    _process_and_log(build_consolidator, path, lines)
+
+    check_command_log(path)
@@ -1,7 +1,7 @@
 import json
 import pytest
 
-from internal.commands import AddCampaign, AddDonation, AddDonor, Command, CommandExecutor
+from internal.commands import COMMAND_REGISTRY, AddCampaign, AddDonation, AddDonor, Command, CommandExecutor, CommandRegistry, parse_frequency
 from internal.models import DonationFrequency
 
 class TestExecutor(CommandExecutor):
@@ -39,6 +39,70 @@ def test_validates_executor_dispatch(command):
     except Exception as exc:
         assert False, str(exc)
 
+@pytest.mark.parametrize('command', all_commands)
+def test_commands_have_no_instance_dict(command):
+    assert not hasattr(command, "__dict__")
+    assert list(command.to_json_obj().keys()) == list(command.__slots__)
+
+###
+## COMMAND REGISTRY
+###
+
+@pytest.mark.parametrize('line, expected_class, expected_params', [
+    ("add donor pepe 10", AddDonor, ["pepe", "10"]),
+    ("ADD Campaign camp", AddCampaign, ["camp"]),
+    ("dOnate pepe weekly camp 10", AddDonation, ["pepe", "weekly", "camp", "10"]),
+    ("add", None, ["add"]),
+    ("add donation pepe", None, ["add", "donation", "pepe"]),
+    ("saraza", None, ["saraza"]),
+    ("", None, []),
+])
+def test_registry_resolve(line, expected_class, expected_params):
+    command_class, params = COMMAND_REGISTRY.resolve(line.split())
+
+    assert command_class == expected_class
+    assert params == expected_params
+
+@pytest.mark.parametrize('command_classes', [[AddDonor, AddDonor], [AddDonation, AddDonation]])
+def test_registry_rejects_colliding_keywords(command_classes):
+    with pytest.raises(ValueError):
+        CommandRegistry(*command_classes)
+
+@pytest.mark.parametrize('line, command_class', [("add donor pepe 10", AddDonor), ("add campaign camp", AddCampaign), ("donate pepe monthly camp 10", AddDonation)])
+def test_class_instantiate_from_string(line, command_class):
+    assert isinstance(command_class.instantiate_from_string(line), command_class)
+    assert all(other_class.instantiate_from_string(line) is None for other_class in [AddDonor, AddCampaign, AddDonation] if other_class != command_class)
+
+###
+## VALUE PARSING
+###
+
+@pytest.mark.parametrize('value, expected_result', [("weekly", DonationFrequency.WEEKLY), ("MONTHLY", DonationFrequency.MONTHLY), ("Weeklyyy", None), ("", None)])
+def test_parse_frequency(value, expected_result):
+    assert parse_frequency(value) == expected_result
+
+@pytest.mark.parametrize('line, malformed', [("add donor pepe", False), ("add donor pepe as10", True), ("add campaign", False), ("donate pepe weekly camp", False), ("donate pepe yearly camp 10", True), ("donate pepe weekly camp $x", True), ("saraza", False)])
+def test_registry_parse_rejects_without_raising(line, malformed):
+    result = COMMAND_REGISTRY.parse(line)
+
+    assert not result
+    assert result.command is None
+    assert result.reason
+    assert result.malformed == malformed
+
+@pytest.mark.parametrize('line', ["add donor pepe 99999999999999999999", f"add donor {'x' * 65536} 10", f"add campaign {'ñ' * 40000}",
+                                  "donate pepe weekly camp 99999999999999999999", f"donate pepe weekly {'x' * 65536} 10",
+                                  f"add donor pepe ${'9' * 5000}", f"donate pepe weekly camp {'9' * 5000}"])
+def test_registry_parse_rejects_values_out_of_range(line):
+    result = COMMAND_REGISTRY.parse(line)
+
+    assert result.command is None
+    assert result.malformed
+
+@pytest.mark.parametrize('line', ["add donor pepe 92233720368547758.07", f"add campaign {'x' * 65535}", f"add campaign {'ñ' * 30000}"])
+def test_registry_parse_accepts_values_at_the_limits(line):
+    assert COMMAND_REGISTRY.parse(line)
+
 ###
 ## DONOR COMMANDS
 ###
@@ -0,0 +1,108 @@
+import bz2
+import gzip
+import io
+import lzma
+import threading
+import pytest
+
+from internal.compression import detect_compression, iter_chunks_in_background, iter_lines_in_background, open_decompressed, stop_at_decompression_errors
+from internal.streaming import iter_lines
+
+content = "Add Donor Greg $1000\nAdd Campaign Señor\r\nDonate Greg Weekly Señor $100\n".encode('utf-8') * 50
+
+compressors = {"gzip": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+
+def _buffered(data):
+    return io.BufferedReader(io.BytesIO(data))
+
+###
+## DETECTION
+###
+
+@pytest.mark.parametrize('compression', list(compressors))
+def test_detect_compression(compression):
+    stream = _buffered(compressors[compression](content))
+
+    assert detect_compression(stream) == compression
+    assert stream.tell() == 0
+
+@pytest.mark.parametrize('data', [content, b"", b"\x1f"])
+def test_detect_uncompressed(data):
+    assert detect_compression(_buffered(data)) is None
+
+def test_detect_zstd():
+    assert detect_compression(_buffered(b"\x28\xb5\x2f\xfd" + b"\x00" * 8)) == "zstd"
+
+def test_unsupported_compression():
+    with pytest.raises(ValueError):
+        open_decompressed(_buffered(content), "rar")
+
+###
+## DECOMPRESSION
+###
+
+@pytest.mark.parametrize('compression', list(compressors))
+@pytest.mark.parametrize('chunk_size', [7, 64 * 1024])
+def test_lines_match_uncompressed(compression, chunk_size):
+    stream = _buffered(compressors[compression](content))
+
+    lines = list(iter_lines_in_background(open_decompressed(stream, detect_compression(stream)), chunk_size=chunk_size, queue_size=2))
+
+    assert lines == list(iter_lines(io.BytesIO(content)))
+
+###
+## BACKGROUND READS
+###
+
+def test_background_read_errors_are_raised():
+    stream = _buffered(gzip.compress(content)[:-20])
+
+    with pytest.raises(EOFError):
+        list(iter_chunks_in_background(open_decompressed(stream, "gzip")))
+
+def test_background_reads_keep_what_was_decompressed_before_an_error():
+    stream = _buffered(gzip.compress(content)[:-20])
+    chunks = list()
+
+    with pytest.raises(EOFError):
+        for chunk in iter_chunks_in_background(open_decompressed(stream, "gzip"), chunk_size=len(content) * 2):
+            chunks.append(chunk)
+
+    assert content.startswith(b"".join(chunks)) and chunks
+
+def test_background_reader_stops_when_closed():
+    threads = threading.active_count()
+    chunks = iter_chunks_in_background(io.BytesIO(content), chunk_size=1, queue_size=1)
+
+    assert next(chunks) == content[:1]
+    chunks.close()
+
+    assert threading.active_count() == threads
+
+###
+## DECOMPRESSION ERRORS
+###
+
+def _corrupted(compression):
+    data = bytearray(compressors[compression](content))
+    data[len(data) // 2:len(data) // 2 + 8] = b"\xff" * 8
+    return bytes(data)
+
+@pytest.mark.parametrize('compression', list(compressors))
+@pytest.mark.parametrize('data', [lambda compression: compressors[compression](content)[:-20], _corrupted])
+def test_decompression_errors_end_the_lines(compression, data):
+    stream = _buffered(data(compression))
+    errors = list()
+
+    lines = list(stop_at_decompression_errors(iter_lines_in_background(open_decompressed(stream, compression)), compression, errors.append))
+
+    assert len(errors) == 1
+    assert lines == list(iter_lines(io.BytesIO(content)))[:len(lines)]
+
+def test_other_errors_are_raised():
+    def lines():
+        yield "Add Donor Greg $1000"
+        raise RuntimeError()
+
+    with pytest.raises(RuntimeError):
+        list(stop_at_decompression_errors(lines(), "gzip", lambda exc: None))
@@ -1,10 +1,12 @@
 
+import io
 import json
 import logging
 import pytest
 
 from internal.commands import AddCampaign, AddDonation, AddDonor, Command
 from internal.consolidator import Consolidator
+from internal.core_processing import create_recurring_report_from
 from internal.entry_reporter import EntriesReporter
 from internal.models import Campaign, DonationFrequency, Donor
 
@@ -46,6 +48,21 @@ def test_to_json(commands):
     assert len(json_object["donors"]) == 1
     assert len(json_object["campaigns"]) == 1
 
+@pytest.mark.parametrize('commands', [[AddDonor(name="Pepe", amount=1563),AddCampaign(name="camp"),AddDonor(name="Pepe", amount=1)]])
+def test_to_json_stream(commands):
+    consolidator = Consolidator(EntriesReporter(logging.getLogger("test")))
+
+    for command in commands:
+        command.dispatch_to_executor(consolidator)
+
+    stream = io.StringIO()
+    assert consolidator.to_json(stream) is None
+    assert stream.getvalue() == consolidator.to_json()
+
+    json_object = json.loads(stream.getvalue())
+    assert len(json_object["donors"]) == 1
+    assert len(json_object["report"]["donor_entries"]) == 2
+
 ###
 ## Dispatch commands
 ###
@@ -88,3 +105,100 @@ def test_dispatch(commands:list[Command]):
     assert len(consolidator.all_donors) == 1
     assert len(consolidator.all_donors[0].donations) == 2
     assert len(consolidator.all_campaigns) == 1
+
+###
+## Running aggregates
+###
+
+aggregate_commands = [
+    AddDonor(name="Pepe", amount=1000),
+    AddCampaign(name="camp"),
+    AddCampaign(name="other"),
+    AddDonation(campaign_name="camp", frequency=DonationFrequency.MONTHLY, donor_name="pepe", amount=100),
+    AddDonation(campaign_name="other", frequency=DonationFrequency.WEEKLY, donor_name="pepe", amount=50),
+    AddDonation(campaign_name="camp", frequency=DonationFrequency.MONTHLY, donor_name="pepe", amount=10000),
+]
+
+@pytest.mark.parametrize('retain_donations', [True, False])
+def test_running_aggregates(retain_donations):
+    consolidator = Consolidator(EntriesReporter(logging.getLogger("test")), retain_donations=retain_donations)
+
+    for command in aggregate_commands:
+        command.dispatch_to_executor(consolidator)
+
+    donor = consolidator.all_donors[0]
+    campaigns = {campaign.key: campaign for campaign in consolidator.all_campaigns}
+
+    assert donor.total_donated == 300
+    assert donor.donation_count == 2
+    assert donor.average_donation == 150
+    assert donor.funds == 700
+    assert len(donor.donations) == (2 if retain_donations else 0)
+    assert (campaigns["camp"].funds, campaigns["camp"].donation_count) == (100, 1)
+    assert (campaigns["other"].funds, campaigns["other"].donation_count) == (200, 1)
+
+###
+## Batched commands
+###
+
+batch_commands = [
+    AddDonor(name="Pepe", amount=1000),
+    AddDonor(name="ana", amount=50),
+    AddCampaign(name="Camp"),
+    AddDonation(campaign_name="camp", frequency=DonationFrequency.MONTHLY, donor_name="PEPE", amount=100),
+    AddDonation(campaign_name="Camp", frequency=DonationFrequency.WEEKLY, donor_name="pepe", amount=50),
+    AddDonation(campaign_name="camp", frequency=DonationFrequency.MONTHLY, donor_name="Ana", amount=100),
+    AddDonation(campaign_name="camp", frequency=DonationFrequency.MONTHLY, donor_name="nobody", amount=10),
+    AddDonation(campaign_name="nowhere", frequency=DonationFrequency.MONTHLY, donor_name="pepe", amount=10),
+    AddDonation(campaign_name="camp", frequency=DonationFrequency.MONTHLY, donor_name="ana", amount=20),
+    AddCampaign(name="other"),
+    AddDonation(campaign_name="other", frequency=DonationFrequency.MONTHLY, donor_name="pepe", amount=30),
+    AddDonation(campaign_name="other", frequency=DonationFrequency.MONTHLY, donor_name="ana", amount=30),
+]
+
+def _entries(reporter: EntriesReporter):
+    return {category: [(entry["result_type"], entry["description"], entry["target"]) for entry in entries]
+            for category, entries in reporter.to_json_obj().items() if isinstance(entries, list)}
+
+@pytest.mark.parametrize('batch_size', [1, 2, 4096])
+def test_accept_commands_matches_dispatching_one_at_a_time(batch_size):
+    expected_reporter = EntriesReporter(logging.getLogger("test"))
+    expected = Consolidator(expected_reporter)
+    for command in batch_commands:
+        command.dispatch_to_executor(expected)
+
+    reporter = EntriesReporter(logging.getLogger("test"))
+    consolidator = Consolidator(reporter)
+
+    assert consolidator.accept_commands(iter(batch_commands), batch_size=batch_size) == len(batch_commands)
+    assert create_recurring_report_from(consolidator) == create_recurring_report_from(expected)
+    assert [(donor.funds, donor.donation_count) for donor in consolidator.all_donors] == [(donor.funds, donor.donation_count) for donor in expected.all_donors]
+    assert _entries(reporter) == _entries(expected_reporter)
+
+###
+## Keys
+###
+
+def test_names_are_matched_in_any_case():
+    consolidator = Consolidator(EntriesReporter(logging.getLogger("test")))
+
+    for command in [AddDonor(name="Pepe", amount=1000), AddDonor(name="PEPE", amount=5), AddCampaign(name="Camp"),
+                    AddDonation(campaign_name="CAMP", frequency=DonationFrequency.MONTHLY, donor_name="pEpE", amount=100)]:
+        command.dispatch_to_executor(consolidator)
+
+    assert [(donor.key, donor.name, donor.funds) for donor in consolidator.all_donors] == [("pepe", "Pepe", 900)]
+    assert consolidator.all_donors[0].donations[0].campaign_key == "camp"
+
+def test_restore_state_interns_keys_again():
+    source = Consolidator(EntriesReporter(logging.getLogger("test")))
+    for command in [AddDonor(name="Pepe", amount=1000), AddCampaign(name="Camp")]:
+        command.dispatch_to_executor(source)
+
+    consolidator = Consolidator(EntriesReporter(logging.getLogger("test")))
+    AddDonor(name="Ana", amount=1000).dispatch_to_executor(consolidator)
+    consolidator.restore_state(source.export_state())
+    AddDonation(campaign_name="camp", frequency=DonationFrequency.MONTHLY, donor_name="PEPE", amount=100).dispatch_to_executor(consolidator)
+    AddDonation(campaign_name="camp", frequency=DonationFrequency.MONTHLY, donor_name="ana", amount=100).dispatch_to_executor(consolidator)
+
+    assert [(donor.key, donor.funds) for donor in consolidator.all_donors] == [("pepe", 900)]
+    assert list(consolidator.export_state()["donors"]) == ["pepe"]
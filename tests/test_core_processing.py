@@ -1,11 +1,13 @@
 import json
+import logging
 import pytest
 
 from internal.commands import AddCampaign, AddDonation, AddDonor
 from internal.consolidator import Consolidator
-from internal.core_processing import create_recurring_report_from, extract_command, process_command_line
+from internal.core_processing import create_recurring_report_from, dump_consolidator_state, extract_command, parse_command, process_command_line
 from internal.entry_reporter import EntriesReporter, ReporterEntryStatus
 from internal.models import Campaign, Donation, DonationFrequency, Donor
+from internal.money import format_cents
 
 
 ###
@@ -26,18 +28,24 @@ def test_bad_command_add_donor(line):
 
 @pytest.mark.parametrize('line', ["Add donor pepe 0           ", "add donor pepe -1"])
 def test_invalid_command_add_donor(line):
+    result = parse_command(line)
+
     assert extract_command(line) is None
+    assert not result.malformed
+    assert result.reason
 
 
-@pytest.mark.parametrize('line', ["add donor pepe as10"])
-def test_throws_exception_command_add_donor(line):
-    
-    with pytest.raises(ValueError) as excinfo:  
-        extract_command(line)
-    assert str(excinfo.value) == f"could not convert string to float: '{line.split()[::-1][0]}'" 
+@pytest.mark.parametrize('line', ["add donor pepe as10", "add donor pepe $as10"])
+def test_rejects_malformed_command_add_donor(line):
+    result = parse_command(line)
+
+    assert extract_command(line) is None
+    assert result.command is None
+    assert result.malformed
+    assert result.reason == f"could not convert string to amount: '{line.split()[::-1][0].removeprefix('$')}'"
 
 
-add_donor_success_params = [(f"add donor {donor.name} {donor.amount}", donor) for donor in [AddDonor(name="pepepe", amount=1), AddDonor(name="1515", amount=100)]]
+add_donor_success_params = [(f"add donor {donor.name} {format_cents(donor.amount)}", donor) for donor in [AddDonor(name="pepepe", amount=1), AddDonor(name="1515", amount=100)]]
 @pytest.mark.parametrize('line, expected_result', add_donor_success_params)
 def test_good_command_add_donor(line:str, expected_result:AddDonor):
     command = extract_command(line)
@@ -45,7 +53,7 @@ def test_good_command_add_donor(line:str, expected_result:AddDonor):
     assert command.name == expected_result.name
     assert command.amount == expected_result.amount
 
-add_donor_success_params = [(f"add donor {donor.name} ${donor.amount}", donor) for donor in [AddDonor(name="pepepe", amount=1), AddDonor(name="1515", amount=100)]]
+add_donor_success_params = [(f"add donor {donor.name} ${format_cents(donor.amount)}", donor) for donor in [AddDonor(name="pepepe", amount=1), AddDonor(name="1515", amount=100)]]
 @pytest.mark.parametrize('line, expected_result', add_donor_success_params)
 def test_good_command_dollar_prefix_add_donor(line:str, expected_result:AddDonor):
     command = extract_command(line)
@@ -82,14 +90,16 @@ def test_invalid_command_add_donation(line):
 
 
 @pytest.mark.parametrize('line', ["dOnate pepe A pompin  as10", "dOnate pepe badFrequency pompin  as10", "dOnate pepe Weeklyyy pompin  as10","dOnate pepe A pompin  as10", "dOnate pepe weekly pompin  as10", "dOnate pepe monthly pompin  as10"])
-def test_throws_exception_command_add_donation(line):
-    
-    with pytest.raises(ValueError) as excinfo:  
-        extract_command(line)
-        assert 1 == len([msg for msg in [f"could not convert string to float: '{line.split()[::-1][0]}'", f"ValueError: '{line.split()[::][0]}' is not a valid DonationFrequency"] if msg == str(excinfo.value)])
+def test_rejects_malformed_command_add_donation(line):
+    result = parse_command(line)
+
+    assert extract_command(line) is None
+    assert result.command is None
+    assert result.malformed
+    assert 1 == len([msg for msg in [f"could not convert string to amount: '{line.split()[::-1][0]}'", f"'{line.split()[2].upper()}' is not a valid DonationFrequency"] if msg == result.reason])
 
 
-add_donation_success_params = [(f"dOnate {donation.donor_name} {donation.frequency._value_} {donation.campaign_name} {donation.amount}", donation) for donation in [AddDonation(campaign_name="pepe", frequency=DonationFrequency.MONTHLY, donor_name="pompin", amount=1), AddDonation(campaign_name="1515", frequency=DonationFrequency.MONTHLY, donor_name="5468", amount=100)]]
+add_donation_success_params = [(f"dOnate {donation.donor_name} {donation.frequency._value_} {donation.campaign_name} {format_cents(donation.amount)}", donation) for donation in [AddDonation(campaign_name="pepe", frequency=DonationFrequency.MONTHLY, donor_name="pompin", amount=1), AddDonation(campaign_name="1515", frequency=DonationFrequency.MONTHLY, donor_name="5468", amount=100)]]
 @pytest.mark.parametrize('line, expected_result', add_donation_success_params)
 def test_good_command_add_donation(line:str, expected_result:AddDonation):
     command = extract_command(line)
@@ -100,7 +110,7 @@ def test_good_command_add_donation(line:str, expected_result:AddDonation):
     assert command.frequency == expected_result.frequency
 
 
-add_donation_success_params = [(f"dOnate {donation.donor_name} {donation.frequency._value_} {donation.campaign_name} ${donation.amount}", donation) for donation in [AddDonation(campaign_name="pepe", frequency=DonationFrequency.MONTHLY, donor_name="pompin", amount=1), AddDonation(campaign_name="1515", frequency=DonationFrequency.MONTHLY, donor_name="5468", amount=100)]]
+add_donation_success_params = [(f"dOnate {donation.donor_name} {donation.frequency._value_} {donation.campaign_name} ${format_cents(donation.amount)}", donation) for donation in [AddDonation(campaign_name="pepe", frequency=DonationFrequency.MONTHLY, donor_name="pompin", amount=1), AddDonation(campaign_name="1515", frequency=DonationFrequency.MONTHLY, donor_name="5468", amount=100)]]
 @pytest.mark.parametrize('line, expected_result', add_donation_success_params)
 def test_good_command_dollar_prefix_add_donation(line:str, expected_result:AddDonation):
     command = extract_command(line)
@@ -114,17 +124,13 @@ def test_good_command_dollar_prefix_add_donation(line:str, expected_result:AddDo
 ###
 
 def consolidator_modifier(consolidator:Consolidator, donors:list[Donor], campaigns:list[Campaign]):
-    if len(donors):
-        consolidator._donors = {donor.key: donor for donor in donors}
-    
-    if len(campaigns):
-        consolidator._campaigns = {campaign.key: campaign for campaign in campaigns}
+    consolidator.restore_state({"donors": {donor.key: donor for donor in donors}, "campaigns": {campaign.key: campaign for campaign in campaigns}})
 
     return consolidator
 
-test_donor = Donor("test_key", name="test_name",funds=136)
-test_donor.donations.append(Donation(amount=25, frequency=DonationFrequency.MONTHLY, campaign_key="cASD"))
-test_donor.donations.append(Donation(amount=55, frequency=DonationFrequency.MONTHLY, campaign_key="cASD"))
+test_donor = Donor("test_key", name="test_name",funds=13600)
+for test_donation in [Donation(amount=2500, frequency=DonationFrequency.MONTHLY, campaign_key="cASD"), Donation(amount=5550, frequency=DonationFrequency.MONTHLY, campaign_key="cASD")]:
+    test_donor.record_donation(test_donation.get_donation_amount(), test_donation)
 
 testing_consolidators_for_report = [
     (None, ""),
@@ -132,10 +138,10 @@ testing_consolidators_for_report = [
     (consolidator_modifier(Consolidator(EntriesReporter(None)), [], []), ""),
     (consolidator_modifier(Consolidator(EntriesReporter(None)), [Donor(key="asf", name='ASD', funds=153)], []), 
      '\n'.join(["Donors:", "ASD: Total: $0 Average: $0"])),
-    (consolidator_modifier(Consolidator(EntriesReporter(None)), [], [Campaign(key="casf", name='cASD', funds=1153)]), 
+    (consolidator_modifier(Consolidator(EntriesReporter(None)), [], [Campaign(key="casf", name='cASD', funds=115300)]), 
      '\n'.join(["Campaigns:", "cASD: Total: $1153"])),
-    (consolidator_modifier(Consolidator(EntriesReporter(None)), [Donor(key="2asf", name='2ASD', funds=253), test_donor], [Campaign(key="2casf", name='2cASD', funds=2153)]), 
-     '\n'.join(["Donors:","2ASD: Total: $0 Average: $0", "test_name: Total: $80 Average: $40.0", "", "Campaigns:", "2cASD: Total: $2153"]))
+    (consolidator_modifier(Consolidator(EntriesReporter(None)), [Donor(key="2asf", name='2ASD', funds=253), test_donor], [Campaign(key="2casf", name='2cASD', funds=215350)]), 
+     '\n'.join(["Donors:","2ASD: Total: $0 Average: $0", "test_name: Total: $80.50 Average: $40.25", "", "Campaigns:", "2cASD: Total: $2153.50"]))
     ]
 @pytest.mark.parametrize('consolidator, expected_result', testing_consolidators_for_report)
 def test_create_recurring_report(consolidator, expected_result):
@@ -184,9 +190,9 @@ def test_process_command_line_skipp():
         assert False, str(exc)
 
 
-def test_process_command_line_error():
+@pytest.mark.parametrize('line', ["add donor joselo 10asdf0", "donate joselo yearly camp 10"])
+def test_process_command_line_error(line):
     consolidator = Consolidator(EntriesReporter(None))
-    line="add donor joselo 10asdf0"
     
     process_command_line(consolidator=consolidator, reporter=consolidator._reporter, line=line)
 
@@ -200,4 +206,38 @@ def test_process_command_line_error():
         
         assert json_obj.get('input_entries')[0].get("result_type") == ReporterEntryStatus.ERROR
     except Exception as exc:
-        assert False, str(exc)
\ No newline at end of file
+        assert False, str(exc)
+
+###
+# DEBUG DUMP
+###
+
+def test_dump_consolidator_state_is_lazy(capsys):
+    consolidator = Consolidator(EntriesReporter(None))
+    logger = logging.getLogger("test_dump")
+    logger.setLevel(logging.CRITICAL)
+    consolidator.to_json = lambda stream=None: pytest.fail("to_json should not be called")
+
+    dump_consolidator_state(consolidator, logger)
+
+    assert capsys.readouterr().err == ""
+
+def test_dump_consolidator_state_to_stderr(capsys):
+    consolidator = Consolidator(EntriesReporter(None))
+    process_command_line(consolidator=consolidator, reporter=consolidator._reporter, line="add donor joselo 100")
+    logger = logging.getLogger("test_dump")
+    logger.setLevel(logging.DEBUG)
+
+    dump_consolidator_state(consolidator, logger)
+
+    assert "joselo" in json.loads(capsys.readouterr().err)["donors"]
+
+def test_dump_consolidator_state_to_file(tmp_path):
+    consolidator = Consolidator(EntriesReporter(None))
+    process_command_line(consolidator=consolidator, reporter=consolidator._reporter, line="add donor joselo 100")
+    logger = logging.getLogger("test_dump")
+    logger.setLevel(logging.CRITICAL)
+
+    dump_consolidator_state(consolidator, logger, str(tmp_path / "dump.json"))
+
+    assert "joselo" in json.loads((tmp_path / "dump.json").read_text())["donors"]
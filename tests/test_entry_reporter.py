@@ -3,6 +3,7 @@ import pytest
 
 from internal.commands import AddCampaign, AddDonation, AddDonor
 from internal.entry_reporter import EntriesReporter, ReporterEntryStatus
+from internal.entry_stores import ReporterRetention
 from internal.models import DonationFrequency
 
 ###
@@ -15,6 +16,14 @@ def test_constructor_entries_reporter(logger):
         EntriesReporter(logger)
     except:
         assert False , f"Unable to instantiate EntriesReporter"
+@pytest.mark.parametrize('retention', [ReporterRetention.ALL, ReporterRetention.COUNTS, ReporterRetention.RING])
+def test_constructor_retention(retention):
+    EntriesReporter(None, retention=retention)
+
+def test_constructor_spill_requires_path():
+    with pytest.raises(ValueError):
+        EntriesReporter(None, retention=ReporterRetention.SPILL)
+
 ###
 # General
 ###
@@ -131,4 +140,41 @@ def test_reporter_input_error(logger, target):
     _do_test_reporting(logger=logger,
                        lambda_executor=lambda reporter: reporter.report_error_input(target, "description") ,
                        json_key="input_entries",
-                       expected_status=ReporterEntryStatus.ERROR)
\ No newline at end of file
+                       expected_status=ReporterEntryStatus.ERROR)
+
+###
+## Retention
+###
+
+def _report_all(reporter: EntriesReporter):
+    reporter.report_success_donor(AddDonor(name="test", amount=10))
+    reporter.report_skipped_donor(AddDonor(name="test", amount=10), "description")
+    reporter.report_success_campaign(AddCampaign(name="test"))
+    reporter.report_error_input("saraza", "description")
+
+def test_reporter_counts_retention():
+    reporter = EntriesReporter(None, retention=ReporterRetention.COUNTS)
+    _report_all(reporter)
+
+    assert reporter.to_json_obj() == {"donor_entries": {ReporterEntryStatus.SUCCESS: 1, ReporterEntryStatus.SKIPPED: 1},
+                                      "campaign_entries": {ReporterEntryStatus.SUCCESS: 1},
+                                      "input_entries": {ReporterEntryStatus.ERROR: 1}}
+
+def test_reporter_ring_retention():
+    reporter = EntriesReporter(None, retention=ReporterRetention.RING, ring_size=1)
+    _report_all(reporter)
+
+    json_obj = reporter.to_json_obj()
+    assert len(json_obj["donor_entries"]) == 1
+    assert json_obj["donor_entries"][0]["result_type"] == ReporterEntryStatus.SKIPPED
+
+def test_reporter_spill_retention(tmp_path):
+    reporter = EntriesReporter(None, retention=ReporterRetention.SPILL, spill_path=str(tmp_path / "entries.jsonl"))
+    _report_all(reporter)
+
+    json_obj = reporter.to_json_obj()
+    reporter.close()
+
+    assert [entry["result_type"] for entry in json_obj["donor_entries"]] == [ReporterEntryStatus.SUCCESS, ReporterEntryStatus.SKIPPED]
+    assert len(json_obj["input_entries"]) == 1
+    assert "donation_entries" not in json_obj
@@ -0,0 +1,89 @@
+import json
+
+from internal.commands import AddDonor
+from internal.entry_reporter import ReporterEntry, ReporterEntryStatus
+from internal.entry_stores import CountingEntryStore, ListEntryStore, RingBufferEntryStore, SpillEntryStore, SpillLog
+
+###
+## General
+###
+
+def _record_entries(store, amount):
+    for index in range(amount):
+        store.record(ReporterEntryStatus.SUCCESS if index % 2 else ReporterEntryStatus.SKIPPED, f"entry {index}", AddDonor(name=f"donor{index}", amount=index))
+
+def _build_stores(tmp_path):
+    return [ListEntryStore(ReporterEntry),
+            CountingEntryStore(),
+            RingBufferEntryStore(ReporterEntry, 3),
+            SpillEntryStore(ReporterEntry, SpillLog(str(tmp_path / "spill.jsonl")), "donor_entries")]
+
+def test_counts_are_kept_by_every_store(tmp_path):
+    for store in _build_stores(tmp_path):
+        _record_entries(store, 5)
+
+        assert len(store) == 5
+        assert store.counts == {ReporterEntryStatus.SUCCESS: 2, ReporterEntryStatus.SKIPPED: 3}
+        json.dumps(store.to_json_obj())
+
+###
+## Stores
+###
+
+def test_list_store_keeps_everything():
+    store = ListEntryStore(ReporterEntry)
+    _record_entries(store, 5)
+
+    assert [entry["description"] for entry in store.to_json_obj()] == [f"entry {index}" for index in range(5)]
+
+def test_counting_store_keeps_only_counts():
+    store = CountingEntryStore()
+    _record_entries(store, 5)
+
+    assert json.loads(json.dumps(store.to_json_obj())) == {"SUCCESS": 2, "SKIPPED": 3}
+
+def test_ring_store_keeps_last_entries():
+    store = RingBufferEntryStore(ReporterEntry, 3)
+    _record_entries(store, 5)
+
+    assert [entry["description"] for entry in store.to_json_obj()] == ["entry 2", "entry 3", "entry 4"]
+
+def test_spill_store_writes_entries_to_disk(tmp_path):
+    spill_log = SpillLog(str(tmp_path / "spill.jsonl"))
+    donor_store = SpillEntryStore(ReporterEntry, spill_log, "donor_entries")
+    input_store = SpillEntryStore(ReporterEntry, spill_log, "input_entries")
+
+    _record_entries(donor_store, 3)
+    input_store.record(ReporterEntryStatus.ERROR, "bad line", "saraza")
+    spill_log.close()
+
+    assert len((tmp_path / "spill.jsonl").read_text().splitlines()) == 4
+    assert [entry["description"] for entry in donor_store.to_json_obj()] == ["entry 0", "entry 1", "entry 2"]
+    assert input_store.to_json_obj() == [{"result_type": "ERROR", "description": "bad line", "target": "saraza", "timestamp": input_store.to_json_obj()[0]["timestamp"]}]
+
+###
+## Bulk recording
+###
+
+def test_record_many_matches_recording_one_at_a_time(tmp_path):
+    targets = [AddDonor(name=f"donor{index}", amount=index) for index in range(5)]
+    (tmp_path / "expected").mkdir()
+
+    for store, expected in zip(_build_stores(tmp_path), _build_stores(tmp_path / "expected")):
+        store.record(ReporterEntryStatus.SKIPPED, "first", targets[0])
+        store.record_many(ReporterEntryStatus.SUCCESS, "", targets)
+        expected.record(ReporterEntryStatus.SKIPPED, "first", targets[0])
+        for target in targets:
+            expected.record(ReporterEntryStatus.SUCCESS, "", target)
+
+        assert len(store) == len(expected) == 6
+        assert store.counts == expected.counts
+        if not isinstance(store, CountingEntryStore):
+            assert [(entry["description"], entry["target"]) for entry in store.to_json_obj()] == \
+                   [(entry["description"], entry["target"]) for entry in expected.to_json_obj()]
+
+def test_ring_store_record_many_keeps_last_entries():
+    store = RingBufferEntryStore(ReporterEntry, 3)
+    store.record_many(ReporterEntryStatus.SUCCESS, "", [AddDonor(name=f"donor{index}", amount=index) for index in range(5)])
+
+    assert [entry["target"]["name"] for entry in store.to_json_obj()] == ["donor2", "donor3", "donor4"]
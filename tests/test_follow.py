@@ -0,0 +1,143 @@
+import os
+import threading
+
+from internal.follow import FileFollower
+
+def _follower(path, **kwargs):
+    return FileFollower(str(path), chunk_size=8, min_interval=0.001, max_interval=0.01, **kwargs)
+
+def _append(path, data):
+    with open(path, 'ab') as file:
+        file.write(data)
+
+###
+## APPENDS
+###
+
+def test_follow_reads_appended_lines(tmp_path):
+    path = tmp_path / "commands.txt"
+    path.write_bytes(b"Add Donor Greg $1000\n")
+    follower = _follower(path)
+
+    assert follower.read_available_lines() == ["Add Donor Greg $1000"]
+    assert follower.read_available_lines() == []
+
+    _append(path, b"Add Campaign Dogs\nDonate Greg Monthly Dogs $10\n")
+    assert follower.read_available_lines() == ["Add Campaign Dogs", "Donate Greg Monthly Dogs $10"]
+    follower.close()
+
+def test_follow_waits_for_the_end_of_a_partial_line(tmp_path):
+    path = tmp_path / "commands.txt"
+    path.write_bytes(b"Add Donor Greg $1000\nAdd Camp")
+    follower = _follower(path)
+
+    assert follower.read_available_lines() == ["Add Donor Greg $1000"]
+
+    _append(path, "aign Señor".encode("utf-8"))
+    assert follower.read_available_lines() == []
+
+    _append(path, b"\n")
+    assert follower.read_available_lines() == ["Add Campaign Señor"]
+    follower.close()
+
+def test_follow_hands_over_a_backlog_in_batches(tmp_path):
+    path = tmp_path / "commands.txt"
+    path.write_bytes(b"Add Campaign Dogs\n" * 100)
+    follower = _follower(path, chunks_per_batch=4)
+
+    batches = list()
+    while lines := follower.read_available_lines():
+        batches.append(lines)
+    follower.close()
+
+    assert len(batches) > 1
+    assert sum(batches, []) == ["Add Campaign Dogs"] * 100
+
+def test_follow_a_file_created_later(tmp_path):
+    path = tmp_path / "commands.txt"
+    follower = _follower(path)
+
+    assert follower.read_available_lines() == []
+
+    path.write_bytes(b"Add Campaign Dogs\n")
+    assert follower.read_available_lines() == ["Add Campaign Dogs"]
+    follower.close()
+
+###
+## ROTATION
+###
+
+def test_follow_renamed_and_recreated_file(tmp_path):
+    path = tmp_path / "commands.txt"
+    path.write_bytes(b"Add Donor Greg $1000\n")
+    follower = _follower(path)
+    assert follower.read_available_lines() == ["Add Donor Greg $1000"]
+
+    _append(path, b"Add Campaign Dogs\nAdd Campaign Cats")
+    os.rename(path, tmp_path / "commands.txt.1")
+    path.write_bytes(b"Donate Greg Monthly Dogs $10\n")
+
+    assert follower.read_available_lines() == ["Add Campaign Dogs", "Add Campaign Cats", "Donate Greg Monthly Dogs $10"]
+    assert follower.rotations == 1
+    follower.close()
+
+def test_follow_truncated_file(tmp_path):
+    path = tmp_path / "commands.txt"
+    path.write_bytes(b"Add Donor Greg $1000\nAdd Campaign Dogs\n")
+    follower = _follower(path)
+    assert follower.read_available_lines() == ["Add Donor Greg $1000", "Add Campaign Dogs"]
+
+    path.write_bytes(b"Add Campaign Cats\n")
+
+    assert follower.read_available_lines() == ["Add Campaign Cats"]
+    assert follower.rotations == 1
+    follower.close()
+
+def test_follow_removed_file_keeps_waiting(tmp_path):
+    path = tmp_path / "commands.txt"
+    path.write_bytes(b"Add Campaign Dogs\n")
+    follower = _follower(path)
+    assert follower.read_available_lines() == ["Add Campaign Dogs"]
+
+    os.remove(path)
+    assert follower.read_available_lines() == []
+
+    path.write_bytes(b"Add Campaign Cats\n")
+    assert follower.read_available_lines() == ["Add Campaign Cats"]
+    follower.close()
+
+###
+## BATCHES
+###
+
+def test_iter_batches_stops_when_the_event_is_set(tmp_path):
+    path = tmp_path / "commands.txt"
+    path.write_bytes(b"Add Campaign Dogs\n")
+    stopped = threading.Event()
+    follower = _follower(path)
+
+    lines = list()
+    for batch in follower.iter_batches(stopped):
+        lines.extend(batch)
+        if not batch:
+            stopped.set()
+
+    assert lines == ["Add Campaign Dogs"]
+    assert follower._file is None
+
+def test_iter_batches_hands_over_the_unterminated_last_line_when_stopped(tmp_path):
+    path = tmp_path / "commands.txt"
+    path.write_bytes(b"Add Campaign Dogs\nAdd Donor Greg $1000")
+    stopped = threading.Event()
+    follower = _follower(path)
+
+    batches = list()
+    for batch in follower.iter_batches(stopped):
+        batches.append(batch)
+        if not batch:
+            # more gets written between the last poll and the stop
+            _append(path, b"\nAdd Donor Janine $5\nAdd Camp")
+            stopped.set()
+
+    assert batches[-1] == ["Add Donor Greg $1000", "Add Donor Janine $5", "Add Camp"]
+    assert [line for batch in batches for line in batch] == ["Add Campaign Dogs", "Add Donor Greg $1000", "Add Donor Janine $5", "Add Camp"]
@@ -0,0 +1,38 @@
+import io
+import json
+import pytest
+
+from internal.entry_reporter import ReporterEntryStatus
+from internal.json_stream import JsonArrayStream, JsonObjectStream, write_json
+
+###
+## WRITE JSON
+###
+
+@pytest.mark.parametrize('value', [
+    None, 1, 1.5, "text", [], {},
+    [1, "two", None],
+    {"a": 1, "b": [1, {"c": []}], "d": {}},
+    {"donors": {"greg": {"name": "Greg", "funds": 100.0, "donations": [{"amount": 10}]}}, "campaigns": {}},
+    {ReporterEntryStatus.SUCCESS: 2, ReporterEntryStatus.ERROR: 1},
+    {2: "a", 1.5: "b", True: "c", None: "d", float("inf"): "e"},
+])
+def test_write_json_matches_json_dumps(value):
+    stream = io.StringIO()
+
+    write_json(stream, value)
+
+    assert stream.getvalue() == json.dumps(value, indent=4)
+
+def test_write_json_consumes_streams_lazily():
+    consumed = []
+    def values():
+        for index in range(3):
+            consumed.append(index)
+            yield {"index": index}
+
+    stream = io.StringIO()
+    write_json(stream, JsonObjectStream(iter([("items", JsonArrayStream(values())), ("empty", JsonArrayStream(iter([])))])))
+
+    assert consumed == [0, 1, 2]
+    assert json.loads(stream.getvalue()) == {"items": [{"index": 0}, {"index": 1}, {"index": 2}], "empty": []}
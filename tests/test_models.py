@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+import json
+import pytest
+
+from internal.core import TIMESTAMP_FORMAT, format_timestamp_ns, timestamp_ns_to_datetime
+from internal.models import Campaign, Donation, DonationFrequency, Donor
+
+###
+## TIMESTAMPS
+###
+
+@pytest.mark.parametrize('timestamp_ns', [0, 1_700_000_000_123_456_789, 1_700_000_000_000_000_999])
+def test_timestamp_ns_to_datetime(timestamp_ns):
+    expected = datetime(1970, 1, 1, tzinfo=timezone.utc).timestamp() + timestamp_ns // 1_000 / 1_000_000
+
+    assert timestamp_ns_to_datetime(timestamp_ns).timestamp() == pytest.approx(expected, abs=1e-6)
+    assert format_timestamp_ns(timestamp_ns) == timestamp_ns_to_datetime(timestamp_ns).strftime(TIMESTAMP_FORMAT)
+
+###
+## JSON REPRESENTATION
+###
+
+def _build_donor():
+    donor = Donor(key="greg", name="Greg", funds=100)
+    donation = Donation(campaign_key="camp", frequency=DonationFrequency.WEEKLY, amount=10)
+    donor.record_donation(donation.get_donation_amount(), donation)
+    return donor
+
+@pytest.mark.parametrize('model, expected_keys', [
+    (Donation(campaign_key="camp", frequency=DonationFrequency.MONTHLY, amount=10), ["created", "campaign_key", "frequency", "amount"]),
+    (_build_donor(), ["created", "key", "name", "funds", "donations", "total_donated", "donation_count"]),
+    (Campaign(key="camp", name="Camp", funds=0), ["created", "key", "name", "funds", "donation_count"]),
+])
+def test_to_json_obj(model, expected_keys):
+    json_obj = model.to_json_obj()
+
+    assert list(json_obj.keys()) == expected_keys
+    assert datetime.strptime(json_obj["created"], TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc) == model.created
+    json.dumps(json_obj)
+
+@pytest.mark.parametrize('model', [Donation(campaign_key="camp", frequency=DonationFrequency.MONTHLY, amount=10), Donor(key="greg", name="Greg", funds=100), Campaign(key="camp", name="Camp", funds=0)])
+def test_models_have_no_instance_dict(model):
+    assert not hasattr(model, "__dict__")
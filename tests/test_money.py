@@ -0,0 +1,42 @@
+import pytest
+
+from internal.money import average_cents, format_cents, parse_cents
+
+###
+## PARSING
+###
+
+@pytest.mark.parametrize('value, expected_result', [
+    ("10", 1000), ("$10", 1000), ("10.5", 1050), ("10.05", 1005), ("$.5", 50), ("0.01", 1), ("10.", 1000),
+    ("-1", -100), ("+2.25", 225), ("007", 700),
+    ("9" * 100, int("9" * 100) * 100), ("9" * 101, None), ("$" + "9" * 5000, None),
+    ("10.555", None), ("1e3", None), ("as10", None), ("10asdf0", None), ("$", None), ("", None), (".", None), ("-", None), ("nan", None), ("$$10", None), ("1,000", None)
+])
+def test_parse_cents(value, expected_result):
+    assert parse_cents(value) == expected_result
+
+###
+## FORMATTING
+###
+
+@pytest.mark.parametrize('cents, expected_result', [(0, "0"), (30000, "300"), (1250, "12.50"), (1205, "12.05"), (1, "0.01"), (-150, "-1.50"), (-300, "-3")])
+def test_format_cents(cents, expected_result):
+    assert format_cents(cents) == expected_result
+
+@pytest.mark.parametrize('value', ["0", "300", "12.50", "0.01", "123456789.99"])
+def test_format_parse_roundtrip(value):
+    assert format_cents(parse_cents(value)) == value
+
+###
+## AVERAGE
+###
+
+@pytest.mark.parametrize('total_cents, count, expected_result', [(0, 0, 0), (8000, 2, 4000), (100, 3, 33), (200, 3, 67), (5, 2, 3), (1, 2, 1), (1, 3, 0)])
+def test_average_cents(total_cents, count, expected_result):
+    assert average_cents(total_cents, count) == expected_result
+
+def test_exact_totals_on_many_amounts():
+    total = sum(parse_cents("$0.10") for _ in range(100_000))
+
+    assert format_cents(total) == "10000"
+    assert sum(0.10 for _ in range(100_000)) != 10000
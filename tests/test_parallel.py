@@ -0,0 +1,56 @@
+import logging
+import pytest
+
+from internal.consolidator import Consolidator
+from internal.core_processing import create_recurring_report_from, parse_command, process_command_lines
+from internal.entry_reporter import EntriesReporter
+from internal.entry_stores import ReporterRetention
+from internal.parallel import decode_result, parse_batch, process_command_lines_parallel
+
+lines = [
+    "Donate Greg Weekly SaveTheDogs $100",
+    "Add Donor Greg $1000",
+    "Add Donor greg $5",
+    "Add Donor Janine $100",
+    "Add Donor Bad as10",
+    "Add Campaign SaveTheDogs",
+    "Add Campaign HelpTheKids",
+    "Donate Greg Weekly SaveTheDogs $100",
+    "Donate Greg Monthly HelpTheKids $200",
+    "Donate Greg Monthly HelpTheKids $900",
+    "Donate Janine Yearly SaveTheDogs $50",
+    "Donate Janine Monthly SaveTheDogs $50",
+    "saraza",
+    "",
+]
+
+###
+## ENCODING
+###
+
+@pytest.mark.parametrize('line', lines)
+def test_encoded_results_roundtrip(line):
+    expected_result = parse_command(line)
+    result = decode_result(parse_batch([line])[0])
+
+    assert result.reason == expected_result.reason
+    assert result.malformed == expected_result.malformed
+    assert (result.command and result.command.to_json_obj()) == (expected_result.command and expected_result.command.to_json_obj())
+
+###
+## PARALLEL PROCESSING
+###
+
+@pytest.mark.parametrize('batch_size', [1, 3, 100])
+def test_parallel_matches_serial(batch_size):
+    serial_reporter = EntriesReporter(logging.getLogger("test"), retention=ReporterRetention.COUNTS)
+    serial = Consolidator(serial_reporter)
+    process_command_lines(serial, serial_reporter, iter(lines))
+
+    parallel_reporter = EntriesReporter(logging.getLogger("test"), retention=ReporterRetention.COUNTS)
+    parallel = Consolidator(parallel_reporter)
+    process_command_lines_parallel(parallel, parallel_reporter, iter(lines), workers=2, batch_size=batch_size)
+
+    assert create_recurring_report_from(parallel) == create_recurring_report_from(serial)
+    assert parallel_reporter.to_json_obj() == serial_reporter.to_json_obj()
+    assert [donor.funds for donor in parallel.all_donors] == [donor.funds for donor in serial.all_donors]
@@ -0,0 +1,100 @@
+import io
+import logging
+import threading
+
+from internal.core import config_stdout_logger
+from internal.queued_logging import BatchFlushingStreamHandler, LazyQueueHandler, enqueue_handlers, wait_for_queued_logging
+
+
+class _FormattingThread(object):
+    """Log argument that remembers the thread that turned it into a string"""
+    def __init__(self):
+        self.thread = None
+
+    def __str__(self):
+        self.thread = threading.current_thread()
+        return "argument"
+
+def _queued_logger(name, stream):
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = BatchFlushingStreamHandler(stream)
+    handler.setFormatter(logging.Formatter('%(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+
+    return logger, enqueue_handlers(logger)
+
+###
+## QUEUED LOGGING
+###
+
+def test_records_are_written_by_the_listener():
+    stream = io.StringIO()
+    logger, listener = _queued_logger("test_queued_logging.written", stream)
+
+    for index in range(100):
+        logger.info("line %d", index)
+    wait_for_queued_logging(logger)
+
+    assert stream.getvalue().splitlines() == [f"INFO - line {index}" for index in range(100)]
+    assert [type(handler) for handler in logger.handlers] == [LazyQueueHandler]
+    listener.stop()
+
+def test_messages_are_formatted_by_the_listener():
+    stream = io.StringIO()
+    logger, listener = _queued_logger("test_queued_logging.lazy", stream)
+    argument = _FormattingThread()
+
+    logger.warning("got %s", argument)
+    wait_for_queued_logging(logger)
+
+    assert stream.getvalue() == "WARNING - got argument\n"
+    assert argument.thread is listener._thread
+    listener.stop()
+
+def test_disabled_levels_are_not_formatted():
+    stream = io.StringIO()
+    logger, listener = _queued_logger("test_queued_logging.disabled", stream)
+    argument = _FormattingThread()
+
+    logger.debug("got %s", argument)
+    wait_for_queued_logging(logger)
+
+    assert stream.getvalue() == ""
+    assert argument.thread is None
+    listener.stop()
+
+def test_tracebacks_are_formatted_when_logged():
+    stream = io.StringIO()
+    logger, listener = _queued_logger("test_queued_logging.traceback", stream)
+
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed")
+    wait_for_queued_logging(logger)
+
+    assert stream.getvalue().startswith("ERROR - failed\nTraceback")
+    assert "ValueError: boom" in stream.getvalue()
+    listener.stop()
+
+def test_stopping_writes_pending_records():
+    stream = io.StringIO()
+    logger, listener = _queued_logger("test_queued_logging.stop", stream)
+
+    logger.info("pending")
+    listener.stop()
+
+    assert stream.getvalue() == "INFO - pending\n"
+
+def test_config_stdout_logger_queued(capsys):
+    logger = logging.getLogger("test_queued_logging.stdout")
+    logger.propagate = False
+
+    config_stdout_logger(logger, logging.INFO, queued=True)
+    logger.info("hello %s", "world")
+    wait_for_queued_logging(logger)
+
+    assert capsys.readouterr().out.endswith(" - test_queued_logging.stdout - INFO - hello world\n")
+    assert [type(handler) for handler in logger.handlers] == [LazyQueueHandler]
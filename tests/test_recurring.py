@@ -0,0 +1,116 @@
+import argparse
+import pytest
+import subprocess
+import sys
+
+from benchmarks.bench_startup import ROOT, SCRIPT
+from recurring import parse_positive_int
+
+first_run = ["Add Donor Greg $1000", "Add Campaign SaveTheDogs", "Donate Greg Monthly SaveTheDogs $100"]
+second_run = ["Add Donor Greg $1000", "Add Campaign SaveTheDogs", "Donate Greg Monthly SaveTheDogs $50"]
+
+def _run(*args):
+    return subprocess.run([sys.executable, SCRIPT, *args], cwd=ROOT, stdin=subprocess.DEVNULL, capture_output=True, text=True)
+
+def _write_lines(path, lines):
+    path.write_text("".join(f"{line}\n" for line in lines))
+    return str(path)
+
+###
+## ARGUMENT VALIDATION
+###
+
+@pytest.mark.parametrize('value, expected_result', [("1", 1), ("65536", 65536), (" 7 ", 7)])
+def test_parse_positive_int(value, expected_result):
+    assert parse_positive_int(value) == expected_result
+
+@pytest.mark.parametrize('value', ["0", "-1", "abc", "1.5", ""])
+def test_parse_positive_int_rejects(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_positive_int(value)
+
+@pytest.mark.parametrize('args, error', [
+    (["--chunk-size", "0", "input.txt"], "argument --chunk-size: must be a positive integer, got 0"),
+    (["--chunk-size", "-3", "input.txt"], "argument --chunk-size: must be a positive integer, got -3"),
+    (["--chunk-size", "big", "input.txt"], "argument --chunk-size: invalid int value: 'big'"),
+    (["--workers", "2", "--batch-size", "0", "input.txt"], "argument --batch-size: must be a positive integer, got 0"),
+    (["--workers", "2", "--batch-size", "-1", "input.txt"], "argument --batch-size: must be a positive integer, got -1"),
+    (["--serve-tcp", "127.0.0.1:0", "--queue-size", "0"], "argument --queue-size: must be a positive integer, got 0"),
+    (["--serve-tcp", "127.0.0.1:0", "--queue-size", "-5"], "argument --queue-size: must be a positive integer, got -5"),
+    (["--retention", "ring", "--ring-size", "-1", "input.txt"], "argument --ring-size: must be a positive integer, got -1"),
+    (["--retention", "ALL", "input.txt"], "argument --retention: invalid"),
+])
+def test_invalid_arguments_are_rejected(args, error):
+    result = _run(*args)
+
+    assert result.returncode == 2
+    assert error in result.stderr
+
+@pytest.mark.parametrize('args, error', [
+    (["--retention", "spill"], "--spill-file is required with spill retention"),
+    (["--resume"], "--resume requires --snapshot and an input file"),
+    (["--snapshot", "{tmp}/state.snapshot", "--workers", "2"], "--snapshot can't be combined with --workers"),
+    (["--to-binary", "{tmp}/out.bin", "--command-log", "{tmp}/commands.log"], "--to-binary only converts the input"),
+    (["--to-binary", "{tmp}/out.bin", "--snapshot", "{tmp}/state.snapshot"], "--to-binary only converts the input"),
+    (["--command-log", "{tmp}/commands.log", "--state", "{tmp}/state.db", "--month", "2026-01"], "--command-log can't be combined with --state"),
+    (["--columnar", "--snapshot", "{tmp}/state.snapshot"], "--columnar can't be combined with"),
+    (["--month", "2026-01"], "--month and --report-month require --state"),
+    (["--state", "{tmp}/state.db"], "--state requires the --month the input belongs to"),
+    (["--serve-tcp", "127.0.0.1:0"], "server mode can't be combined with an input file"),
+    (["--follow", "--workers", "2"], "--follow can't be combined with"),
+])
+def test_exclusive_arguments_are_rejected(tmp_path, args, error):
+    result = _run(*[arg.format(tmp=tmp_path) for arg in args], "input.txt")
+
+    assert result.returncode == 2
+    assert error in result.stderr
+    assert not list(tmp_path.iterdir())
+
+@pytest.mark.parametrize('args', [["--chunk-size", "1"], ["--chunk-size", "7"], ["--workers", "2", "--batch-size", "1"]])
+def test_valid_sizes_give_the_same_report(args):
+    assert _run(*args, "input.txt").stdout == _run("input.txt").stdout
+
+def test_usage_lists_the_retention_values_to_type():
+    assert "--retention {all,counts,ring,spill}" in _run("--help").stdout
+
+###
+## COMMAND LOG
+###
+
+def test_appending_to_a_command_log_continues_it(tmp_path):
+    log = str(tmp_path / "commands.log")
+    _run("--command-log", log, _write_lines(tmp_path / "first.txt", first_run))
+
+    report = _run("--command-log", log, _write_lines(tmp_path / "second.txt", second_run)).stdout
+
+    assert "Greg: Total: $150 Average: $75" in report
+    assert _run("--replay-log", log).stdout == report
+
+def test_resuming_without_a_snapshot_continues_the_command_log(tmp_path):
+    log, snapshot = str(tmp_path / "commands.log"), str(tmp_path / "state.snapshot")
+    _run("--command-log", log, _write_lines(tmp_path / "first.txt", first_run))
+
+    _run("--command-log", log, "--snapshot", snapshot, "--resume", _write_lines(tmp_path / "second.txt", second_run))
+
+    assert "Greg: Total: $150 Average: $75" in _run("--replay-log", log).stdout
+
+def test_command_log_must_be_a_command_log(tmp_path):
+    result = _run("--command-log", _write_lines(tmp_path / "first.txt", first_run), _write_lines(tmp_path / "second.txt", second_run))
+
+    assert result.returncode == 2
+    assert "Not a command log" in result.stderr
+    assert "Traceback" not in result.stderr
+
+###
+## SNAPSHOTS
+###
+
+def test_resuming_from_an_unreadable_snapshot_is_reported(tmp_path):
+    snapshot = tmp_path / "state.snapshot"
+    snapshot.write_bytes(b"garbage")
+
+    result = _run("--snapshot", str(snapshot), "--resume", _write_lines(tmp_path / "first.txt", first_run))
+
+    assert result.returncode == 0
+    assert "Unable to resume from snapshot" in result.stderr
+    assert "Traceback" not in result.stderr
@@ -0,0 +1,82 @@
+import pytest
+
+from internal.core_processing import create_recurring_report_from, process_command_line, process_command_lines
+from internal.report_cache import ReportCache
+
+lines = [
+    "Add Donor Zed $1000",
+    "Add Campaign SaveTheDogs",
+    "Donate Zed Monthly SaveTheDogs $10",
+    "Add Donor Greg $1000",
+    "Add Donor Janine $100",
+    "Add Campaign HelpTheKids",
+    "Add Campaign AnimalRescue",
+    "Donate Greg Weekly SaveTheDogs $100",
+    "Donate Janine Monthly HelpTheKids $50.25",
+    "Donate Janine Monthly HelpTheKids $60",
+    "Add Donor Abel $20",
+    "Donate Abel Monthly AnimalRescue $20",
+]
+
+###
+## CONSISTENCY
+###
+
+def test_empty_report(build_consolidator):
+    assert ReportCache(build_consolidator()).render() == ""
+
+def test_report_matches_after_each_line(build_consolidator):
+    consolidator = build_consolidator()
+    cache = ReportCache(consolidator)
+
+    for line in lines:
+        process_command_line(consolidator, consolidator._reporter, line)
+        assert cache.render() == create_recurring_report_from(consolidator)
+
+@pytest.mark.parametrize('renders_every', [1, 3, len(lines)])
+def test_report_matches_with_several_changes_between_renders(renders_every, build_consolidator):
+    consolidator = build_consolidator()
+    cache = ReportCache(consolidator)
+
+    for start in range(0, len(lines), renders_every):
+        process_command_lines(consolidator, consolidator._reporter, lines[start:start + renders_every])
+        assert cache.render() == create_recurring_report_from(consolidator)
+
+def test_report_matches_after_state_is_restored(build_consolidator):
+    source = build_consolidator()
+    process_command_lines(source, source._reporter, lines)
+
+    consolidator = build_consolidator()
+    cache = ReportCache(consolidator)
+    process_command_lines(consolidator, consolidator._reporter, lines[:3])
+    cache.render()
+    consolidator.restore_state(source.export_state())
+
+    assert cache.render() == create_recurring_report_from(source)
+
+###
+## CACHING
+###
+
+def test_unchanged_report_is_not_rendered_again(build_consolidator):
+    consolidator = build_consolidator()
+    cache = ReportCache(consolidator)
+    process_command_lines(consolidator, consolidator._reporter, lines)
+
+    assert cache.render() is cache.render()
+
+def test_only_changed_lines_are_rendered_again(build_consolidator):
+    consolidator = build_consolidator()
+    cache = ReportCache(consolidator)
+    process_command_lines(consolidator, consolidator._reporter, lines)
+    cache.render()
+
+    rendered = list()
+    for section in (cache._donors, cache._campaigns):
+        format_line = section.format_line
+        section.format_line = lambda model, format_line=format_line: rendered.append(model.name) or format_line(model)
+
+    process_command_line(consolidator, consolidator._reporter, "Donate Greg Monthly HelpTheKids $1")
+
+    assert cache.render() == create_recurring_report_from(consolidator)
+    assert sorted(rendered) == ["Greg", "HelpTheKids"]
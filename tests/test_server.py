@@ -0,0 +1,122 @@
+import asyncio
+import logging
+
+from internal.consolidator import Consolidator
+from internal.core_processing import create_recurring_report_from, process_command_lines
+from internal.entry_reporter import EntriesReporter
+from internal.server import END_OF_REPORT, IngestionServer
+
+setup_lines = ["Add Donor Greg $1000", "Add Donor Janine $100", "Add Campaign SaveTheDogs"]
+
+def _build_server(**kwargs):
+    reporter = EntriesReporter(logging.getLogger("test"))
+    return IngestionServer(Consolidator(reporter), reporter, logging.getLogger("test"), **kwargs)
+
+async def _send(port, lines):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write("".join(f"{line}\n" for line in lines).encode())
+    await writer.drain()
+    return reader, writer
+
+async def _request_report(port):
+    reader, writer = await _send(port, ["report"])
+    lines = list()
+    while (line := (await reader.readline()).decode().rstrip("\n")) != END_OF_REPORT:
+        lines.append(line)
+    writer.close()
+    return "\n".join(lines)
+
+###
+## PROTOCOL
+###
+
+def test_report_reflects_lines_received_before_it():
+    async def scenario():
+        server = _build_server()
+        port = await server.start_tcp("127.0.0.1", 0)
+
+        reader, writer = await _send(port, setup_lines + ["Donate Greg Monthly SaveTheDogs $10", "REPORT"])
+        report_lines = [(await reader.readline()).decode() for _ in range(6)]
+        writer.close()
+        await server.close()
+        return "".join(report_lines), server
+
+    report, server = asyncio.run(scenario())
+
+    assert report.splitlines() == ["Donors:", "Greg: Total: $10 Average: $10", "Janine: Total: $0 Average: $0", "", "Campaigns:", "SaveTheDogs: Total: $10"]
+    assert server.lines == 4
+
+def test_empty_report():
+    async def scenario():
+        server = _build_server()
+        port = await server.start_tcp("127.0.0.1", 0)
+        report = await _request_report(port)
+        await server.close()
+        return report
+
+    assert asyncio.run(scenario()) == ""
+
+def test_close_disconnects_producers_that_stay_connected():
+    async def scenario():
+        server = _build_server()
+        port = await server.start_tcp("127.0.0.1", 0)
+
+        reader, writer = await _send(port, setup_lines + ["REPORT"])
+        while (await reader.readline()).decode().rstrip("\n") != END_OF_REPORT:
+            pass
+        await asyncio.wait_for(server.close(), timeout=5)
+        disconnected = await asyncio.wait_for(reader.read(), timeout=5) == b""
+        writer.close()
+        return server, disconnected
+
+    server, disconnected = asyncio.run(scenario())
+
+    assert disconnected
+    assert server.lines == 3
+
+def test_unix_socket(tmp_path):
+    path = str(tmp_path / "server.sock")
+
+    async def scenario():
+        server = _build_server()
+        await server.start_unix(path)
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(b"Add Campaign SaveTheDogs\nREPORT\n")
+        report = [(await reader.readline()).decode().rstrip("\n") for _ in range(3)]
+        writer.close()
+        await server.close()
+        return report
+
+    assert asyncio.run(scenario()) == ["Campaigns:", "SaveTheDogs: Total: $0", END_OF_REPORT]
+
+###
+## CONCURRENT PRODUCERS
+###
+
+def test_concurrent_producers_with_backpressure():
+    donation_lines = [f"Donate {donor} Monthly SaveTheDogs $1" for donor in ("Greg", "Janine") for _ in range(200)]
+
+    async def scenario():
+        server = _build_server(queue_size=4, drain_size=3)
+        port = await server.start_tcp("127.0.0.1", 0)
+
+        _, writer = await _send(port, setup_lines)
+        writer.close()
+        while server.lines < len(setup_lines):
+            await asyncio.sleep(0.01)
+
+        producers = [await _send(port, donation_lines[index::4]) for index in range(4)]
+        for _, writer in producers:
+            writer.close()
+        while server.lines < len(setup_lines) + len(donation_lines):
+            assert server._queue.qsize() <= 4
+            await asyncio.sleep(0)
+
+        report = await _request_report(port)
+        await server.close()
+        return report
+
+    expected = Consolidator(EntriesReporter(logging.getLogger("test")))
+    process_command_lines(expected, expected._reporter, setup_lines + donation_lines)
+
+    assert asyncio.run(scenario()) == create_recurring_report_from(expected)
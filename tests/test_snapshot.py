@@ -0,0 +1,148 @@
+import io
+import pickle
+import pytest
+
+from internal.command_log import CommandLogWriter
+from internal.core_processing import create_recurring_report_from, process_command_lines
+from internal.snapshot import SNAPSHOT_VERSION, Snapshot, SnapshotWriter, load_snapshot, process_command_lines_with_snapshots
+from internal.streaming import iter_lines_with_offsets
+
+content = "\n".join([
+    "Add Donor Greg $1000",
+    "Add Donor Janine $100",
+    "Add Campaign SaveTheDogs",
+    "Add Campaign HelpTheKids",
+    "Donate Greg Weekly SaveTheDogs $100",
+    "Donate Greg Monthly HelpTheKids $200",
+    "Donate Janine Monthly SaveTheDogs $50",
+    "Donate Janine Monthly SaveTheDogs $60",
+]).encode('utf-8')
+
+###
+## SNAPSHOT
+###
+
+def test_snapshot_roundtrip(build_consolidator):
+    consolidator = build_consolidator()
+    process_command_lines(consolidator, consolidator._reporter, content.decode().splitlines())
+
+    snapshot = Snapshot.from_bytes(Snapshot(consolidator.export_state(), offset=15, lines=3).to_bytes())
+    restored = build_consolidator()
+    restored.restore_state(snapshot.state)
+
+    assert (snapshot.offset, snapshot.lines) == (15, 3)
+    assert create_recurring_report_from(restored) == create_recurring_report_from(consolidator)
+    assert [donor.funds for donor in restored.all_donors] == [donor.funds for donor in consolidator.all_donors]
+
+def test_snapshot_keeps_aggregates_but_not_donations(build_consolidator):
+    consolidator = build_consolidator()
+    process_command_lines(consolidator, consolidator._reporter, content.decode().splitlines())
+    data = Snapshot(consolidator.export_state(), offset=0, lines=8).to_bytes()
+
+    restored = Snapshot.from_bytes(data).state
+    greg = restored["donors"]["greg"]
+
+    assert (greg.name, greg.funds, greg.total_donated, greg.donation_count, greg.donations) == ("Greg", 40000, 60000, 2, [])
+    assert greg.created == consolidator.all_donors[0].created
+    assert (restored["campaigns"]["savethedogs"].funds, restored["campaigns"]["savethedogs"].donation_count) == (45000, 2)
+
+    process_command_lines(consolidator, consolidator._reporter, ["Donate Greg Monthly SaveTheDogs $1"] * 100)
+    # only a few bytes more for the larger numbers, not one record per donation
+    assert len(Snapshot(consolidator.export_state(), offset=0, lines=108).to_bytes()) < len(data) + 16
+
+def test_load_missing_snapshot(tmp_path):
+    assert load_snapshot(str(tmp_path / "missing")) is None
+
+def _unreadable_snapshots():
+    data = Snapshot({"donors": {}, "campaigns": {}}, offset=0, lines=0).to_bytes()
+    return [b"garbage", b"", data[:len(data) // 2], pickle.dumps({"version": 1, "state": {}}), pickle.dumps(["not", "a", "snapshot"]),
+            pickle.dumps({"version": SNAPSHOT_VERSION, "state": {"donors": [("greg",)], "campaigns": []}, "offset": 0, "lines": 0})]
+
+@pytest.mark.parametrize('data', _unreadable_snapshots())
+def test_load_unreadable_snapshot(tmp_path, data):
+    path = tmp_path / "snapshot"
+    path.write_bytes(data)
+
+    with pytest.raises(ValueError):
+        load_snapshot(str(path))
+
+def test_writer_keeps_latest_snapshot(tmp_path, build_consolidator):
+    path = str(tmp_path / "snapshot")
+    consolidator = build_consolidator()
+    writer = SnapshotWriter(path)
+
+    for lines in range(1, 20):
+        writer.submit(consolidator, offset=lines * 10, lines=lines)
+    writer.close()
+
+    snapshot = load_snapshot(path)
+    assert (snapshot.offset, snapshot.lines) == (190, 19)
+    assert 1 <= writer.written <= 19
+
+###
+## RESUME
+###
+
+@pytest.mark.parametrize('crash_after', [0, 1, 4, 7])
+def test_resume_matches_uninterrupted_run(tmp_path, crash_after, build_consolidator):
+    path = str(tmp_path / "snapshot")
+
+    uninterrupted = build_consolidator()
+    process_command_lines(uninterrupted, uninterrupted._reporter, content.decode().splitlines())
+
+    first_run = build_consolidator()
+    writer = SnapshotWriter(path)
+    lines = iter_lines_with_offsets(io.BytesIO(content))
+    process_command_lines_with_snapshots(first_run, first_run._reporter, (next(lines) for _ in range(crash_after)), writer, every=1)
+    writer.close()
+
+    snapshot = load_snapshot(path)
+    resumed = build_consolidator()
+    offset, applied_lines = 0, 0
+    if snapshot:
+        resumed.restore_state(snapshot.state)
+        offset, applied_lines = snapshot.offset, snapshot.lines
+
+    stream = io.BytesIO(content)
+    stream.seek(offset)
+    writer = SnapshotWriter(path)
+    total_lines = process_command_lines_with_snapshots(resumed, resumed._reporter, iter_lines_with_offsets(stream, start_offset=offset), writer, lines=applied_lines)
+    writer.close()
+
+    assert total_lines == 8
+    assert create_recurring_report_from(resumed) == create_recurring_report_from(uninterrupted)
+    assert load_snapshot(path).offset == len(content)
+
+def test_resumed_command_log_matches_uninterrupted_run(tmp_path, build_consolidator):
+    log_path, other_log_path, path = str(tmp_path / "commands.log"), str(tmp_path / "other.log"), str(tmp_path / "snapshot")
+    lines = content.decode().splitlines()
+
+    command_log = CommandLogWriter(other_log_path)
+    uninterrupted = build_consolidator(command_log=command_log)
+    process_command_lines(uninterrupted, uninterrupted._reporter, lines)
+    command_log.close()
+
+    # the first run snapshots after 4 lines and dies after writing the records of 3 more
+    command_log = CommandLogWriter(log_path)
+    first_run = build_consolidator(command_log=command_log)
+    writer = SnapshotWriter(path, command_log=command_log)
+    process_command_lines_with_snapshots(first_run, first_run._reporter, list(iter_lines_with_offsets(io.BytesIO(content)))[:4], writer, every=4)
+    writer.close()
+    process_command_lines(first_run, first_run._reporter, lines[4:7])
+    command_log.close()
+
+    snapshot = load_snapshot(path)
+    command_log = CommandLogWriter(log_path)
+    command_log.truncate(snapshot.command_log_size)
+    resumed = build_consolidator(command_log=command_log)
+    resumed.restore_state(snapshot.state)
+    process_command_lines(resumed, resumed._reporter, lines[snapshot.lines:])
+    command_log.close()
+
+    assert open(log_path, 'rb').read() == open(other_log_path, 'rb').read()
+
+def test_command_log_cannot_grow_back(tmp_path):
+    command_log = CommandLogWriter(str(tmp_path / "commands.log"))
+
+    with pytest.raises(ValueError):
+        command_log.truncate(command_log.size() + 1)
@@ -0,0 +1,42 @@
+import pytest
+
+from benchmarks.bench_startup import OPTIONAL_MODULES, parse_importtime, script_imports, total_import_time
+
+###
+## IMPORTS
+###
+
+@pytest.fixture(scope="module")
+def processing_imports():
+    return script_imports("input.txt")
+
+@pytest.mark.parametrize('module', OPTIONAL_MODULES)
+def test_processing_does_not_import_optional_modules(processing_imports, module):
+    assert module not in parse_importtime(processing_imports)
+
+def test_processing_imports_what_it_uses(processing_imports):
+    modules = parse_importtime(processing_imports)
+
+    assert "internal.core_processing" in modules
+    assert "internal.streaming" in modules
+    assert total_import_time(processing_imports) > 0
+
+def test_help_does_not_import_optional_modules():
+    modules = parse_importtime(script_imports("--help"))
+
+    assert not [module for module in OPTIONAL_MODULES if module in modules]
+
+###
+## IMPORTTIME OUTPUT
+###
+
+def test_parse_importtime():
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       103 |        103 |         _sre",
+        "import time:       838 |      10732 |     re",
+        "import time:      1982 |      14528 | argparse",
+    ])
+
+    assert parse_importtime(output) == {"_sre": 103, "re": 10732, "argparse": 14528}
+    assert total_import_time(output) == 14528
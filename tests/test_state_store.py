@@ -0,0 +1,104 @@
+import pytest
+
+from internal.core_processing import create_recurring_report_from, process_command_lines
+from internal.state_store import StateStore, parse_month
+
+first_month = [
+    "Add Donor Greg $1000",
+    "Add Donor Janine $100",
+    "Add Campaign SaveTheDogs",
+    "Donate Greg Weekly SaveTheDogs $100",
+    "Donate Janine Monthly SaveTheDogs $50",
+]
+
+second_month = [
+    "Add Campaign HelpTheKids",
+    "Donate Greg Monthly HelpTheKids $200",
+    "Donate Janine Monthly SaveTheDogs $60",
+    "Donate Janine Monthly SaveTheDogs $40",
+]
+
+def _ingest(build_consolidator, store, month, lines):
+    consolidator = build_consolidator()
+    store.load_current_state(consolidator)
+    process_command_lines(consolidator, consolidator._reporter, lines)
+    store.save_month(consolidator, month)
+    return consolidator
+
+@pytest.fixture
+def store(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"))
+    yield store
+    store.close()
+
+###
+## MONTHS
+###
+
+@pytest.mark.parametrize('value, expected_result', [("2026-01", "2026-01"), ("2026-1", "2026-01")])
+def test_parse_month(value, expected_result):
+    assert parse_month(value) == expected_result
+
+@pytest.mark.parametrize('value', ["2026-13", "2026", "January"])
+def test_parse_invalid_month(value):
+    with pytest.raises(ValueError):
+        parse_month(value)
+
+def test_months_must_be_ingested_in_order(store, build_consolidator):
+    _ingest(build_consolidator, store, "2026-02", first_month)
+
+    for month in ("2026-01", "2026-02"):
+        with pytest.raises(ValueError):
+            store.check_month_can_be_ingested(month)
+
+    store.check_month_can_be_ingested("2026-03")
+    assert store.months() == ["2026-02"]
+
+###
+## INCREMENTAL PROCESSING
+###
+
+def test_month_only_ingests_its_delta(store, build_consolidator):
+    _ingest(build_consolidator, store, "2026-01", first_month)
+    consolidator = _ingest(build_consolidator, store, "2026-02", second_month)
+
+    # Janine only had $50 left from the first month, so the $60 donation is skipped
+    assert create_recurring_report_from(consolidator) == "\n".join([
+        "Donors:",
+        "Greg: Total: $200 Average: $200",
+        "Janine: Total: $40 Average: $40",
+        "",
+        "Campaigns:",
+        "HelpTheKids: Total: $200",
+        "SaveTheDogs: Total: $40",
+    ])
+    assert {donor.key: donor.funds for donor in consolidator.all_donors} == {"greg": 40000, "janine": 1000}
+
+def test_current_state_keeps_funds_left(store, build_consolidator):
+    _ingest(build_consolidator, store, "2026-01", first_month)
+
+    consolidator = build_consolidator()
+    store.load_current_state(consolidator)
+
+    assert {donor.key: (donor.funds, donor.total_donated) for donor in consolidator.all_donors} == {"greg": (60000, 0), "janine": (5000, 0)}
+    assert {campaign.key: campaign.funds for campaign in consolidator.all_campaigns} == {"savethedogs": 0}
+
+###
+## MONTH REPORTS
+###
+
+def test_report_stored_month_without_replaying(store, build_consolidator):
+    expected_reports = {
+        "2026-01": create_recurring_report_from(_ingest(build_consolidator, store, "2026-01", first_month)),
+        "2026-02": create_recurring_report_from(_ingest(build_consolidator, store, "2026-02", second_month)),
+    }
+
+    for month, expected_report in expected_reports.items():
+        consolidator = build_consolidator()
+        store.load_month(consolidator, month)
+
+        assert create_recurring_report_from(consolidator) == expected_report
+
+def test_report_month_not_ingested(store, build_consolidator):
+    with pytest.raises(ValueError):
+        store.load_month(build_consolidator(), "2026-01")
@@ -0,0 +1,103 @@
+import json
+import logging
+
+from internal.consolidator import Consolidator
+from internal.core_processing import create_recurring_report_from, process_command_lines
+from internal.entry_reporter import EntriesReporter
+from internal.entry_stores import ReporterRetention
+from internal.stats import STAGES, ProcessingStats, write_stats_json
+
+lines = [
+    "Add Donor Greg $1000",
+    "Add Campaign Dogs",
+    "Donate Greg Monthly Dogs $10",
+    "Donate Greg Monthly Dogs $10000",
+    "Donate Nobody Monthly Dogs $10",
+    "Add Donor Pepe -1",
+    "saraza",
+]
+
+def _process(stats: ProcessingStats | None, retention: ReporterRetention = ReporterRetention.ALL):
+    reporter = EntriesReporter(logger=logging.getLogger("test_stats"), retention=retention)
+    consolidator = Consolidator(reporter)
+    if stats:
+        stats.instrument_reporter(reporter)
+        stats.process_command_lines(consolidator, reporter, lines)
+    else:
+        process_command_lines(consolidator, reporter, lines)
+
+    return consolidator, reporter
+
+###
+## INSTRUMENTED PROCESSING
+###
+
+def test_instrumented_processing_gets_the_same_result():
+    consolidator, reporter = _process(ProcessingStats())
+    expected_consolidator, expected_reporter = _process(None)
+
+    assert create_recurring_report_from(consolidator) == create_recurring_report_from(expected_consolidator)
+    assert reporter.to_json_obj().keys() == expected_reporter.to_json_obj().keys()
+
+def test_stage_and_command_counters():
+    stats = ProcessingStats()
+    _process(stats)
+
+    assert stats.stages["read"].calls == len(lines) + 1
+    assert stats.stages["parse"].calls == len(lines)
+    assert stats.stages["validate"].calls == 6
+    assert stats.stages["dispatch"].calls == len(lines)
+    assert stats.stages["reporter"].calls == len(lines)
+    assert {name: timer.calls for name, timer in stats.commands.items()} == {"AddDonor": 1, "AddCampaign": 1, "AddDonation": 3}
+    assert stats.rejected_lines == 2
+    assert all(timer.total_ns >= 0 for timer in stats.stages.values())
+
+def test_outcomes_come_from_the_reporter():
+    stats = ProcessingStats()
+    _process(stats, ReporterRetention.COUNTS)
+
+    assert stats.outcomes() == {
+        "donor_entries": {"SUCCESS": 1},
+        "campaign_entries": {"SUCCESS": 1},
+        "donation_entries": {"SUCCESS": 1, "SKIPPED": 2},
+        "input_entries": {"SKIPPED": 2},
+    }
+
+def test_dispatch_excludes_reporter_time():
+    stats = ProcessingStats()
+    _process(stats)
+
+    dispatch = stats.to_json_obj()["stages"]["dispatch"]
+    assert dispatch["total_ns"] == max(0, stats.stages["dispatch"].total_ns - stats.stages["reporter"].total_ns)
+
+###
+## OUTPUT
+###
+
+def test_summary_and_json(tmp_path):
+    stats = ProcessingStats()
+    _process(stats)
+    stats.add("report", 1_500_000)
+    stats.finish()
+
+    summary = stats.format_summary()
+    assert summary.startswith("Stats: ")
+    for stage in STAGES:
+        assert f"  {stage} " in summary
+    assert "AddDonation" in summary
+    assert "donation_entries: SKIPPED 2 (66.7%), SUCCESS 1 (33.3%)" in summary
+
+    path = tmp_path / "stats.json"
+    write_stats_json(stats, str(path))
+    metrics = json.loads(path.read_text())
+    assert set(metrics["stages"]) == set(STAGES)
+    assert metrics["stages"]["report"] == {"calls": 1, "total_ns": 1_500_000}
+    assert metrics["rejected_lines"] == 2
+    assert metrics["elapsed_ns"] == stats.elapsed_ns
+
+def test_summary_without_processing():
+    stats = ProcessingStats()
+    stats.finish()
+
+    assert stats.format_summary().count("\n") == 1
+    assert stats.outcomes() == {}
@@ -0,0 +1,109 @@
+import io
+import pytest
+
+from internal.streaming import can_mmap, iter_batches, iter_byte_lines, iter_chunks, iter_lines, iter_lines_with_offsets, iter_mmap_lines
+
+###
+## CHUNKS
+###
+
+@pytest.mark.parametrize('content, chunk_size', [(b"", 4), (b"abc", 1), (b"abcdefgh", 3), (b"abcdefgh", 100)])
+def test_iter_chunks(content, chunk_size):
+    chunks = list(iter_chunks(io.BytesIO(content), chunk_size))
+
+    assert b"".join(chunks) == content
+    assert all(0 < len(chunk) <= chunk_size for chunk in chunks)
+
+###
+## LINES
+###
+
+@pytest.mark.parametrize('chunks, expected_result', [
+    ([], []),
+    ([b"one"], [b"one"]),
+    ([b"one\n"], [b"one"]),
+    ([b"on", b"e\ntw", b"o\n", b"three"], [b"one", b"two", b"three"]),
+    ([b"\n\n"], [b"", b""]),
+])
+def test_iter_byte_lines(chunks, expected_result):
+    assert list(iter_byte_lines(iter(chunks))) == expected_result
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 7, 1024])
+def test_iter_lines_matches_text_mode(chunk_size):
+    content = "Add Donor Greg $1000\nAdd Campaign Señor\r\nDonate Greg Weekly Señor $100"
+
+    lines = list(iter_lines(io.BytesIO(content.encode('utf-8')), chunk_size=chunk_size))
+
+    assert lines == ["Add Donor Greg $1000", "Add Campaign Señor\r", "Donate Greg Weekly Señor $100"]
+
+def test_iter_lines_is_lazy():
+    stream = io.BytesIO(b"first\n" + b"x" * 10_000)
+
+    lines = iter_lines(stream, chunk_size=16)
+
+    assert next(lines) == "first"
+    assert stream.tell() == 16
+
+@pytest.mark.parametrize('content', [b"one\ntwo\n", b"one\n\nthree", "uno\ndós".encode('utf-8')])
+@pytest.mark.parametrize('chunk_size', [1, 3, 1024])
+def test_iter_lines_with_offsets(content, chunk_size):
+    lines_with_offsets = list(iter_lines_with_offsets(io.BytesIO(content), chunk_size=chunk_size))
+
+    assert [line for line, _ in lines_with_offsets] == list(iter_lines(io.BytesIO(content)))
+    assert lines_with_offsets[-1][1] == len(content)
+    for line, offset in lines_with_offsets:
+        assert content[:offset].rstrip(b"\n").endswith(line.encode('utf-8'))
+
+def test_iter_lines_with_offsets_from_start_offset():
+    stream = io.BytesIO(b"one\ntwo\nthree")
+    stream.seek(4)
+
+    assert list(iter_lines_with_offsets(stream, start_offset=4)) == [("two", 8), ("three", 13)]
+
+###
+## MMAP
+###
+
+@pytest.mark.parametrize('content', [
+    b"one",
+    b"one\n",
+    b"one\n\n",
+    b"Add Donor Greg $1000\nAdd Campaign Se\xc3\xb1or\r\nDonate Greg Weekly Se\xc3\xb1or $100",
+    b"a\nlonger than the window line\nb\n",
+    b"invalid \xff byte\nnext",
+])
+@pytest.mark.parametrize('window_size', [1, 4, 1024])
+def test_iter_mmap_lines_matches_iter_lines(tmp_path, content, window_size):
+    path = tmp_path / "input.txt"
+    path.write_bytes(content)
+
+    with open(path, 'rb') as source_file:
+        assert can_mmap(source_file)
+        assert list(iter_mmap_lines(source_file, window_size=window_size)) == list(iter_lines(io.BytesIO(content)))
+
+def test_iter_mmap_lines_from_current_position(tmp_path):
+    path = tmp_path / "input.txt"
+    path.write_bytes(b"one\ntwo\nthree")
+
+    with open(path, 'rb') as source_file:
+        source_file.seek(4)
+        assert list(iter_mmap_lines(source_file, window_size=2)) == ["two", "three"]
+
+def test_can_mmap_only_non_empty_files(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+
+    with open(path, 'rb') as source_file:
+        assert not can_mmap(source_file)
+    assert not can_mmap(io.BytesIO(b"one"))
+
+###
+## BATCHES
+###
+
+@pytest.mark.parametrize('amount, batch_size, expected_sizes', [(0, 3, []), (3, 3, [3]), (7, 3, [3, 3, 1]), (2, 10, [2])])
+def test_iter_batches(amount, batch_size, expected_sizes):
+    batches = list(iter_batches(iter(range(amount)), batch_size))
+
+    assert [len(batch) for batch in batches] == expected_sizes
+    assert [item for batch in batches for item in batch] == list(range(amount))
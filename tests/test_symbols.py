@@ -0,0 +1,39 @@
+from internal.symbols import SymbolTable
+
+###
+## Interning
+###
+
+def test_keys_get_dense_ids_in_order():
+    symbols = SymbolTable()
+
+    assert [symbols.add(key) for key in ("pepe", "ana", "pepe", "zed")] == [0, 1, 0, 2]
+    assert symbols.keys == ["pepe", "ana", "zed"]
+    assert len(symbols) == 3
+
+def test_find_ignores_case():
+    symbols = SymbolTable()
+    symbols.add("pepe")
+
+    assert symbols.find("pepe") == 0
+    assert symbols.find("PePe") == 0
+    assert symbols.find("ana") is None
+
+def test_find_remembers_only_spellings_that_resolve():
+    symbols = SymbolTable()
+    symbols.add("pepe")
+
+    symbols.find("PEPE")
+    symbols.find("Ana")
+
+    assert symbols.ids == {"pepe": 0, "PEPE": 0}
+    assert len(symbols) == 1
+
+def test_clear():
+    symbols = SymbolTable()
+    symbols.add("pepe")
+    symbols.find("Pepe")
+    symbols.clear()
+
+    assert symbols.find("pepe") is None
+    assert symbols.add("ana") == 0
@@ -0,0 +1,34 @@
+import pytest
+
+from benchmarks.synthetic import SyntheticConfig, generate_lines
+from internal.core_processing import parse_command
+
+###
+## SYNTHETIC INPUT
+###
+
+def test_generation_is_deterministic():
+    config = SyntheticConfig(donors=20, campaigns=5, donations=500)
+
+    assert list(generate_lines(config)) == list(generate_lines(config))
+    assert list(generate_lines(config)) != list(generate_lines(SyntheticConfig(donors=20, campaigns=5, donations=500, seed=7)))
+
+@pytest.mark.parametrize('malformed_ratio', [0.0, 0.1, 0.5])
+def test_malformed_ratio(malformed_ratio):
+    config = SyntheticConfig(donors=10, campaigns=3, donations=2_000, malformed_ratio=malformed_ratio, duplicate_ratio=0.0)
+    donation_lines = list(generate_lines(config))[config.donors + config.campaigns:]
+
+    rejected = len([line for line in donation_lines if parse_command(line).command is None])
+
+    assert len(donation_lines) == config.donations
+    assert rejected == pytest.approx(malformed_ratio * config.donations, abs=0.03 * config.donations)
+
+def test_cardinality_and_duplicates():
+    config = SyntheticConfig(donors=200, campaigns=50, donations=0, duplicate_ratio=0.5)
+    lines = list(generate_lines(config))
+
+    donor_names = {line.split()[2].lower() for line in lines if line.startswith("Add Donor")}
+    campaign_names = {line.split()[2].lower() for line in lines if line.startswith("Add Campaign")}
+
+    assert (len(donor_names), len(campaign_names)) == (config.donors, config.campaigns)
+    assert len(lines) > config.donors + config.campaigns